@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+HyperMaint GMAO - Restore a backup archive made by GET /api/admin/backup
+Loads the collections and the uploaded files directly (MONGO_URL / DB_NAME from
+backend/.env), without going through the HTTP upload limit.
+
+Usage: python restore_backup.py archive.zip [--replace]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from fastapi import HTTPException
+
+import server
+
+
+async def restore(archive, replace):
+    # Restoring publishes cache invalidations: make sure the capped event collection exists
+    # first, otherwise the first insert would create it as a plain collection
+    if server.INVALIDATION_BUS_ENABLED:
+        await server.ensure_invalidation_bus()
+    return await server.restore_archive(archive, replace)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Restore a HyperMaint backup archive")
+    parser.add_argument("archive", help="zip archive downloaded from /api/admin/backup")
+    parser.add_argument("--replace", action="store_true",
+                        help="empty the collections found in the archive before loading them")
+    args = parser.parse_args()
+
+    try:
+        report = asyncio.run(restore(args.archive, args.replace))
+    except HTTPException as e:
+        print(f"Restore failed: {e.detail}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        server.client.close()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,14 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, Query, Request, Response, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.datastructures import Headers, MutableHeaders
 from motor.motor_asyncio import AsyncIOMotorClient
-from starlette.responses import StreamingResponse, FileResponse
+from pymongo import ReplaceOne, UpdateOne, CursorType, ReturnDocument
+from pymongo.errors import CollectionInvalid, BulkWriteError, DuplicateKeyError
+from starlette.responses import StreamingResponse, FileResponse, JSONResponse
+from starlette.background import BackgroundTask
 import os
 import logging
 import io
@@ -12,13 +16,46 @@ import csv
 import json
 import shutil
 import asyncio
+import time
+import base64
+import re
+import functools
+import hashlib
+import gzip
+import sqlite3
+import tempfile
+import typing
+import inspect
+import contextvars
+import zipfile
 import resend
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib encoder is used instead
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # optional: no Parquet/Arrow export
+    pyarrow = None
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, create_model, BeforeValidator, PlainSerializer
+from typing import List, Optional, Annotated, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import uuid
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, date, timezone, timedelta
 import jwt
+from bson import ObjectId, json_util
+from bson.errors import InvalidId
 from passlib.context import CryptContext
 
 # PDF Generation
@@ -49,6 +86,10 @@ UPLOADS_DIR.mkdir(exist_ok=True)
 (UPLOADS_DIR / "spareparts").mkdir(exist_ok=True)
 (UPLOADS_DIR / "workorders").mkdir(exist_ok=True)
 
+# Artifacts of background export jobs (shared by the workers, like uploads)
+EXPORT_JOBS_DIR = Path(os.environ.get('EXPORT_JOBS_DIR', str(ROOT_DIR / "exports")))
+EXPORT_JOBS_DIR.mkdir(exist_ok=True)
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
@@ -57,10 +98,67 @@ db = client[os.environ['DB_NAME']]
 # JWT Configuration
 JWT_SECRET = os.environ.get('JWT_SECRET', 'hyperbaremanager-secret-key-2024')
 JWT_ALGORITHM = "HS256"
-JWT_EXPIRATION_HOURS = 24
+# Access tokens carry the authorization claims and are short-lived; refresh
+# tokens are exchanged at /auth/refresh, which re-reads the user from Mongo
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.environ.get('ACCESS_TOKEN_EXPIRE_MINUTES', '15'))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.environ.get('REFRESH_TOKEN_EXPIRE_DAYS', '30'))
+REVOCATION_SYNC_SECONDS = int(os.environ.get('REVOCATION_SYNC_SECONDS', '15'))
+
+# Keyset pagination of list endpoints
+DEFAULT_PAGE_SIZE = int(os.environ.get('DEFAULT_PAGE_SIZE', '200'))
+MAX_PAGE_SIZE = 1000
+MAX_COUNT = 10000  # count_documents stops here; the count is then reported as capped
+
+# Dashboard counters are kept up to date by the write routes and recomputed periodically
+COUNTERS_RECONCILE_SECONDS = int(os.environ.get('COUNTERS_RECONCILE_SECONDS', '600'))
+
+# Authenticated principal cache (user documents keyed by token "sub")
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.environ.get('PRINCIPAL_CACHE_TTL_SECONDS', '60'))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.environ.get('PRINCIPAL_CACHE_MAX_ENTRIES', '1000'))
+
+# GET response cache, invalidated by per-collection generation counters bumped on writes
+RESPONSE_CACHE_TTL_SECONDS = float(os.environ.get('RESPONSE_CACHE_TTL_SECONDS', '300'))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', '2000'))
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+
+# Opt-in: list routes encode Mongo documents directly instead of re-validating them through
+# response_model. Fields missing from a stored document are then omitted rather than sent as
+# null/default, and keys follow the stored order.
+FAST_JSON_RESPONSES = os.environ.get('FAST_JSON_RESPONSES', 'false').lower() == 'true'
+# JSON/text responses above this size are compressed (brotli when installed and accepted, else gzip)
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', '1024'))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+COMPRESSION_THREAD_BYTES = 64 * 1024  # bigger bodies are compressed off the event loop
+
+# Cross-worker invalidation: write events go through a capped collection tailed by every worker
+INVALIDATION_BUS_ENABLED = os.environ.get('INVALIDATION_BUS_ENABLED', 'true').lower() == 'true'
+INVALIDATION_BUS_SIZE_BYTES = int(os.environ.get('INVALIDATION_BUS_SIZE_BYTES', str(1024 * 1024)))
+INVALIDATION_BUS_RETRY_SECONDS = float(os.environ.get('INVALIDATION_BUS_RETRY_SECONDS', '1'))
+
+# Exports read collections through the cursor in batches of this many documents
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '500'))
+# Delta exports: deleted documents are kept as tombstones this long; older resume tokens need a full export
+TOMBSTONE_RETENTION_DAYS = int(os.environ.get('TOMBSTONE_RETENTION_DAYS', '90'))
+CHANGES_SETTLE_SECONDS = 5  # writes more recent than this are left to the next delta
+# Background export jobs: builds running at once per worker, active jobs per user, artifact lifetime
+EXPORT_JOB_WORKERS = int(os.environ.get('EXPORT_JOB_WORKERS', '2'))
+EXPORT_JOBS_PER_USER = int(os.environ.get('EXPORT_JOBS_PER_USER', '2'))
+EXPORT_ARTIFACT_TTL_HOURS = float(os.environ.get('EXPORT_ARTIFACT_TTL_HOURS', '24'))
+EXPORT_JOB_HEARTBEAT_SECONDS = 2
+EXPORT_JOB_STALE_SECONDS = 120  # queued/running jobs without heartbeat for this long are marked failed
+EXPORT_JOB_HISTORY_DAYS = 7
+# Backup archives: NDJSON of every collection except the transient ones, plus the uploads tree
+BACKUP_EXCLUDED_COLLECTIONS = {"cache_events", "export_jobs"}
+BACKUP_CHUNK_BYTES = 1024 * 1024
+RESTORE_BATCH_SIZE = int(os.environ.get('RESTORE_BATCH_SIZE', '1000'))
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt runs in a dedicated pool; requests beyond workers + queue get a 503
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '2'))
+PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', '16'))
+PASSWORD_HASH_RETRY_AFTER_SECONDS = int(os.environ.get('PASSWORD_HASH_RETRY_AFTER_SECONDS', '2'))
 security = HTTPBearer()
 
 app = FastAPI(title="HyperbareManager API")
@@ -229,6 +327,66 @@ async def send_hour_counter_alert_email(to_email: str, equipment_ref: str, curre
     """
     await send_email(to_email, f"🔧 Compteur horaire : {equipment_ref} - Maintenance requise", email_template("Alerte Compteur Horaire", content))
 
+# ==================== DATE FIELDS ====================
+
+# Business dates are stored as BSON dates (UTC midnight) and exchanged as "YYYY-MM-DD" strings
+LEGACY_DATE_FORMATS = ("%d/%m/%Y", "%Y/%m/%d", "%d-%m-%Y")
+
+def parse_date_value(value) -> Optional[datetime]:
+    """Normalize a stored or submitted date (BSON date, ISO string, legacy format) to UTC midnight"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        day = value.date()
+    elif isinstance(value, date):
+        day = value
+    elif isinstance(value, str):
+        text = value.strip()
+        try:
+            day = datetime.fromisoformat(text.replace("Z", "+00:00")).date()
+        except ValueError:
+            for fmt in LEGACY_DATE_FORMATS:
+                try:
+                    day = datetime.strptime(text, fmt).date()
+                    break
+                except ValueError:
+                    continue
+            else:
+                raise ValueError(f"Date invalide: {value}")
+    else:
+        raise ValueError(f"Date invalide: {value}")
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+def to_date(value) -> Optional[date]:
+    """Calendar day of a stored date, or None when missing or unparseable"""
+    try:
+        parsed = parse_date_value(value)
+    except ValueError:
+        return None
+    return parsed.date() if parsed else None
+
+def format_date_value(value):
+    """"YYYY-MM-DD" of a stored date; unparseable legacy values are returned unchanged"""
+    day = to_date(value)
+    return day.isoformat() if day else value
+
+def day_start(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+def parse_date_param(value: Optional[str]) -> Optional[datetime]:
+    """Query-string date, 400 when it cannot be parsed"""
+    try:
+        return parse_date_value(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Date invalide: {value}")
+
+# Accepts any format parse_date_value knows, dumps a datetime for Mongo and "YYYY-MM-DD" in JSON
+StoredDate = Annotated[
+    datetime,
+    BeforeValidator(parse_date_value),
+    PlainSerializer(lambda value: value.date().isoformat(), when_used="json")
+]
+
 # ==================== MODELS ====================
 
 # User Models
@@ -247,6 +405,7 @@ class User(UserBase):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     is_active: bool = False  # Requires admin approval
     is_approved: bool = False  # Approval status
 
@@ -256,9 +415,14 @@ class UserLogin(BaseModel):
 
 class TokenResponse(BaseModel):
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
+    expires_in: int = ACCESS_TOKEN_EXPIRE_MINUTES * 60
     user: dict
 
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
 # Caisson Model
 class CaissonBase(BaseModel):
     identifiant: str
@@ -276,6 +440,7 @@ class Caisson(CaissonBase):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 # Equipment Type Model (Dynamic types)
 class EquipmentTypeBase(BaseModel):
@@ -290,6 +455,7 @@ class EquipmentType(EquipmentTypeBase):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 # Equipment Model
 class EquipmentBase(BaseModel):
@@ -313,6 +479,7 @@ class Equipment(EquipmentBase):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 # Sub-Equipment Model (Sous-équipement)
 class SubEquipmentBase(BaseModel):
@@ -333,6 +500,7 @@ class SubEquipment(SubEquipmentBase):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 # Work Order Model
 class WorkOrderBase(BaseModel):
@@ -343,7 +511,7 @@ class WorkOrderBase(BaseModel):
     statut: str = Field(default="planifiee", description="planifiee, en_cours, terminee, annulee")
     caisson_id: Optional[str] = None
     equipment_id: Optional[str] = None
-    date_planifiee: str
+    date_planifiee: StoredDate
     periodicite_jours: Optional[int] = None
     # Pour les compresseurs - maintenance basée sur le compteur horaire
     periodicite_heures: Optional[int] = None  # Périodicité en heures de fonctionnement
@@ -359,13 +527,14 @@ class WorkOrder(WorkOrderBase):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 # Intervention Model
 class InterventionBase(BaseModel):
     work_order_id: Optional[str] = None  # Pour maintenance curative (ordre de travail)
     maintenance_preventive_id: Optional[str] = None  # Pour maintenance préventive (inspection)
     type_intervention: str = Field(default="curative", description="curative ou preventive")
-    date_intervention: str
+    date_intervention: StoredDate
     technicien: str
     actions_realisees: str
     observations: Optional[str] = None
@@ -381,6 +550,7 @@ class Intervention(InterventionBase):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 # Inspection (Contrôle réglementaire) Model
 PERIODICITES = {
@@ -402,7 +572,7 @@ class InspectionBase(BaseModel):
     caisson_id: Optional[str] = None
     equipment_id: Optional[str] = None
     date_realisation: Optional[str] = None
-    date_validite: Optional[str] = None  # Calculée automatiquement
+    date_validite: Optional[StoredDate] = None  # Calculée automatiquement
     organisme_certificateur: Optional[str] = None
     resultat: Optional[str] = None
     observations: Optional[str] = None
@@ -415,6 +585,7 @@ class Inspection(InspectionBase):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 # Spare Part Model
 class SparePartBase(BaseModel):
@@ -436,6 +607,8 @@ class SparePart(SparePartBase):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    is_low_stock: bool = False  # quantite_stock <= seuil_minimum, maintained on every stock write
 
 class SparePartUpdate(BaseModel):
     quantite_stock: Optional[int] = None
@@ -444,6 +617,527 @@ class SparePartUpdate(BaseModel):
     fournisseur: Optional[str] = None
     prix_unitaire: Optional[float] = None
 
+# Low-stock predicate evaluated by MongoDB; used as a pipeline update stage to keep is_low_stock in sync
+LOW_STOCK_EXPR = {"$lte": ["$quantite_stock", "$seuil_minimum"]}
+SET_LOW_STOCK = {"$set": {"is_low_stock": LOW_STOCK_EXPR}}
+
+# ==================== DATABASE INDEXES ====================
+
+# collection -> [(keys, options)], matching the query shapes used by the routes
+INDEX_SPECS = {
+    "users": [
+        ([("id", 1)], {"unique": True}),
+        ([("email", 1)], {"unique": True}),
+        ([("is_approved", 1), ("is_active", 1)], {}),
+    ],
+    "caisson": [
+        ([("id", 1)], {"unique": True}),
+        ([("updated_at", 1), ("_id", 1)], {}),
+    ],
+    "equipment_types": [
+        ([("id", 1)], {"unique": True}),
+        ([("code", 1)], {}),
+    ],
+    "equipments": [
+        ([("id", 1)], {"unique": True}),
+        ([("type", 1), ("_id", 1)], {}),
+        ([("statut", 1), ("_id", 1)], {}),
+        ([("criticite", 1), ("_id", 1)], {}),
+        ([("updated_at", 1), ("_id", 1)], {}),
+        ([("reference", 1)], {}),
+        ([("numero_serie", 1)], {}),
+        ([("reference", "text"), ("numero_serie", "text"), ("description", "text")],
+         {"name": "search_text", "default_language": "french", "weights": {"reference": 10, "numero_serie": 10}}),
+    ],
+    "subequipments": [
+        ([("id", 1)], {"unique": True}),
+        ([("parent_equipment_id", 1), ("_id", 1)], {}),
+        ([("reference", 1)], {}),
+        ([("numero_serie", 1)], {}),
+        ([("nom", "text"), ("reference", "text"), ("numero_serie", "text"), ("description", "text")],
+         {"name": "search_text", "default_language": "french", "weights": {"nom": 5, "reference": 10, "numero_serie": 10}}),
+    ],
+    "work_orders": [
+        ([("id", 1)], {"unique": True}),
+        ([("equipment_id", 1)], {}),
+        ([("statut", 1), ("date_planifiee", 1)], {}),
+        ([("statut", 1), ("_id", 1)], {}),
+        ([("type_maintenance", 1), ("_id", 1)], {}),
+        ([("priorite", 1), ("_id", 1)], {}),
+        ([("updated_at", 1), ("_id", 1)], {}),
+        ([("titre", "text"), ("description", "text")],
+         {"name": "search_text", "default_language": "french", "weights": {"titre": 10}}),
+    ],
+    "interventions": [
+        ([("id", 1)], {"unique": True}),
+        ([("work_order_id", 1), ("_id", 1)], {}),
+        ([("date_intervention", 1)], {}),
+        ([("updated_at", 1), ("_id", 1)], {}),
+    ],
+    "inspections": [
+        ([("id", 1)], {"unique": True}),
+        ([("date_validite", 1)], {}),
+        ([("updated_at", 1), ("_id", 1)], {}),
+    ],
+    "spare_parts": [
+        ([("id", 1)], {"unique": True}),
+        ([("equipment_type", 1), ("_id", 1)], {}),
+        ([("is_low_stock", 1), ("_id", 1)], {"partialFilterExpression": {"is_low_stock": True}}),
+        ([("reference_fabricant", 1)], {}),
+        ([("updated_at", 1), ("_id", 1)], {}),
+        ([("nom", "text"), ("reference_fabricant", "text"), ("fournisseur", "text"), ("emplacement", "text")],
+         {"name": "search_text", "default_language": "french", "weights": {"nom": 5, "reference_fabricant": 10}}),
+    ],
+    "alerts": [
+        ([("severity_rank", 1), ("_id", 1)], {}),
+    ],
+    "revoked_tokens": [
+        ([("user_id", 1)], {"unique": True}),
+        ([("expires_at", 1)], {"expireAfterSeconds": 0}),
+    ],
+    "export_jobs": [
+        ([("id", 1)], {"unique": True}),
+        ([("user_id", 1), ("status", 1)], {}),
+        ([("status", 1), ("expires_at", 1)], {}),
+        ([("status", 1), ("heartbeat_at", 1)], {}),
+        ([("finished_at", 1)], {"expireAfterSeconds": EXPORT_JOB_HISTORY_DAYS * 24 * 3600}),
+        # "<user id>:<n>" held by active jobs only: enforces EXPORT_JOBS_PER_USER across workers
+        ([("slot", 1)], {"unique": True, "partialFilterExpression": {"slot": {"$exists": True}}}),
+    ],
+    "tombstones": [
+        ([("collection", 1), ("deleted_at", 1), ("_id", 1)], {}),
+        ([("deleted_at", 1)], {"expireAfterSeconds": TOMBSTONE_RETENTION_DAYS * 24 * 3600}),
+    ],
+}
+
+async def backfill_low_stock_flags() -> int:
+    """Compute is_low_stock on spare parts written before the flag existed"""
+    result = await db.spare_parts.update_many({"is_low_stock": {"$exists": False}}, [SET_LOW_STOCK])
+    if result.modified_count:
+        logging.info(f"Computed is_low_stock on {result.modified_count} spare parts")
+    return result.modified_count
+
+# collection -> fields stored as BSON dates
+DATE_FIELDS = {
+    "work_orders": ["date_planifiee"],
+    "interventions": ["date_intervention"],
+    "inspections": ["date_validite"],
+}
+DATE_MIGRATION_BATCH_SIZE = 500
+
+async def migrate_date_fields() -> dict:
+    """Convert string dates of DATE_FIELDS to BSON dates in batches.
+
+    Each update only applies if the field still holds the string that was read, so the
+    migration can run while other workers serve requests. Unparseable values become null;
+    the original string is kept in `<field>_legacy` and logged.
+    """
+    migrated = {}
+    for coll_name, fields in DATE_FIELDS.items():
+        collection = db[coll_name]
+        for field in fields:
+            count = 0
+            while True:
+                batch = await collection.find(
+                    {field: {"$type": "string"}}, {field: 1}
+                ).limit(DATE_MIGRATION_BATCH_SIZE).to_list(DATE_MIGRATION_BATCH_SIZE)
+                if not batch:
+                    break
+                updates = []
+                for doc in batch:
+                    try:
+                        changes = {field: parse_date_value(doc[field])}
+                    except ValueError:
+                        logging.warning(f"Unparseable {coll_name}.{field} on {doc['_id']}: {doc[field]!r}")
+                        changes = {field: None, f"{field}_legacy": doc[field]}
+                    updates.append(UpdateOne({"_id": doc["_id"], field: doc[field]}, {"$set": changes}))
+                await collection.bulk_write(updates, ordered=False)
+                count += len(updates)
+                await asyncio.sleep(0)
+            if count:
+                migrated[f"{coll_name}.{field}"] = count
+                logging.info(f"Migrated {count} {coll_name}.{field} values to dates")
+    return migrated
+
+async def ensure_indexes() -> dict:
+    """Create every index of INDEX_SPECS that does not exist yet (idempotent)"""
+    created = {}
+    for coll_name, specs in INDEX_SPECS.items():
+        collection = db[coll_name]
+        existing = set((await collection.index_information()).keys())
+        for keys, options in specs:
+            try:
+                name = await collection.create_index(keys, **options)
+            except Exception as e:
+                logging.error(f"Could not create index {keys} on {coll_name}: {e}")
+                continue
+            if name not in existing:
+                created.setdefault(coll_name, []).append(name)
+    if created:
+        for coll_name, names in created.items():
+            logging.info(f"Created indexes on {coll_name}: {', '.join(names)}")
+    else:
+        logging.info("All indexes already exist")
+    return created
+
+# Filtered query shapes issued by the routes: (route, collection, filter, sort)
+QUERY_SHAPES = [
+    ("login / get_current_user", "users", {"email": "x@example.com"}, None),
+    ("get_current_user", "users", {"id": "x"}, None),
+    ("get_pending_users", "users", {"is_approved": False}, None),
+    ("get_technicians", "users", {"is_active": True, "is_approved": True}, None),
+    ("update_caisson", "caisson", {"id": "x"}, None),
+    ("create_equipment_type", "equipment_types", {"code": "x"}, None),
+    ("get_equipment_type", "equipment_types", {"id": "x"}, None),
+    ("get_equipment", "equipments", {"id": "x"}, None),
+    ("get_equipments?type", "equipments", {"type": "compresseur"}, {"_id": 1}),
+    ("get_equipments?statut", "equipments", {"statut": "hors_service"}, {"_id": 1}),
+    ("get_equipments?criticite", "equipments", {"criticite": "critique"}, {"_id": 1}),
+    ("get_subequipment", "subequipments", {"id": "x"}, None),
+    ("get_subequipments?parent_equipment_id", "subequipments", {"parent_equipment_id": "x"}, {"_id": 1}),
+    ("get_work_order", "work_orders", {"id": "x"}, None),
+    ("get_work_orders?statut", "work_orders", {"statut": "planifiee"}, {"_id": 1}),
+    ("get_work_orders?type_maintenance", "work_orders", {"type_maintenance": "preventive"}, {"_id": 1}),
+    ("get_work_orders?priorite", "work_orders", {"priorite": "urgente"}, {"_id": 1}),
+    ("get_alerts / get_upcoming_maintenance", "work_orders", {"statut": {"$in": ["planifiee", "en_cours"]}}, None),
+    ("update_compteur_horaire", "work_orders", {"equipment_id": "x", "periodicite_heures": {"$ne": None}, "statut": {"$in": ["planifiee", "terminee"]}}, None),
+    ("check_and_send_alerts", "work_orders", {"statut": "planifiee", "date_planifiee": {"$lte": datetime(2024, 1, 31, tzinfo=timezone.utc)}}, None),
+    ("generate_equipment_pdf", "work_orders", {"equipment_id": "x"}, None),
+    ("get_intervention", "interventions", {"id": "x"}, None),
+    ("get_interventions?work_order_id", "interventions", {"work_order_id": "x"}, {"_id": 1}),
+    ("generate_equipment_pdf", "interventions", {"work_order_id": {"$in": ["x", "y"]}}, None),
+    ("get_maintenance_report", "interventions", {"date_intervention": {"$gte": datetime(2024, 1, 1, tzinfo=timezone.utc), "$lte": datetime(2024, 12, 31, tzinfo=timezone.utc)}}, None),
+    ("get_statistics_report", "inspections", {"date_validite": {"$lt": datetime(2024, 1, 1, tzinfo=timezone.utc)}}, None),
+    ("generate_planning_pdf", "work_orders", {"statut": {"$in": ["planifiee", "en_cours"]}, "date_planifiee": {"$gte": datetime(2024, 1, 1, tzinfo=timezone.utc), "$lte": datetime(2024, 12, 31, tzinfo=timezone.utc)}}, {"date_planifiee": 1}),
+    ("get_upcoming_maintenance", "work_orders", {"statut": {"$in": ["planifiee", "en_cours"]}, "date_planifiee": {"$type": "date"}}, {"date_planifiee": 1}),
+    ("get_upcoming_maintenance?from&to", "work_orders", {"statut": {"$in": ["planifiee", "en_cours"]}, "date_planifiee": {"$type": "date", "$gte": datetime(2024, 1, 1, tzinfo=timezone.utc), "$lte": datetime(2024, 12, 31, tzinfo=timezone.utc)}}, {"date_planifiee": 1}),
+    ("get_maintenance_calendar", "work_orders", {"statut": {"$in": ["planifiee", "en_cours", "terminee"]}, "date_planifiee": {"$gte": datetime(2024, 1, 1, tzinfo=timezone.utc), "$lte": datetime(2024, 12, 31, tzinfo=timezone.utc)}}, {"date_planifiee": 1}),
+    ("get_inspection", "inspections", {"id": "x"}, None),
+    ("get_spare_part", "spare_parts", {"id": "x"}, None),
+    ("get_spare_parts?equipment_type", "spare_parts", {"equipment_type": "compresseur"}, {"_id": 1}),
+    ("get_spare_parts?low_stock", "spare_parts", {"is_low_stock": True}, {"_id": 1}),
+    ("get_alerts / check_and_send_alerts", "spare_parts", {"is_low_stock": True}, None),
+    ("revoke_user_tokens", "revoked_tokens", {"user_id": "x"}, None),
+    ("get_alerts", "alerts", {}, {"severity_rank": 1, "_id": 1}),
+    ("get_dashboard_summary", "work_orders", {"statut": "terminee", "date_planifiee": {"$gte": datetime(2024, 1, 1, tzinfo=timezone.utc)}}, None),
+    ("rebuild_alerts", "inspections", {"date_validite": {"$lte": datetime(2024, 1, 31, tzinfo=timezone.utc)}}, None),
+    ("rebuild_alerts", "work_orders", {"statut": {"$in": ["planifiee", "en_cours"]}, "date_planifiee": {"$lt": datetime(2024, 1, 1, tzinfo=timezone.utc)}}, None),
+    ("search (prefix)", "equipments", {"reference": {"$in": [re.compile("^CP")]}}, None),
+    ("search (prefix)", "equipments", {"numero_serie": {"$in": [re.compile("^SN")]}}, None),
+    ("search (prefix)", "subequipments", {"reference": {"$in": [re.compile("^CP")]}}, None),
+    ("search (prefix)", "subequipments", {"numero_serie": {"$in": [re.compile("^SN")]}}, None),
+    ("search (prefix)", "spare_parts", {"reference_fabricant": {"$in": [re.compile("^RF")]}}, None),
+    ("search (text)", "equipments", {"$text": {"$search": "compresseur"}}, None),
+    ("search (text)", "subequipments", {"$text": {"$search": "compresseur"}}, None),
+    ("search (text)", "spare_parts", {"$text": {"$search": "filtre"}}, None),
+    ("search (text)", "work_orders", {"$text": {"$search": "vidange"}}, None),
+    *[
+        ("export_changes", coll_name, {"updated_at": {"$gt": datetime(2024, 1, 1, tzinfo=timezone.utc), "$lte": datetime(2024, 1, 2, tzinfo=timezone.utc)}}, {"updated_at": 1, "_id": 1})
+        for coll_name in ("caisson", "equipments", "work_orders", "interventions", "inspections", "spare_parts")
+    ],
+    ("export_changes", "tombstones", {"collection": "equipments", "deleted_at": {"$gt": datetime(2024, 1, 1, tzinfo=timezone.utc), "$lte": datetime(2024, 1, 2, tzinfo=timezone.utc)}}, {"deleted_at": 1, "_id": 1}),
+]
+
+def plan_stages(plan: dict) -> List[str]:
+    """Flatten the stage names of an explain() plan tree"""
+    stages = [plan.get("stage", "?")]
+    children = [plan["inputStage"]] if "inputStage" in plan else []
+    children += plan.get("inputStages", [])
+    if "queryPlan" in plan:
+        children.append(plan["queryPlan"])
+    for child in children:
+        stages += plan_stages(child)
+    return stages
+
+async def explain_query_shapes() -> List[dict]:
+    """Run explain() on every QUERY_SHAPES entry and report its winning plan"""
+    results = []
+    for route, coll_name, query, sort in QUERY_SHAPES:
+        find_cmd = {"find": coll_name, "filter": query}
+        if sort:
+            find_cmd["sort"] = sort
+        explained = await db.command({"explain": find_cmd, "verbosity": "queryPlanner"})
+        stages = plan_stages(explained["queryPlanner"]["winningPlan"])
+        results.append({
+            "route": route,
+            "collection": coll_name,
+            "filter": json.loads(json.dumps(query, default=str)),
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages
+        })
+    return results
+
+# ==================== IN-PROCESS CACHES ====================
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a fixed TTL.
+
+    `generation` is bumped on every invalidation so a reader that started a DB
+    fetch before an invalidation can detect it and skip storing a stale value.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value, generation: Optional[int] = None):
+        if generation is not None and generation != self.generation:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key):
+        self.generation += 1
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self.generation += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+principal_cache = TTLCache(PRINCIPAL_CACHE_MAX_ENTRIES, PRINCIPAL_CACHE_TTL_SECONDS)
+
+def invalidate_principal(user_id: str):
+    """Drop a cached user document after its account or credentials changed"""
+    principal_cache.invalidate(user_id)
+
+class ResponseCache(TTLCache):
+    """LRU cache of GET responses, bounded by entry count and approximate size in bytes.
+
+    Every collection has a generation counter that the write routes bump (see
+    `invalidates`). An entry remembers the generations of its source collections
+    at the time it was computed and is dropped as soon as one of them moves. The
+    TTL only bounds staleness for what the write events do not cover (the
+    current date, events lost while the invalidation bus is unavailable).
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, max_bytes: int):
+        super().__init__(max_entries, ttl_seconds)
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.stale = 0
+        self.collection_generations = {}
+        self.route_stats = {}
+
+    def snapshot(self, collections: tuple) -> tuple:
+        return tuple(self.collection_generations.get(name, 0) for name in collections)
+
+    def bump(self, *collections):
+        for name in collections:
+            self.collection_generations[name] = self.collection_generations.get(name, 0) + 1
+
+    def _drop(self, key):
+        _, (_, size, _) = self._entries.pop(key)
+        self.bytes -= size
+
+    def lookup(self, key, collections: tuple):
+        route_stats = self.route_stats.setdefault(key[0], {"hits": 0, "misses": 0})
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, (snapshot, _, value) = entry
+            if expires_at > time.monotonic() and snapshot == self.snapshot(collections):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                route_stats["hits"] += 1
+                return value
+            self._drop(key)
+            self.stale += 1
+        self.misses += 1
+        route_stats["misses"] += 1
+        return None
+
+    def store(self, key, collections: tuple, snapshot: tuple, value, size: int):
+        # A write landed while the value was being computed: it may already be stale
+        if snapshot != self.snapshot(collections) or size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, (snapshot, size, value))
+        self.bytes += size
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def clear(self):
+        super().clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "stale": self.stale,
+            "generations": dict(self.collection_generations),
+            "routes": {
+                route: {**counts, "hit_rate": round(counts["hits"] / (counts["hits"] + counts["misses"]), 4)}
+                for route, counts in self.route_stats.items()
+            }
+        }
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL_SECONDS, RESPONSE_CACHE_MAX_BYTES)
+
+# Response headers stored with a cached value and replayed on hits
+CACHED_RESPONSE_HEADERS = ("X-Next-Cursor", "X-Total-Count", "X-Total-Count-Capped", "ETag")
+
+def invalidates(*collections):
+    """Decorator for write routes: publish an invalidation event for each of `collections`.
+
+    The event id is the route's path identifier (`<name>_id`), None for creations.
+    """
+    def decorator(route):
+        @functools.wraps(route)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await route(*args, **kwargs)
+            finally:
+                item_id = next((v for k, v in kwargs.items() if k.endswith("_id") and isinstance(v, str)), None)
+                for name in collections:
+                    await publish_invalidation(name, item_id)
+        return wrapper
+    return decorator
+
+def response_size(value) -> int:
+    if isinstance(value, Response):
+        return len(value.body)
+    return len(json.dumps(value, default=str))
+
+async def cached_response(request: Request, user: dict, collections: tuple, compute, response: Optional[Response] = None):
+    """Serve a GET from `response_cache`, keyed by route, path and query parameters and role.
+
+    `compute` is only awaited on a miss; the headers it sets on `response` are cached with the value.
+    """
+    key = (
+        request.scope["route"].path,
+        tuple(sorted(request.path_params.items())),
+        tuple(sorted((name, value) for name, value in request.query_params.multi_items() if value != "")),
+        user.get("role")
+    )
+    cached = response_cache.lookup(key, collections)
+    if cached is not None:
+        value, headers = cached
+        if response is not None:
+            response.headers.update(headers)
+            if "ETag" in headers:
+                check_not_modified(request, response, headers["ETag"])
+        return value
+    snapshot = response_cache.snapshot(collections)
+    value = await compute()
+    headers = {}
+    if response is not None:
+        headers = {name: response.headers[name] for name in CACHED_RESPONSE_HEADERS if name in response.headers}
+    response_cache.store(key, collections, snapshot, (value, headers), response_size(value))
+    return value
+
+# ==================== INVALIDATION BUS ====================
+
+# Identifies the events this process published, which it has already applied
+WORKER_ID = uuid.uuid4().hex
+invalidation_bus_stats = {"published": 0, "received": 0, "publish_errors": 0, "listener_errors": 0}
+
+async def apply_invalidation(collection: str, item_id: Optional[str] = None):
+    """Drop what the local caches hold for (collection, item_id); no id means the whole collection"""
+    response_cache.bump(collection)
+    if collection == "users":
+        if item_id:
+            principal_cache.invalidate(item_id)
+        else:
+            principal_cache.clear()
+    elif collection == "revoked_tokens" and item_id:
+        await sync_revocation(item_id)
+
+async def publish_invalidation(collection: str, item_id: Optional[str] = None):
+    """Apply an invalidation locally and broadcast it to the other workers"""
+    await apply_invalidation(collection, item_id)
+    if not INVALIDATION_BUS_ENABLED:
+        return
+    try:
+        await db.cache_events.insert_one({
+            "origin": WORKER_ID,
+            "collection": collection,
+            "id": item_id,
+            "at": datetime.now(timezone.utc)
+        })
+        invalidation_bus_stats["published"] += 1
+    except Exception as e:
+        # Other workers fall back on the cache TTLs and the periodic revocation sync
+        invalidation_bus_stats["publish_errors"] += 1
+        logging.error(f"Could not publish invalidation of {collection}/{item_id}: {e}")
+
+async def ensure_invalidation_bus():
+    """Create the capped event collection and return the id to start tailing after"""
+    try:
+        await db.create_collection("cache_events", capped=True, size=INVALIDATION_BUS_SIZE_BYTES)
+    except CollectionInvalid:
+        # Already created, by another worker or implicitly by a write made before the first
+        # startup (e.g. restore_backup.py); tailable cursors need it capped
+        if not (await db.cache_events.options()).get("capped"):
+            logger.warning("cache_events is not capped, converting it")
+            try:
+                await db.command("convertToCapped", "cache_events", size=INVALIDATION_BUS_SIZE_BYTES)
+            except Exception:
+                # another worker may have converted it meanwhile
+                if not (await db.cache_events.options()).get("capped"):
+                    raise
+    # A tailable cursor on an empty capped collection dies at once: start from a marker event
+    marker = await db.cache_events.insert_one({
+        "origin": WORKER_ID, "collection": None, "id": None, "at": datetime.now(timezone.utc)
+    })
+    return marker.inserted_id
+
+async def listen_invalidations(last_id):
+    """Tail cache_events and apply the events published by the other workers"""
+    while True:
+        try:
+            cursor = db.cache_events.find({"_id": {"$gt": last_id}}, cursor_type=CursorType.TAILABLE_AWAIT)
+            while cursor.alive:
+                async for event in cursor:
+                    last_id = event["_id"]
+                    if event["origin"] == WORKER_ID or not event["collection"]:
+                        continue
+                    invalidation_bus_stats["received"] += 1
+                    await apply_invalidation(event["collection"], event.get("id"))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            invalidation_bus_stats["listener_errors"] += 1
+            logging.error(f"Invalidation listener failed: {e}")
+        # Cursor killed (capped collection wrapped around, failover...): re-open after the last event seen
+        await asyncio.sleep(INVALIDATION_BUS_RETRY_SECONDS)
+
 # ==================== AUTH HELPERS ====================
 
 def hash_password(password: str) -> str:
@@ -452,39 +1146,178 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+class PasswordHashPool:
+    """Bounded worker pool for bcrypt so hashing never blocks the event loop.
+
+    At most `workers` hashes run at once and at most `max_queue` more may wait;
+    anything beyond that is refused with 503 + Retry-After.
+    """
+
+    def __init__(self, workers: int, max_queue: int, retry_after_seconds: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retry_after_seconds = retry_after_seconds
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+
+    async def run(self, fn, *args):
+        if self.pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Serveur occupé, veuillez réessayer dans quelques instants",
+                headers={"Retry-After": str(self.retry_after_seconds)}
+            )
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+password_hash_pool = PasswordHashPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE, PASSWORD_HASH_RETRY_AFTER_SECONDS)
+
+async def hash_password_async(password: str) -> str:
+    return await password_hash_pool.run(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+def token_claims(user: dict) -> dict:
+    """Authorization claims embedded in access tokens"""
+    return {
+        "sub": user["id"],
+        "email": user["email"],
+        "role": user["role"],
+        "is_active": user.get("is_active", False),
+        "is_approved": user.get("is_approved", False)
+    }
+
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(hours=JWT_EXPIRATION_HOURS)
-    to_encode.update({"exp": expire})
+    now = datetime.now(timezone.utc)
+    expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    # Sub-second iat so a token issued right after a revocation stays valid
+    to_encode.update({"type": "access", "iat": now.timestamp(), "exp": expire})
     return jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def create_refresh_token(user_id: str) -> str:
+    now = datetime.now(timezone.utc)
+    expire = now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    to_encode = {"sub": user_id, "type": "refresh", "jti": str(uuid.uuid4()), "iat": now.timestamp(), "exp": expire}
+    return jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+# Revocation set: user_id -> (revoked_at, expires_at) as POSIX timestamps.
+# Access tokens issued before revoked_at are refused. Mirrors the
+# revoked_tokens TTL collection so the hot path never queries Mongo.
+revoked_principals = {}
+
+async def revoke_user_tokens(user_id: str):
+    """Refuse every access token issued so far to this user"""
+    revoked_at = time.time()
+    expires_at = revoked_at + ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    revoked_principals[user_id] = (revoked_at, expires_at)
+    await db.revoked_tokens.update_one(
+        {"user_id": user_id},
+        {"$set": {"revoked_at": revoked_at, "expires_at": datetime.fromtimestamp(expires_at, timezone.utc)}},
+        upsert=True
+    )
+    await publish_invalidation("revoked_tokens", user_id)
+
+def mirror_revocation(entry: dict):
+    expires_at = entry["expires_at"]
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    current = revoked_principals.get(entry["user_id"])
+    if current is None or current[0] < entry["revoked_at"]:
+        revoked_principals[entry["user_id"]] = (entry["revoked_at"], expires_at.timestamp())
+
+async def sync_revocations():
+    """Reload the in-memory revocation mirror from the revoked_tokens collection"""
+    now = datetime.now(timezone.utc)
+    entries = await db.revoked_tokens.find({"expires_at": {"$gt": now}}, {"_id": 0}).to_list(None)
+    for entry in entries:
+        mirror_revocation(entry)
+
+async def sync_revocation(user_id: str):
+    """Reload the revocation of one user (pushed by the invalidation bus)"""
+    entry = await db.revoked_tokens.find_one({"user_id": user_id}, {"_id": 0})
+    if entry:
+        mirror_revocation(entry)
+
+def is_token_revoked(payload: dict) -> bool:
+    entry = revoked_principals.get(payload.get("sub"))
+    if entry is None:
+        return False
+    revoked_at, expires_at = entry
+    if expires_at <= time.time():
+        revoked_principals.pop(payload.get("sub"), None)
+        return False
+    return payload.get("iat", 0) < revoked_at
+
+def decode_access_token(token: str) -> dict:
     try:
-        payload = jwt.decode(credentials.credentials, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Token invalide")
-        user = await db.users.find_one({"id": user_id}, {"_id": 0})
-        if user is None:
-            raise HTTPException(status_code=401, detail="Utilisateur non trouvé")
-        return user
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expiré")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Token invalide")
+    if payload.get("sub") is None or payload.get("type", "access") != "access":
+        raise HTTPException(status_code=401, detail="Token invalide")
+    if is_token_revoked(payload):
+        raise HTTPException(status_code=401, detail="Token révoqué")
+    return payload
+
+async def get_token_principal(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Authenticated principal built from the token claims only (no DB access)"""
+    payload = decode_access_token(credentials.credentials)
+    return {
+        "id": payload["sub"],
+        "email": payload.get("email"),
+        "role": payload.get("role"),
+        "is_active": payload.get("is_active", False),
+        "is_approved": payload.get("is_approved", False)
+    }
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    payload = decode_access_token(credentials.credentials)
+    user_id = payload["sub"]
+    user = principal_cache.get(user_id)
+    if user is None:
+        generation = principal_cache.generation
+        user = await db.users.find_one({"id": user_id}, {"_id": 0})
+        if user is None:
+            raise HTTPException(status_code=401, detail="Utilisateur non trouvé")
+        principal_cache.set(user_id, user, generation)
+    return dict(user)
 
-async def require_admin(current_user: dict = Depends(get_current_user)):
+async def require_admin(current_user: dict = Depends(get_token_principal)):
     if current_user.get("role") != "admin":
         raise HTTPException(status_code=403, detail="Accès réservé aux administrateurs")
     return current_user
 
-async def require_technicien_or_admin(current_user: dict = Depends(get_current_user)):
+async def require_technicien_or_admin(current_user: dict = Depends(get_token_principal)):
     """Allow admin and technicien roles - can create/modify but technicien cannot delete"""
     if current_user.get("role") not in ["admin", "technicien"]:
         raise HTTPException(status_code=403, detail="Accès réservé aux administrateurs et techniciens")
     return current_user
 
-async def require_active_user(current_user: dict = Depends(get_current_user)):
+async def require_active_user(current_user: dict = Depends(get_token_principal)):
     """Ensure user is active and approved"""
     if not current_user.get("is_active") or not current_user.get("is_approved"):
         raise HTTPException(status_code=403, detail="Compte non activé. Veuillez contacter l'administrateur.")
@@ -502,9 +1335,504 @@ def can_export(user: dict) -> bool:
     """Only admin and technicien can export"""
     return user.get("role") in ["admin", "technicien"]
 
+# ==================== PAGINATION ====================
+
+def encode_cursor(last_id: ObjectId) -> str:
+    return base64.urlsafe_b64encode(last_id.binary).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> ObjectId:
+    try:
+        return ObjectId(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (InvalidId, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+
+async def paginate(
+    response: Response,
+    collection,
+    query: dict,
+    cursor: Optional[str],
+    limit: Optional[int],
+    count: bool = False,
+    projection: Optional[dict] = None
+) -> List[dict]:
+    """Return one keyset page of `collection` ordered by _id.
+
+    The cursor of the next page is sent in the X-Next-Cursor header (absent on
+    the last page). With `count`, X-Total-Count holds the number of matching
+    documents, capped at MAX_COUNT (X-Total-Count-Capped is then set).
+    """
+    limit = limit or DEFAULT_PAGE_SIZE
+    page_query = dict(query)
+    if cursor:
+        page_query["_id"] = {"$gt": decode_cursor(cursor)}
+
+    docs = await collection.find(page_query, projection).sort("_id", 1).limit(limit + 1).to_list(limit + 1)
+    if len(docs) > limit:
+        docs = docs[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(docs[-1]["_id"])
+    for doc in docs:
+        del doc["_id"]
+
+    if count:
+        if query:
+            total = await collection.count_documents(query, limit=MAX_COUNT)
+            if total >= MAX_COUNT:
+                response.headers["X-Total-Count-Capped"] = "true"
+        else:
+            total = await collection.estimated_document_count()
+        response.headers["X-Total-Count"] = str(total)
+    return docs
+
+# ==================== SPARSE FIELDSETS ====================
+
+def parse_fields(fields: Optional[str], model) -> Optional[tuple]:
+    """Validate a comma-separated `fields` parameter against `model`; `id` is always included"""
+    if not fields:
+        return None
+    names = ["id"]
+    for name in fields.split(","):
+        name = name.strip()
+        if name and name not in names:
+            names.append(name)
+    unknown = [n for n in names if n not in model.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Champs inconnus: {', '.join(unknown)}")
+    return tuple(names)
+
+def fields_projection(names: Optional[tuple], extra: tuple = ()) -> Optional[dict]:
+    """Mongo inclusion projection for the selected fields (None when no selection)"""
+    if not names:
+        return None
+    return {name: 1 for name in names + extra}
+
+@functools.lru_cache(maxsize=256)
+def trimmed_model(model, names: tuple):
+    """Response model restricted to `names`, keeping the original field definitions"""
+    return create_model(
+        f"{model.__name__}Fields",
+        __config__=ConfigDict(extra="ignore"),
+        **{name: (model.model_fields[name].annotation, model.model_fields[name]) for name in names}
+    )
+
+def sparse_response(data, model, names: tuple, response: Optional[Response] = None) -> JSONResponse:
+    """Serialize `data` (a document or a list of documents) with the trimmed model of `names`"""
+    subset = trimmed_model(model, names)
+    if isinstance(data, list):
+        content = [subset.model_validate(doc).model_dump(mode="json") for doc in data]
+    else:
+        content = subset.model_validate(data).model_dump(mode="json")
+    headers = dict(response.headers) if response is not None else None
+    return JSONResponse(content=content, headers=headers)
+
+# ==================== FAST JSON RESPONSES ====================
+
+def model_projection(model, names: Optional[tuple] = None) -> dict:
+    """Inclusion projection on the fields of `model` (or on `names`)"""
+    return {name: 1 for name in names or model.model_fields}
+
+def json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat().replace("+00:00", "Z")
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+def encode_json(value) -> bytes:
+    """Compact JSON encoding; UTC datetimes end in "Z" like pydantic's output"""
+    if orjson is not None:
+        return orjson.dumps(value, default=str, option=orjson.OPT_UTC_Z)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=json_default).encode()
+
+def trusted_json_response(docs: List[dict], collection: str, response: Response) -> Response:
+    """Encode documents read from Mongo as they are, without response_model validation.
+
+    The StoredDate fields ("YYYY-MM-DD") and the created_at strings written with isoformat()
+    ("...+00:00" instead of "...Z") are converted like the validated output. Missing fields
+    and key order are not, so the output only matches it for complete documents.
+    """
+    for name in DATE_FIELDS.get(collection, ()):
+        for doc in docs:
+            if name in doc:
+                doc[name] = format_date_value(doc[name])
+    for doc in docs:
+        created_at = doc.get("created_at")
+        if isinstance(created_at, str) and created_at.endswith("+00:00"):
+            doc["created_at"] = created_at[:-6] + "Z"
+    return Response(encode_json(docs), media_type="application/json", headers=dict(response.headers))
+
+async def list_response(response: Response, collection, model, query: dict, cursor: Optional[str],
+                        limit: Optional[int], count: bool, names: Optional[tuple]):
+    """One page of `collection` for a list route, trimmed to `names` when given"""
+    if FAST_JSON_RESPONSES:
+        docs = await paginate(response, collection, query, cursor, limit, count, model_projection(model, names))
+        return trusted_json_response(docs, collection.name, response)
+    docs = await paginate(response, collection, query, cursor, limit, count, fields_projection(names))
+    if names:
+        return sparse_response(docs, model, names, response)
+    return docs
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+class CompressionMiddleware:
+    """Compress JSON and text responses of at least `minimum_size` bytes.
+
+    Uses brotli when it is installed and accepted by the client, gzip otherwise.
+    Streamed bodies and responses that already have a Content-Encoding are left as is.
+    """
+
+    def __init__(self, app, minimum_size: int):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = Headers(scope=scope).get("accept-encoding", "")
+        encoding = "br" if brotli is not None and "br" in accept else "gzip" if "gzip" in accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        
+        start = None
+        
+        async def send_compressed(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if start is None:
+                await send(message)
+                return
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            if (message.get("more_body") or "content-encoding" in headers or len(body) < self.minimum_size
+                    or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)):
+                await send(start)
+                start = None
+                await send(message)
+                return
+            compress = (functools.partial(brotli.compress, quality=BROTLI_QUALITY) if encoding == "br"
+                        else functools.partial(gzip.compress, compresslevel=GZIP_LEVEL))
+            if len(body) >= COMPRESSION_THREAD_BYTES:
+                body = await asyncio.to_thread(compress, body)
+            else:
+                body = compress(body)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            start = None
+            await send({**message, "body": body})
+        
+        await self.app(scope, receive, send_compressed)
+
+# ==================== CONDITIONAL REQUESTS ====================
+
+# Collections whose documents carry an `updated_at` maintained by the write routes
+TIMESTAMPED_COLLECTIONS = ("users", "caisson", "equipment_types", "equipments", "subequipments",
+                           "work_orders", "interventions", "inspections", "spare_parts")
+
+def touch(update):
+    """Add `updated_at = now` to an update document or an update pipeline"""
+    if isinstance(update, list):
+        return update + [{"$set": {"updated_at": "$$NOW"}}]
+    return {**update, "$currentDate": {"updated_at": True}}
+
+async def backfill_updated_at():
+    """Give an `updated_at` to documents written before it was maintained"""
+    for coll_name in TIMESTAMPED_COLLECTIONS:
+        result = await db[coll_name].update_many({"updated_at": {"$exists": False}}, {"$currentDate": {"updated_at": True}})
+        if result.modified_count:
+            logging.info(f"Set updated_at on {result.modified_count} {coll_name}")
+
+async def record_deletions(collection: str, ids: List[str]):
+    """Tombstones of deleted documents, so delta exports (/export/changes) can report them"""
+    if ids:
+        now = datetime.now(timezone.utc)
+        await db.tombstones.insert_many([{"collection": collection, "id": item_id, "deleted_at": now} for item_id in ids])
+
+def weak_etag(request: Request, *parts) -> str:
+    """Weak validator of `parts` for this path and query string"""
+    variant = (request.url.path, sorted(request.query_params.multi_items()), parts)
+    return 'W/"' + hashlib.sha1(json.dumps(variant, default=str).encode()).hexdigest()[:24] + '"'
+
+def check_not_modified(request: Request, response: Response, etag: str):
+    """Set the ETag header; answer 304 (no body) when If-None-Match already has it"""
+    response.headers["ETag"] = etag
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]):
+        raise HTTPException(status_code=304, headers={"ETag": etag})
+
+async def list_etag(request: Request, collection, query: dict) -> str:
+    """ETag of a list: number of matching documents and their latest `updated_at`"""
+    stats = await collection.aggregate([
+        {"$match": query},
+        {"$group": {"_id": None, "count": {"$sum": 1}, "updated_at": {"$max": "$updated_at"}}}
+    ]).to_list(1)
+    if not stats:
+        return weak_etag(request, 0, None)
+    return weak_etag(request, stats[0]["count"], stats[0]["updated_at"])
+
+def document_etag(request: Request, document: Optional[dict]) -> str:
+    document = document or {}
+    return weak_etag(request, document.get("id"), document.get("updated_at"))
+
+# ==================== DASHBOARD COUNTERS ====================
+
+COUNTERS_ID = "dashboard"
+
+def statut_key(collection: str, statut) -> str:
+    """Counter field of a statut value (field names cannot contain dots or start with $)"""
+    return f"{collection}.statut.{str(statut).replace('.', '_').replace('$', '_')}"
+
+def statut_delta(collection: str, old, new) -> dict:
+    """$inc deltas moving one document from statut `old` to `new`"""
+    if old == new:
+        return {}
+    return {statut_key(collection, old): -1, statut_key(collection, new): 1}
+
+async def bump_counters(inc: dict):
+    """Apply $inc deltas to the dashboard counters document (and bump its version)"""
+    inc = {k: v for k, v in inc.items() if v}
+    if inc:
+        await db.counters.update_one({"_id": COUNTERS_ID}, {"$inc": {**inc, "version": 1}}, upsert=True)
+
+async def compute_dashboard_counters() -> dict:
+    """Recount the dashboard counters from the collections"""
+    by_statut = [{"$group": {"_id": "$statut", "count": {"$sum": 1}}}]
+    equipment_groups, work_order_groups, spare_part_totals = await asyncio.gather(
+        db.equipments.aggregate(by_statut).to_list(None),
+        db.work_orders.aggregate(by_statut).to_list(None),
+        db.spare_parts.aggregate([
+            {"$group": {
+                "_id": None,
+                "total": {"$sum": 1},
+                "low_stock": {"$sum": {"$cond": [{"$eq": ["$is_low_stock", True]}, 1, 0]}}
+            }}
+        ]).to_list(1)
+    )
+    counters = {}
+    for coll_name, groups in (("equipments", equipment_groups), ("work_orders", work_order_groups)):
+        statuts = {}
+        for group in groups:
+            name = statut_key(coll_name, group["_id"]).split(".", 2)[2]
+            statuts[name] = statuts.get(name, 0) + group["count"]
+        counters[coll_name] = {"total": sum(statuts.values()), "statut": statuts}
+    totals = spare_part_totals[0] if spare_part_totals else {"total": 0, "low_stock": 0}
+    counters["spare_parts"] = {"total": totals["total"], "low_stock": totals["low_stock"]}
+    return counters
+
+RECONCILE_ATTEMPTS = 3
+
+async def reconcile_counters() -> dict:
+    """Overwrite the counters document with a full recount, logging any drift.
+
+    The replace is guarded by the document version read before the recount, so a
+    bump_counters landing meanwhile is never overwritten: the recount is retried,
+    and after RECONCILE_ATTEMPTS busy rounds the maintained values are kept.
+    """
+    for _ in range(RECONCILE_ATTEMPTS):
+        current = await db.counters.find_one({"_id": COUNTERS_ID}, {"_id": 0, "reconciled_at": 0})
+        counters = await compute_dashboard_counters()
+        version = (current or {}).pop("version", None)
+        for coll_counters in (current or {}).values():
+            # statuts decremented to zero stay in the maintained document
+            if "statut" in coll_counters:
+                coll_counters["statut"] = {k: v for k, v in coll_counters["statut"].items() if v}
+        if current is not None and current != counters:
+            logging.warning(f"Dashboard counters drifted: {current} -> {counters}")
+        replacement = {**counters, "version": (version or 0) + 1, "reconciled_at": datetime.now(timezone.utc).isoformat()}
+        try:
+            if current is None:
+                result = await db.counters.replace_one({"_id": COUNTERS_ID}, replacement, upsert=True)
+            else:
+                result = await db.counters.replace_one({"_id": COUNTERS_ID, "version": version}, replacement)
+        except DuplicateKeyError:
+            # created by a concurrent bump_counters
+            continue
+        if result.matched_count or result.upserted_id is not None:
+            return counters
+    logging.warning("Dashboard counters changed during every reconciliation attempt; keeping maintained values")
+    return counters
+
+async def update_spare_part_stock(spare_part_id: str, pipeline: list) -> Tuple[Optional[dict], Optional[dict]]:
+    """Apply an update pipeline to a spare part and move the low-stock counter.
+
+    `pipeline` ends with SET_LOW_STOCK. The update is conditioned on the stock and
+    is_low_stock values read just before (retried if a concurrent write changed them),
+    so the counter delta comes from the stored flag of the pre- and post-images.
+    Returns (before, after), both None when the part does not exist.
+    """
+    while True:
+        before = await db.spare_parts.find_one({"id": spare_part_id}, {"_id": 0, "is_low_stock": 1, "quantite_stock": 1})
+        if not before:
+            return None, None
+        was_low = bool(before.get("is_low_stock"))
+        after = await db.spare_parts.find_one_and_update(
+            {
+                "id": spare_part_id,
+                "quantite_stock": before.get("quantite_stock"),
+                "is_low_stock": True if was_low else {"$ne": True}
+            },
+            touch(pipeline),
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+        if after:
+            await bump_counters({"spare_parts.low_stock": int(bool(after.get("is_low_stock"))) - int(was_low)})
+            return before, after
+
+# ==================== ALERT INDEX ====================
+
+# Alerts are persisted in db.alerts (one per item, _id "<item_type>:<item_id>"), refreshed by the
+# write routes and rebuilt daily because inspection and work order alerts depend on the date
+ALERT_SEVERITY_RANK = {"critical": 0, "warning": 1, "info": 2}
+ALERT_WARNING_DAYS = 30
+ALERTS_VERSION_ID = "alerts"
+
+def spare_part_alert(part: dict, today) -> Optional[dict]:
+    if not part.get("is_low_stock"):
+        return None
+    return {
+        "type": "stock_bas",
+        "severity": "warning",
+        "title": f"Stock bas: {part['nom']}",
+        "description": f"Quantité: {part['quantite_stock']} / Seuil: {part['seuil_minimum']}",
+        "item_id": part["id"],
+        "item_type": "spare_part"
+    }
+
+def inspection_alert(inspection: dict, today) -> Optional[dict]:
+    expiry_date = to_date(inspection.get("date_validite"))
+    if not expiry_date:
+        return None
+    days_until_expiry = (expiry_date - today).days
+    if days_until_expiry < 0:
+        return {
+            "type": "controle_expire",
+            "severity": "critical",
+            "title": f"Contrôle expiré: {inspection['titre']}",
+            "description": f"Expiré depuis {abs(days_until_expiry)} jours",
+            "item_id": inspection["id"],
+            "item_type": "inspection"
+        }
+    if days_until_expiry <= ALERT_WARNING_DAYS:
+        return {
+            "type": "controle_proche",
+            "severity": "warning",
+            "title": f"Contrôle à renouveler: {inspection['titre']}",
+            "description": f"Expire dans {days_until_expiry} jours",
+            "item_id": inspection["id"],
+            "item_type": "inspection"
+        }
+    return None
+
+def work_order_alert(wo: dict, today) -> Optional[dict]:
+    if wo.get("statut") not in ("planifiee", "en_cours"):
+        return None
+    planned_date = to_date(wo.get("date_planifiee"))
+    if not planned_date or planned_date >= today:
+        return None
+    days_overdue = (today - planned_date).days
+    return {
+        "type": "maintenance_retard",
+        "severity": "critical" if days_overdue > 7 else "warning",
+        "title": f"Maintenance en retard: {wo['titre']}",
+        "description": f"En retard de {days_overdue} jours",
+        "item_id": wo["id"],
+        "item_type": "work_order"
+    }
+
+def equipment_alert(eq: dict, today) -> Optional[dict]:
+    if eq.get("statut") != "hors_service":
+        return None
+    return {
+        "type": "equipement_hs",
+        "severity": "critical",
+        "title": f"Équipement hors service: {eq['type']}",
+        "description": f"Réf: {eq['reference']} - S/N: {eq['numero_serie']}",
+        "item_id": eq["id"],
+        "item_type": "equipment"
+    }
+
+# item_type -> (collection, alert builder)
+ALERT_SOURCES = {
+    "spare_part": ("spare_parts", spare_part_alert),
+    "inspection": ("inspections", inspection_alert),
+    "work_order": ("work_orders", work_order_alert),
+    "equipment": ("equipments", equipment_alert),
+}
+
+def alert_document(alert: dict) -> dict:
+    return {
+        "_id": f"{alert['item_type']}:{alert['item_id']}",
+        "severity_rank": ALERT_SEVERITY_RANK.get(alert["severity"], 3),
+        **alert
+    }
+
+async def bump_alerts_version():
+    """Change the alerts ETag"""
+    await db.counters.update_one({"_id": ALERTS_VERSION_ID}, {"$inc": {"version": 1}}, upsert=True)
+
+async def refresh_item_alert(item_type: str, item_id: str):
+    """Recompute the alert of one item after a write; removes it when the item is gone or healthy"""
+    coll_name, build_alert = ALERT_SOURCES[item_type]
+    item = await db[coll_name].find_one({"id": item_id}, {"_id": 0})
+    alert = build_alert(item, datetime.now(timezone.utc).date()) if item else None
+    key = f"{item_type}:{item_id}"
+    if alert:
+        result = await db.alerts.replace_one({"_id": key}, alert_document(alert), upsert=True)
+        changed = result.modified_count or result.upserted_id is not None
+    else:
+        changed = (await db.alerts.delete_one({"_id": key})).deleted_count
+    if changed:
+        await bump_alerts_version()
+
+async def rebuild_alerts() -> int:
+    """Recompute every alert from the collections (daily roll-over of date-driven alerts)"""
+    today = datetime.now(timezone.utc).date()
+    candidates = {
+        "spare_part": db.spare_parts.find({"is_low_stock": True}, {"_id": 0}),
+        "inspection": db.inspections.find(
+            {"date_validite": {"$lte": day_start(today + timedelta(days=ALERT_WARNING_DAYS))}}, {"_id": 0}
+        ),
+        "work_order": db.work_orders.find(
+            {"statut": {"$in": ["planifiee", "en_cours"]}, "date_planifiee": {"$lt": day_start(today)}}, {"_id": 0}
+        ),
+        "equipment": db.equipments.find({"statut": "hors_service"}, {"_id": 0}),
+    }
+    docs = []
+    for item_type, cursor in candidates.items():
+        build_alert = ALERT_SOURCES[item_type][1]
+        async for item in cursor:
+            alert = build_alert(item, today)
+            if alert:
+                docs.append(alert_document(alert))
+
+    await db.alerts.delete_many({"_id": {"$nin": [doc["_id"] for doc in docs]}})
+    if docs:
+        await db.alerts.bulk_write([ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in docs], ordered=False)
+    await bump_alerts_version()
+    logging.info(f"Rebuilt alert index: {len(docs)} alerts")
+    return len(docs)
+
+def encode_alert_cursor(alert: dict) -> str:
+    raw = f"{alert['severity_rank']}:{alert['_id']}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_alert_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        rank, key = raw.split(":", 1)
+        return int(rank), key
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+
 # ==================== AUTH ROUTES ====================
 
 @api_router.post("/auth/register", response_model=dict)
+@invalidates("users")
 async def register(user_data: UserCreate):
     existing = await db.users.find_one({"email": user_data.email})
     if existing:
@@ -527,7 +1855,7 @@ async def register(user_data: UserCreate):
     user_obj = User(**user_dict)
     
     doc = user_obj.model_dump()
-    doc["password_hash"] = hash_password(password)
+    doc["password_hash"] = await hash_password_async(password)
     doc["created_at"] = doc["created_at"].isoformat()
     
     await db.users.insert_one(doc)
@@ -540,18 +1868,20 @@ async def register(user_data: UserCreate):
             "user": {"id": user_obj.id, "email": user_obj.email, "nom": user_obj.nom, "prenom": user_obj.prenom}
         }
     
-    token = create_access_token({"sub": user_obj.id, "email": user_obj.email, "role": user_obj.role})
+    token = create_access_token(token_claims(doc))
     
     return {
         "access_token": token,
+        "refresh_token": create_refresh_token(user_obj.id),
         "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
         "user": {"id": user_obj.id, "email": user_obj.email, "nom": user_obj.nom, "prenom": user_obj.prenom, "role": user_obj.role}
     }
 
 @api_router.post("/auth/login", response_model=TokenResponse)
 async def login(credentials: UserLogin):
     user = await db.users.find_one({"email": credentials.email}, {"_id": 0})
-    if not user or not verify_password(credentials.password, user.get("password_hash", "")):
+    if not user or not await verify_password_async(credentials.password, user.get("password_hash", "")):
         raise HTTPException(status_code=401, detail="Email ou mot de passe incorrect")
     
     # Check if user is approved and active
@@ -561,10 +1891,39 @@ async def login(credentials: UserLogin):
     if not user.get("is_active", False):
         raise HTTPException(status_code=403, detail="Votre compte a été suspendu. Contactez l'administrateur.")
     
-    token = create_access_token({"sub": user["id"], "email": user["email"], "role": user["role"]})
+    token = create_access_token(token_claims(user))
     
     return TokenResponse(
         access_token=token,
+        refresh_token=create_refresh_token(user["id"]),
+        user={"id": user["id"], "email": user["email"], "nom": user["nom"], "prenom": user["prenom"], "role": user["role"]}
+    )
+
+@api_router.post("/auth/refresh", response_model=TokenResponse)
+async def refresh_access_token(data: RefreshTokenRequest):
+    """Exchange a refresh token for a new access token carrying up-to-date claims"""
+    try:
+        payload = jwt.decode(data.refresh_token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Session expirée, veuillez vous reconnecter")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Token invalide")
+    if payload.get("type") != "refresh" or payload.get("sub") is None:
+        raise HTTPException(status_code=401, detail="Token invalide")
+
+    user = await db.users.find_one({"id": payload["sub"]}, {"_id": 0, "password_hash": 0})
+    if not user:
+        raise HTTPException(status_code=401, detail="Utilisateur non trouvé")
+
+    if not user.get("is_approved", False):
+        raise HTTPException(status_code=403, detail="Votre compte est en attente d'approbation par l'administrateur")
+
+    if not user.get("is_active", False):
+        raise HTTPException(status_code=403, detail="Votre compte a été suspendu. Contactez l'administrateur.")
+
+    return TokenResponse(
+        access_token=create_access_token(token_claims(user)),
+        refresh_token=create_refresh_token(user["id"]),
         user={"id": user["id"], "email": user["email"], "nom": user["nom"], "prenom": user["prenom"], "role": user["role"]}
     )
 
@@ -575,8 +1934,20 @@ async def get_me(current_user: dict = Depends(get_current_user)):
 # ==================== USERS ROUTES (Admin only) ====================
 
 @api_router.get("/users", response_model=List[dict])
-async def get_users(admin: dict = Depends(require_admin)):
-    users = await db.users.find({}, {"_id": 0, "password_hash": 0}).to_list(1000)
+async def get_users(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    count: bool = False,
+    fields: Optional[str] = None,
+    admin: dict = Depends(require_admin)
+):
+    names = parse_fields(fields, User)
+    check_not_modified(request, response, await list_etag(request, db.users, {}))
+    users = await paginate(response, db.users, {}, cursor, limit, count, fields_projection(names) or {"password_hash": 0})
+    if names:
+        return sparse_response(users, User, names, response)
     return users
 
 @api_router.get("/users/pending", response_model=List[dict])
@@ -586,10 +1957,20 @@ async def get_pending_users(admin: dict = Depends(require_admin)):
     return users
 
 @api_router.get("/users/technicians", response_model=List[dict])
-async def get_technicians(current_user: dict = Depends(get_current_user)):
+async def get_technicians(request: Request, response: Response, fields: Optional[str] = None, current_user: dict = Depends(get_current_user)):
     """Get all active users (for technician dropdown)"""
-    users = await db.users.find({"is_active": True, "is_approved": True}, {"_id": 0, "password_hash": 0}).to_list(1000)
-    return users
+    names = parse_fields(fields, User)
+    query = {"is_active": True, "is_approved": True}
+    
+    async def load():
+        check_not_modified(request, response, await list_etag(request, db.users, query))
+        projection = {"_id": 0, **fields_projection(names)} if names else {"_id": 0, "password_hash": 0}
+        users = await db.users.find(query, projection).to_list(1000)
+        if names:
+            return sparse_response(users, User, names, response)
+        return users
+    
+    return await cached_response(request, current_user, ("users",), load, response)
 
 # Admin create user
 class AdminUserCreate(BaseModel):
@@ -600,6 +1981,7 @@ class AdminUserCreate(BaseModel):
     role: str = "technicien"
 
 @api_router.post("/users/create")
+@invalidates("users")
 async def admin_create_user(user_data: AdminUserCreate, admin: dict = Depends(require_admin)):
     """Admin creates a new user directly (pre-approved)"""
     # Check if email already exists
@@ -616,11 +1998,12 @@ async def admin_create_user(user_data: AdminUserCreate, admin: dict = Depends(re
         "email": user_data.email,
         "nom": user_data.nom,
         "prenom": user_data.prenom,
-        "password_hash": pwd_context.hash(user_data.password),
+        "password_hash": await hash_password_async(user_data.password),
         "role": user_data.role,
         "is_active": True,
         "is_approved": True,
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "updated_at": datetime.now(timezone.utc)
     }
     
     await db.users.insert_one(new_user)
@@ -637,15 +2020,20 @@ async def admin_create_user(user_data: AdminUserCreate, admin: dict = Depends(re
     return {"message": "Utilisateur créé avec succès", "user": new_user}
 
 @api_router.put("/users/{user_id}/role")
+@invalidates("users")
 async def update_user_role(user_id: str, role: str, admin: dict = Depends(require_admin)):
     if role not in ROLES:
         raise HTTPException(status_code=400, detail=f"Rôle invalide. Choix: {', '.join(ROLES)}")
-    result = await db.users.update_one({"id": user_id}, {"$set": {"role": role}})
+    result = await db.users.update_one({"id": user_id}, touch({"$set": {"role": role}}))
+    invalidate_principal(user_id)
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
+    # Outstanding access tokens carry the old role claim
+    await revoke_user_tokens(user_id)
     return {"message": "Rôle mis à jour"}
 
 @api_router.put("/users/{user_id}/approve")
+@invalidates("users")
 async def approve_user(user_id: str, admin: dict = Depends(require_admin)):
     """Approve a pending user"""
     # Get user info before update for email
@@ -653,8 +2041,9 @@ async def approve_user(user_id: str, admin: dict = Depends(require_admin)):
     
     result = await db.users.update_one(
         {"id": user_id}, 
-        {"$set": {"is_approved": True, "is_active": True}}
+        touch({"$set": {"is_approved": True, "is_active": True}})
     )
+    invalidate_principal(user_id)
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
     
@@ -668,14 +2057,17 @@ async def approve_user(user_id: str, admin: dict = Depends(require_admin)):
     return {"message": "Utilisateur approuvé"}
 
 @api_router.put("/users/{user_id}/reject")
+@invalidates("users")
 async def reject_user(user_id: str, admin: dict = Depends(require_admin)):
     """Reject a pending user (delete them)"""
     # Get user info before delete for email
     user = await db.users.find_one({"id": user_id, "is_approved": False}, {"_id": 0})
     
     result = await db.users.delete_one({"id": user_id, "is_approved": False})
+    invalidate_principal(user_id)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Utilisateur non trouvé ou déjà approuvé")
+    await record_deletions("users", [user_id])
     
     # Send rejection email
     if user:
@@ -687,21 +2079,26 @@ async def reject_user(user_id: str, admin: dict = Depends(require_admin)):
     return {"message": "Demande refusée"}
 
 @api_router.put("/users/{user_id}/suspend")
+@invalidates("users")
 async def suspend_user(user_id: str, admin: dict = Depends(require_admin)):
     """Suspend a user"""
     # Prevent admin from suspending themselves
     if user_id == admin["id"]:
         raise HTTPException(status_code=400, detail="Vous ne pouvez pas vous suspendre vous-même")
     
-    result = await db.users.update_one({"id": user_id}, {"$set": {"is_active": False}})
+    result = await db.users.update_one({"id": user_id}, touch({"$set": {"is_active": False}}))
+    invalidate_principal(user_id)
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
+    await revoke_user_tokens(user_id)
     return {"message": "Utilisateur suspendu"}
 
 @api_router.put("/users/{user_id}/activate")
+@invalidates("users")
 async def activate_user(user_id: str, admin: dict = Depends(require_admin)):
     """Reactivate a suspended user"""
-    result = await db.users.update_one({"id": user_id}, {"$set": {"is_active": True}})
+    result = await db.users.update_one({"id": user_id}, touch({"$set": {"is_active": True}}))
+    invalidate_principal(user_id)
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
     return {"message": "Utilisateur réactivé"}
@@ -714,6 +2111,7 @@ class AdminPasswordChange(BaseModel):
     new_password: str
 
 @api_router.put("/users/me/change-password")
+@invalidates("users")
 async def change_my_password(data: PasswordChange, current_user: dict = Depends(get_current_user)):
     """Self-service password change - requires current password verification"""
     # Get user from database
@@ -722,7 +2120,7 @@ async def change_my_password(data: PasswordChange, current_user: dict = Depends(
         raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
     
     # Verify current password
-    if not pwd_context.verify(data.current_password, user["password_hash"]):
+    if not await verify_password_async(data.current_password, user["password_hash"]):
         raise HTTPException(status_code=400, detail="Mot de passe actuel incorrect")
     
     # Validate new password
@@ -730,12 +2128,14 @@ async def change_my_password(data: PasswordChange, current_user: dict = Depends(
         raise HTTPException(status_code=400, detail="Le nouveau mot de passe doit contenir au moins 6 caractères")
     
     # Update password
-    new_hash = pwd_context.hash(data.new_password)
-    await db.users.update_one({"id": current_user["id"]}, {"$set": {"password_hash": new_hash}})
+    new_hash = await hash_password_async(data.new_password)
+    await db.users.update_one({"id": current_user["id"]}, touch({"$set": {"password_hash": new_hash}}))
+    invalidate_principal(current_user["id"])
     
     return {"message": "Mot de passe modifié avec succès"}
 
 @api_router.put("/users/{user_id}/password")
+@invalidates("users")
 async def change_user_password(user_id: str, data: AdminPasswordChange, admin: dict = Depends(require_admin)):
     """Admin-only: Change any user's password without verification"""
     # Get user
@@ -744,20 +2144,25 @@ async def change_user_password(user_id: str, data: AdminPasswordChange, admin: d
         raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
     
     # Update password
-    new_hash = pwd_context.hash(data.new_password)
-    await db.users.update_one({"id": user_id}, {"$set": {"password_hash": new_hash}})
+    new_hash = await hash_password_async(data.new_password)
+    await db.users.update_one({"id": user_id}, touch({"$set": {"password_hash": new_hash}}))
+    invalidate_principal(user_id)
     
     return {"message": "Mot de passe modifié avec succès"}
 
 @api_router.delete("/users/{user_id}")
+@invalidates("users")
 async def delete_user(user_id: str, admin: dict = Depends(require_admin)):
     # Prevent admin from deleting themselves
     if user_id == admin["id"]:
         raise HTTPException(status_code=400, detail="Vous ne pouvez pas supprimer votre propre compte")
     
     result = await db.users.delete_one({"id": user_id})
+    invalidate_principal(user_id)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
+    await record_deletions("users", [user_id])
+    await revoke_user_tokens(user_id)
     return {"message": "Utilisateur supprimé"}
 
 @api_router.get("/users/permissions")
@@ -779,6 +2184,7 @@ async def get_user_permissions(current_user: dict = Depends(get_current_user)):
 # ==================== CAISSON ROUTES ====================
 
 @api_router.post("/caisson", response_model=Caisson)
+@invalidates("caisson")
 async def create_caisson(data: CaissonCreate, current_user: dict = Depends(get_current_user)):
     existing = await db.caisson.find_one({})
     if existing:
@@ -791,13 +2197,18 @@ async def create_caisson(data: CaissonCreate, current_user: dict = Depends(get_c
     return caisson
 
 @api_router.get("/caisson", response_model=Optional[Caisson])
-async def get_caisson(current_user: dict = Depends(get_current_user)):
-    caisson = await db.caisson.find_one({}, {"_id": 0})
-    return caisson
+async def get_caisson(request: Request, response: Response, current_user: dict = Depends(get_current_user)):
+    async def load():
+        caisson = await db.caisson.find_one({}, {"_id": 0})
+        check_not_modified(request, response, document_etag(request, caisson))
+        return caisson
+    
+    return await cached_response(request, current_user, ("caisson",), load, response)
 
 @api_router.put("/caisson/{caisson_id}", response_model=Caisson)
+@invalidates("caisson")
 async def update_caisson(caisson_id: str, data: CaissonCreate, current_user: dict = Depends(get_current_user)):
-    result = await db.caisson.update_one({"id": caisson_id}, {"$set": data.model_dump()})
+    result = await db.caisson.update_one({"id": caisson_id}, touch({"$set": data.model_dump()}))
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Caisson non trouvé")
     caisson = await db.caisson.find_one({"id": caisson_id}, {"_id": 0})
@@ -814,8 +2225,7 @@ DEFAULT_EQUIPMENT_TYPES = [
     {"code": "systeme_securite", "nom": "Système de sécurité", "description": "Systèmes de sécurité"},
 ]
 
-@api_router.get("/equipment-types", response_model=List[EquipmentType])
-async def get_equipment_types(current_user: dict = Depends(get_current_user)):
+async def load_equipment_types() -> List[dict]:
     types = await db.equipment_types.find({}, {"_id": 0}).to_list(1000)
     # Si aucun type, initialiser avec les types par défaut
     if not types:
@@ -824,10 +2234,21 @@ async def get_equipment_types(current_user: dict = Depends(get_current_user)):
             doc = eq_type.model_dump()
             doc["created_at"] = doc["created_at"].isoformat()
             await db.equipment_types.insert_one(doc)
+        await publish_invalidation("equipment_types")
         types = await db.equipment_types.find({}, {"_id": 0}).to_list(1000)
     return types
 
+@api_router.get("/equipment-types", response_model=List[EquipmentType])
+async def get_equipment_types(request: Request, response: Response, current_user: dict = Depends(get_current_user)):
+    async def load():
+        types = await load_equipment_types()
+        check_not_modified(request, response, await list_etag(request, db.equipment_types, {}))
+        return types
+    
+    return await cached_response(request, current_user, ("equipment_types",), load, response)
+
 @api_router.post("/equipment-types", response_model=EquipmentType)
+@invalidates("equipment_types")
 async def create_equipment_type(data: EquipmentTypeCreate, current_user: dict = Depends(get_current_user)):
     # Vérifier que le code n'existe pas déjà
     existing = await db.equipment_types.find_one({"code": data.code})
@@ -841,14 +2262,16 @@ async def create_equipment_type(data: EquipmentTypeCreate, current_user: dict =
     return eq_type
 
 @api_router.put("/equipment-types/{type_id}", response_model=EquipmentType)
+@invalidates("equipment_types")
 async def update_equipment_type(type_id: str, data: EquipmentTypeCreate, current_user: dict = Depends(get_current_user)):
-    result = await db.equipment_types.update_one({"id": type_id}, {"$set": data.model_dump()})
+    result = await db.equipment_types.update_one({"id": type_id}, touch({"$set": data.model_dump()}))
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Type d'équipement non trouvé")
     eq_type = await db.equipment_types.find_one({"id": type_id}, {"_id": 0})
     return eq_type
 
 @api_router.delete("/equipment-types/{type_id}")
+@invalidates("equipment_types")
 async def delete_equipment_type(type_id: str, current_user: dict = Depends(get_current_user)):
     # Vérifier qu'aucun équipement n'utilise ce type
     eq_type = await db.equipment_types.find_one({"id": type_id})
@@ -860,23 +2283,33 @@ async def delete_equipment_type(type_id: str, current_user: dict = Depends(get_c
     result = await db.equipment_types.delete_one({"id": type_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Type d'équipement non trouvé")
+    await record_deletions("equipment_types", [type_id])
     return {"message": "Type d'équipement supprimé"}
 
 # ==================== EQUIPMENT ROUTES ====================
 
 @api_router.post("/equipments", response_model=Equipment)
+@invalidates("equipments")
 async def create_equipment(data: EquipmentCreate, current_user: dict = Depends(get_current_user)):
     equipment = Equipment(**data.model_dump())
     doc = equipment.model_dump()
     doc["created_at"] = doc["created_at"].isoformat()
     await db.equipments.insert_one(doc)
+    await bump_counters({"equipments.total": 1, statut_key("equipments", equipment.statut): 1})
+    await refresh_item_alert("equipment", equipment.id)
     return equipment
 
 @api_router.get("/equipments", response_model=List[Equipment])
 async def get_equipments(
+    request: Request,
+    response: Response,
     type: Optional[str] = None,
     statut: Optional[str] = None,
     criticite: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    count: bool = False,
+    fields: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
     query = {}
@@ -887,31 +2320,51 @@ async def get_equipments(
     if criticite:
         query["criticite"] = criticite
     
-    equipments = await db.equipments.find(query, {"_id": 0}).to_list(1000)
-    return equipments
+    names = parse_fields(fields, Equipment)
+    
+    async def load():
+        check_not_modified(request, response, await list_etag(request, db.equipments, query))
+        return await list_response(response, db.equipments, Equipment, query, cursor, limit, count, names)
+    
+    return await cached_response(request, current_user, ("equipments",), load, response)
 
 @api_router.get("/equipments/{equipment_id}", response_model=Equipment)
-async def get_equipment(equipment_id: str, current_user: dict = Depends(get_current_user)):
-    equipment = await db.equipments.find_one({"id": equipment_id}, {"_id": 0})
+async def get_equipment(equipment_id: str, request: Request, response: Response, fields: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    names = parse_fields(fields, Equipment)
+    equipment = await db.equipments.find_one({"id": equipment_id}, {"_id": 0, **(fields_projection(names, ("updated_at",)) or {})})
     if not equipment:
         raise HTTPException(status_code=404, detail="Équipement non trouvé")
+    check_not_modified(request, response, document_etag(request, equipment))
+    if names:
+        return sparse_response(equipment, Equipment, names, response)
     return equipment
 
 @api_router.put("/equipments/{equipment_id}", response_model=Equipment)
+@invalidates("equipments")
 async def update_equipment(equipment_id: str, data: EquipmentCreate, current_user: dict = Depends(get_current_user)):
-    result = await db.equipments.update_one({"id": equipment_id}, {"$set": data.model_dump()})
-    if result.matched_count == 0:
+    before = await db.equipments.find_one_and_update(
+        {"id": equipment_id}, touch({"$set": data.model_dump()}), projection={"statut": 1}
+    )
+    if not before:
         raise HTTPException(status_code=404, detail="Équipement non trouvé")
+    await bump_counters(statut_delta("equipments", before.get("statut"), data.statut))
+    await refresh_item_alert("equipment", equipment_id)
     equipment = await db.equipments.find_one({"id": equipment_id}, {"_id": 0})
     return equipment
 
 @api_router.delete("/equipments/{equipment_id}")
+@invalidates("equipments", "subequipments")
 async def delete_equipment(equipment_id: str, current_user: dict = Depends(get_current_user)):
-    result = await db.equipments.delete_one({"id": equipment_id})
-    if result.deleted_count == 0:
+    deleted = await db.equipments.find_one_and_delete({"id": equipment_id}, projection={"statut": 1})
+    if not deleted:
         raise HTTPException(status_code=404, detail="Équipement non trouvé")
+    await record_deletions("equipments", [equipment_id])
+    await bump_counters({"equipments.total": -1, statut_key("equipments", deleted.get("statut")): -1})
+    await refresh_item_alert("equipment", equipment_id)
     # Supprimer aussi les sous-équipements liés
+    children = await db.subequipments.distinct("id", {"parent_equipment_id": equipment_id})
     await db.subequipments.delete_many({"parent_equipment_id": equipment_id})
+    await record_deletions("subequipments", children)
     return {"message": "Équipement supprimé"}
 
 # Route pour mettre à jour le compteur horaire d'un compresseur
@@ -920,6 +2373,7 @@ class CompteurHoraireUpdate(BaseModel):
     technicien: Optional[str] = None
 
 @api_router.put("/equipments/{equipment_id}/compteur-horaire")
+@invalidates("equipments")
 async def update_compteur_horaire(
     equipment_id: str, 
     data: CompteurHoraireUpdate, 
@@ -942,10 +2396,10 @@ async def update_compteur_horaire(
     
     await db.equipments.update_one(
         {"id": equipment_id},
-        {
+        touch({
             "$set": {"compteur_horaire": data.compteur_horaire},
             "$push": {"historique_compteur": historique_entry}
-        }
+        })
     )
     
     # Vérifier s'il y a des maintenances préventives basées sur les heures à déclencher
@@ -971,6 +2425,7 @@ async def update_compteur_horaire(
 # ==================== SUB-EQUIPMENT ROUTES ====================
 
 @api_router.post("/subequipments", response_model=SubEquipment)
+@invalidates("subequipments")
 async def create_subequipment(data: SubEquipmentCreate, current_user: dict = Depends(get_current_user)):
     # Vérifier que l'équipement parent existe
     parent = await db.equipments.find_one({"id": data.parent_equipment_id})
@@ -985,40 +2440,55 @@ async def create_subequipment(data: SubEquipmentCreate, current_user: dict = Dep
 
 @api_router.get("/subequipments", response_model=List[SubEquipment])
 async def get_subequipments(
+    request: Request,
+    response: Response,
     parent_equipment_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    count: bool = False,
+    fields: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
     query = {}
     if parent_equipment_id:
         query["parent_equipment_id"] = parent_equipment_id
     
-    subequipments = await db.subequipments.find(query, {"_id": 0}).to_list(1000)
-    return subequipments
+    names = parse_fields(fields, SubEquipment)
+    check_not_modified(request, response, await list_etag(request, db.subequipments, query))
+    return await list_response(response, db.subequipments, SubEquipment, query, cursor, limit, count, names)
 
 @api_router.get("/subequipments/{subequipment_id}", response_model=SubEquipment)
-async def get_subequipment(subequipment_id: str, current_user: dict = Depends(get_current_user)):
-    subequipment = await db.subequipments.find_one({"id": subequipment_id}, {"_id": 0})
+async def get_subequipment(subequipment_id: str, request: Request, response: Response, fields: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    names = parse_fields(fields, SubEquipment)
+    subequipment = await db.subequipments.find_one({"id": subequipment_id}, {"_id": 0, **(fields_projection(names, ("updated_at",)) or {})})
     if not subequipment:
         raise HTTPException(status_code=404, detail="Sous-équipement non trouvé")
+    check_not_modified(request, response, document_etag(request, subequipment))
+    if names:
+        return sparse_response(subequipment, SubEquipment, names, response)
     return subequipment
 
 @api_router.put("/subequipments/{subequipment_id}", response_model=SubEquipment)
+@invalidates("subequipments")
 async def update_subequipment(subequipment_id: str, data: SubEquipmentCreate, current_user: dict = Depends(get_current_user)):
-    result = await db.subequipments.update_one({"id": subequipment_id}, {"$set": data.model_dump()})
+    result = await db.subequipments.update_one({"id": subequipment_id}, touch({"$set": data.model_dump()}))
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Sous-équipement non trouvé")
     subequipment = await db.subequipments.find_one({"id": subequipment_id}, {"_id": 0})
     return subequipment
 
 @api_router.delete("/subequipments/{subequipment_id}")
+@invalidates("subequipments")
 async def delete_subequipment(subequipment_id: str, current_user: dict = Depends(get_current_user)):
     result = await db.subequipments.delete_one({"id": subequipment_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Sous-équipement non trouvé")
+    await record_deletions("subequipments", [subequipment_id])
     return {"message": "Sous-équipement supprimé"}
 
 # Sub-equipment file uploads
 @api_router.post("/subequipments/{subequipment_id}/photos")
+@invalidates("subequipments")
 async def upload_subequipment_photo(
     subequipment_id: str,
     file: UploadFile = File(...),
@@ -1041,11 +2511,12 @@ async def upload_subequipment_photo(
     photo_url = f"/api/uploads/subequipments/{unique_filename}"
     await db.subequipments.update_one(
         {"id": subequipment_id},
-        {"$push": {"photos": photo_url}}
+        touch({"$push": {"photos": photo_url}})
     )
     return {"filename": file.filename, "url": photo_url}
 
 @api_router.post("/subequipments/{subequipment_id}/documents")
+@invalidates("subequipments")
 async def upload_subequipment_document(
     subequipment_id: str,
     file: UploadFile = File(...),
@@ -1073,11 +2544,12 @@ async def upload_subequipment_document(
     }
     await db.subequipments.update_one(
         {"id": subequipment_id},
-        {"$push": {"documents": doc_info}}
+        touch({"$push": {"documents": doc_info}})
     )
     return doc_info
 
 @api_router.delete("/subequipments/{subequipment_id}/photos")
+@invalidates("subequipments")
 async def delete_subequipment_photo(
     subequipment_id: str,
     photo_url: str,
@@ -1085,7 +2557,7 @@ async def delete_subequipment_photo(
 ):
     await db.subequipments.update_one(
         {"id": subequipment_id},
-        {"$pull": {"photos": photo_url}}
+        touch({"$pull": {"photos": photo_url}})
     )
     filename = photo_url.split("/")[-1]
     file_path = UPLOADS_DIR / "subequipments" / filename
@@ -1094,6 +2566,7 @@ async def delete_subequipment_photo(
     return {"message": "Photo supprimée"}
 
 @api_router.delete("/subequipments/{subequipment_id}/documents")
+@invalidates("subequipments")
 async def delete_subequipment_document(
     subequipment_id: str,
     doc_url: str,
@@ -1101,7 +2574,7 @@ async def delete_subequipment_document(
 ):
     await db.subequipments.update_one(
         {"id": subequipment_id},
-        {"$pull": {"documents": {"url": doc_url}}}
+        touch({"$pull": {"documents": {"url": doc_url}}})
     )
     filename = doc_url.split("/")[-1]
     file_path = UPLOADS_DIR / "subequipments" / filename
@@ -1112,18 +2585,27 @@ async def delete_subequipment_document(
 # ==================== WORK ORDER ROUTES ====================
 
 @api_router.post("/work-orders", response_model=WorkOrder)
+@invalidates("work_orders")
 async def create_work_order(data: WorkOrderCreate, current_user: dict = Depends(get_current_user)):
     work_order = WorkOrder(**data.model_dump())
     doc = work_order.model_dump()
     doc["created_at"] = doc["created_at"].isoformat()
     await db.work_orders.insert_one(doc)
+    await bump_counters({"work_orders.total": 1, statut_key("work_orders", work_order.statut): 1})
+    await refresh_item_alert("work_order", work_order.id)
     return work_order
 
 @api_router.get("/work-orders", response_model=List[WorkOrder])
 async def get_work_orders(
+    request: Request,
+    response: Response,
     statut: Optional[str] = None,
     type_maintenance: Optional[str] = None,
     priorite: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    count: bool = False,
+    fields: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
     query = {}
@@ -1134,33 +2616,48 @@ async def get_work_orders(
     if priorite:
         query["priorite"] = priorite
     
-    work_orders = await db.work_orders.find(query, {"_id": 0}).to_list(1000)
-    return work_orders
+    names = parse_fields(fields, WorkOrder)
+    check_not_modified(request, response, await list_etag(request, db.work_orders, query))
+    return await list_response(response, db.work_orders, WorkOrder, query, cursor, limit, count, names)
 
 @api_router.get("/work-orders/{work_order_id}", response_model=WorkOrder)
-async def get_work_order(work_order_id: str, current_user: dict = Depends(get_current_user)):
-    work_order = await db.work_orders.find_one({"id": work_order_id}, {"_id": 0})
+async def get_work_order(work_order_id: str, request: Request, response: Response, fields: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    names = parse_fields(fields, WorkOrder)
+    work_order = await db.work_orders.find_one({"id": work_order_id}, {"_id": 0, **(fields_projection(names, ("updated_at",)) or {})})
     if not work_order:
         raise HTTPException(status_code=404, detail="Ordre de travail non trouvé")
+    check_not_modified(request, response, document_etag(request, work_order))
+    if names:
+        return sparse_response(work_order, WorkOrder, names, response)
     return work_order
 
 @api_router.put("/work-orders/{work_order_id}", response_model=WorkOrder)
+@invalidates("work_orders")
 async def update_work_order(work_order_id: str, data: WorkOrderCreate, current_user: dict = Depends(get_current_user)):
-    result = await db.work_orders.update_one({"id": work_order_id}, {"$set": data.model_dump()})
-    if result.matched_count == 0:
+    before = await db.work_orders.find_one_and_update(
+        {"id": work_order_id}, touch({"$set": data.model_dump()}), projection={"statut": 1}
+    )
+    if not before:
         raise HTTPException(status_code=404, detail="Ordre de travail non trouvé")
+    await bump_counters(statut_delta("work_orders", before.get("statut"), data.statut))
+    await refresh_item_alert("work_order", work_order_id)
     work_order = await db.work_orders.find_one({"id": work_order_id}, {"_id": 0})
     return work_order
 
 @api_router.delete("/work-orders/{work_order_id}")
+@invalidates("work_orders")
 async def delete_work_order(work_order_id: str, current_user: dict = Depends(get_current_user)):
-    result = await db.work_orders.delete_one({"id": work_order_id})
-    if result.deleted_count == 0:
+    deleted = await db.work_orders.find_one_and_delete({"id": work_order_id}, projection={"statut": 1})
+    if not deleted:
         raise HTTPException(status_code=404, detail="Ordre de travail non trouvé")
+    await record_deletions("work_orders", [work_order_id])
+    await bump_counters({"work_orders.total": -1, statut_key("work_orders", deleted.get("statut")): -1})
+    await refresh_item_alert("work_order", work_order_id)
     return {"message": "Ordre de travail supprimé"}
 
 # Work orders file uploads
 @api_router.post("/work-orders/{work_order_id}/photos")
+@invalidates("work_orders")
 async def upload_work_order_photo(
     work_order_id: str,
     file: UploadFile = File(...),
@@ -1183,11 +2680,12 @@ async def upload_work_order_photo(
     photo_url = f"/api/uploads/workorders/{unique_filename}"
     await db.work_orders.update_one(
         {"id": work_order_id},
-        {"$push": {"photos": photo_url}}
+        touch({"$push": {"photos": photo_url}})
     )
     return {"filename": file.filename, "url": photo_url}
 
 @api_router.post("/work-orders/{work_order_id}/documents")
+@invalidates("work_orders")
 async def upload_work_order_document(
     work_order_id: str,
     file: UploadFile = File(...),
@@ -1215,11 +2713,12 @@ async def upload_work_order_document(
     }
     await db.work_orders.update_one(
         {"id": work_order_id},
-        {"$push": {"documents": doc_info}}
+        touch({"$push": {"documents": doc_info}})
     )
     return doc_info
 
 @api_router.delete("/work-orders/{work_order_id}/photos")
+@invalidates("work_orders")
 async def delete_work_order_photo(
     work_order_id: str,
     photo_url: str,
@@ -1227,7 +2726,7 @@ async def delete_work_order_photo(
 ):
     await db.work_orders.update_one(
         {"id": work_order_id},
-        {"$pull": {"photos": photo_url}}
+        touch({"$pull": {"photos": photo_url}})
     )
     filename = photo_url.split("/")[-1]
     file_path = UPLOADS_DIR / "workorders" / filename
@@ -1236,6 +2735,7 @@ async def delete_work_order_photo(
     return {"message": "Photo supprimée"}
 
 @api_router.delete("/work-orders/{work_order_id}/documents")
+@invalidates("work_orders")
 async def delete_work_order_document(
     work_order_id: str,
     doc_url: str,
@@ -1243,7 +2743,7 @@ async def delete_work_order_document(
 ):
     await db.work_orders.update_one(
         {"id": work_order_id},
-        {"$pull": {"documents": {"url": doc_url}}}
+        touch({"$pull": {"documents": {"url": doc_url}}})
     )
     filename = doc_url.split("/")[-1]
     file_path = UPLOADS_DIR / "workorders" / filename
@@ -1254,6 +2754,7 @@ async def delete_work_order_document(
 # ==================== INTERVENTION ROUTES ====================
 
 @api_router.post("/interventions", response_model=Intervention)
+@invalidates("equipments", "interventions", "spare_parts", "work_orders")
 async def create_intervention(data: InterventionCreate, current_user: dict = Depends(get_current_user)):
     # Récupérer l'équipement concerné (depuis work_order ou directement)
     equipment_id = data.equipment_id
@@ -1281,29 +2782,29 @@ async def create_intervention(data: InterventionCreate, current_user: dict = Dep
             }
             await db.equipments.update_one(
                 {"id": equipment_id},
-                {
+                touch({
                     "$set": {"compteur_horaire": data.compteur_horaire},
                     "$push": {"historique_compteur": historique_entry}
-                }
+                })
             )
     
     # Décrémentation du stock des pièces utilisées
     pieces_details = []
     for piece in data.pieces_utilisees:
-        spare_part = await db.spare_parts.find_one({"id": piece.get("spare_part_id")})
+        quantite = piece.get("quantite", 0)
+        # Decrement in the database so concurrent interventions don't overwrite each other
+        before, spare_part = await update_spare_part_stock(piece.get("spare_part_id"), [
+            {"$set": {"quantite_stock": {"$max": [0, {"$subtract": ["$quantite_stock", {"$literal": quantite}]}]}}},
+            SET_LOW_STOCK
+        ])
         if spare_part:
-            quantite = piece.get("quantite", 0)
-            new_qty = spare_part["quantite_stock"] - quantite
-            await db.spare_parts.update_one(
-                {"id": piece.get("spare_part_id")},
-                {"$set": {"quantite_stock": max(0, new_qty)}}
-            )
+            await refresh_item_alert("spare_part", piece.get("spare_part_id"))
             pieces_details.append({
                 "spare_part_id": piece.get("spare_part_id"),
                 "nom": spare_part["nom"],
                 "quantite": quantite,
-                "stock_avant": spare_part["quantite_stock"],
-                "stock_apres": max(0, new_qty)
+                "stock_avant": before.get("quantite_stock"),
+                "stock_apres": spare_part["quantite_stock"]
             })
     
     # Créer l'intervention avec l'equipment_id
@@ -1316,10 +2817,14 @@ async def create_intervention(data: InterventionCreate, current_user: dict = Dep
     
     # Si maintenance curative (ordre de travail)
     if data.type_intervention == "curative" and data.work_order_id:
-        await db.work_orders.update_one(
+        before = await db.work_orders.find_one_and_update(
             {"id": data.work_order_id},
-            {"$set": {"statut": "terminee"}}
+            touch({"$set": {"statut": "terminee"}}),
+            projection={"statut": 1}
         )
+        if before:
+            await bump_counters(statut_delta("work_orders", before.get("statut"), "terminee"))
+            await refresh_item_alert("work_order", data.work_order_id)
     
     # Si maintenance préventive, mettre à jour le work order ET recalculer la prochaine échéance
     if data.type_intervention == "preventive" and data.maintenance_preventive_id:
@@ -1327,10 +2832,14 @@ async def create_intervention(data: InterventionCreate, current_user: dict = Dep
         work_order = await db.work_orders.find_one({"id": data.maintenance_preventive_id})
         if work_order:
             # Marquer comme terminée
-            await db.work_orders.update_one(
+            before = await db.work_orders.find_one_and_update(
                 {"id": data.maintenance_preventive_id},
-                {"$set": {"statut": "terminee"}}
+                touch({"$set": {"statut": "terminee"}}),
+                projection={"statut": 1}
             )
+            if before:
+                await bump_counters(statut_delta("work_orders", before.get("statut"), "terminee"))
+                await refresh_item_alert("work_order", data.maintenance_preventive_id)
             
             # Si périodicité définie, créer automatiquement la prochaine maintenance
             if work_order.get("periodicite_jours") or work_order.get("periodicite_heures"):
@@ -1338,10 +2847,9 @@ async def create_intervention(data: InterventionCreate, current_user: dict = Dep
                 
                 # Calculer la prochaine date
                 if work_order.get("periodicite_jours"):
-                    next_date = datetime.strptime(data.date_intervention, "%Y-%m-%d") + timedelta(days=work_order["periodicite_jours"])
-                    next_date_str = next_date.strftime("%Y-%m-%d")
+                    next_date = data.date_intervention + timedelta(days=work_order["periodicite_jours"])
                 else:
-                    next_date_str = data.date_intervention  # Pour les heures, on garde la même date
+                    next_date = data.date_intervention  # Pour les heures, on garde la même date
                 
                 # Calculer le prochain compteur de déclenchement si basé sur les heures
                 next_compteur = None
@@ -1360,7 +2868,7 @@ async def create_intervention(data: InterventionCreate, current_user: dict = Dep
                     statut="planifiee",
                     caisson_id=work_order.get("caisson_id"),
                     equipment_id=work_order.get("equipment_id"),
-                    date_planifiee=next_date_str,
+                    date_planifiee=next_date,
                     periodicite_jours=work_order.get("periodicite_jours"),
                     periodicite_heures=work_order.get("periodicite_heures"),
                     compteur_declenchement=next_compteur,
@@ -1369,26 +2877,39 @@ async def create_intervention(data: InterventionCreate, current_user: dict = Dep
                 new_doc = new_wo.model_dump()
                 new_doc["created_at"] = new_doc["created_at"].isoformat()
                 await db.work_orders.insert_one(new_doc)
+                await bump_counters({"work_orders.total": 1, statut_key("work_orders", new_wo.statut): 1})
+                await refresh_item_alert("work_order", new_wo.id)
     
     return intervention
 
 @api_router.get("/interventions", response_model=List[Intervention])
 async def get_interventions(
+    request: Request,
+    response: Response,
     work_order_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    count: bool = False,
+    fields: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
     query = {}
     if work_order_id:
         query["work_order_id"] = work_order_id
     
-    interventions = await db.interventions.find(query, {"_id": 0}).to_list(1000)
-    return interventions
+    names = parse_fields(fields, Intervention)
+    check_not_modified(request, response, await list_etag(request, db.interventions, query))
+    return await list_response(response, db.interventions, Intervention, query, cursor, limit, count, names)
 
 @api_router.get("/interventions/{intervention_id}", response_model=Intervention)
-async def get_intervention(intervention_id: str, current_user: dict = Depends(get_current_user)):
-    intervention = await db.interventions.find_one({"id": intervention_id}, {"_id": 0})
+async def get_intervention(intervention_id: str, request: Request, response: Response, fields: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    names = parse_fields(fields, Intervention)
+    intervention = await db.interventions.find_one({"id": intervention_id}, {"_id": 0, **(fields_projection(names, ("updated_at",)) or {})})
     if not intervention:
         raise HTTPException(status_code=404, detail="Intervention non trouvée")
+    check_not_modified(request, response, document_etag(request, intervention))
+    if names:
+        return sparse_response(intervention, Intervention, names, response)
     return intervention
 
 # ==================== INSPECTION ROUTES ====================
@@ -1406,103 +2927,146 @@ def calculate_next_date(date_realisation: str, periodicite: str) -> str:
     return next_date.strftime("%Y-%m-%d")
 
 @api_router.post("/inspections", response_model=Inspection)
+@invalidates("inspections")
 async def create_inspection(data: InspectionCreate, current_user: dict = Depends(get_current_user)):
     data_dict = data.model_dump()
     # Calculer automatiquement la date de validité
-    data_dict["date_validite"] = calculate_next_date(data_dict.get("date_realisation"), data_dict.get("periodicite", "annuel"))
+    data_dict["date_validite"] = parse_date_value(calculate_next_date(data_dict.get("date_realisation"), data_dict.get("periodicite", "annuel")))
     
     inspection = Inspection(**data_dict)
     doc = inspection.model_dump()
     doc["created_at"] = doc["created_at"].isoformat()
     await db.inspections.insert_one(doc)
+    await refresh_item_alert("inspection", inspection.id)
     return inspection
 
 @api_router.get("/inspections", response_model=List[Inspection])
-async def get_inspections(current_user: dict = Depends(get_current_user)):
-    inspections = await db.inspections.find({}, {"_id": 0}).to_list(1000)
-    return inspections
+async def get_inspections(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    count: bool = False,
+    fields: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    names = parse_fields(fields, Inspection)
+    check_not_modified(request, response, await list_etag(request, db.inspections, {}))
+    return await list_response(response, db.inspections, Inspection, {}, cursor, limit, count, names)
 
 @api_router.get("/inspections/{inspection_id}", response_model=Inspection)
-async def get_inspection(inspection_id: str, current_user: dict = Depends(get_current_user)):
-    inspection = await db.inspections.find_one({"id": inspection_id}, {"_id": 0})
+async def get_inspection(inspection_id: str, request: Request, response: Response, fields: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    names = parse_fields(fields, Inspection)
+    inspection = await db.inspections.find_one({"id": inspection_id}, {"_id": 0, **(fields_projection(names, ("updated_at",)) or {})})
     if not inspection:
         raise HTTPException(status_code=404, detail="Contrôle non trouvé")
+    check_not_modified(request, response, document_etag(request, inspection))
+    if names:
+        return sparse_response(inspection, Inspection, names, response)
     return inspection
 
 @api_router.put("/inspections/{inspection_id}", response_model=Inspection)
+@invalidates("inspections")
 async def update_inspection(inspection_id: str, data: InspectionCreate, current_user: dict = Depends(get_current_user)):
     data_dict = data.model_dump()
     # Recalculer la date de validité si date_realisation ou periodicite change
-    data_dict["date_validite"] = calculate_next_date(data_dict.get("date_realisation"), data_dict.get("periodicite", "annuel"))
+    data_dict["date_validite"] = parse_date_value(calculate_next_date(data_dict.get("date_realisation"), data_dict.get("periodicite", "annuel")))
     
-    result = await db.inspections.update_one({"id": inspection_id}, {"$set": data_dict})
+    result = await db.inspections.update_one({"id": inspection_id}, touch({"$set": data_dict}))
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Contrôle non trouvé")
+    await refresh_item_alert("inspection", inspection_id)
     inspection = await db.inspections.find_one({"id": inspection_id}, {"_id": 0})
     return inspection
 
 @api_router.delete("/inspections/{inspection_id}")
+@invalidates("inspections")
 async def delete_inspection(inspection_id: str, current_user: dict = Depends(get_current_user)):
     result = await db.inspections.delete_one({"id": inspection_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Contrôle non trouvé")
+    await record_deletions("inspections", [inspection_id])
+    await refresh_item_alert("inspection", inspection_id)
     return {"message": "Contrôle supprimé"}
 
 # ==================== SPARE PARTS ROUTES ====================
 
 @api_router.post("/spare-parts", response_model=SparePart)
+@invalidates("spare_parts")
 async def create_spare_part(data: SparePartCreate, current_user: dict = Depends(get_current_user)):
     spare_part = SparePart(**data.model_dump())
+    spare_part.is_low_stock = spare_part.quantite_stock <= spare_part.seuil_minimum
     doc = spare_part.model_dump()
     doc["created_at"] = doc["created_at"].isoformat()
     await db.spare_parts.insert_one(doc)
+    await bump_counters({"spare_parts.total": 1, "spare_parts.low_stock": int(spare_part.is_low_stock)})
+    await refresh_item_alert("spare_part", spare_part.id)
     return spare_part
 
 @api_router.get("/spare-parts", response_model=List[SparePart])
 async def get_spare_parts(
+    request: Request,
+    response: Response,
     equipment_type: Optional[str] = None,
     low_stock: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    count: bool = False,
+    fields: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
     query = {}
     if equipment_type:
         query["equipment_type"] = equipment_type
-    
-    spare_parts = await db.spare_parts.find(query, {"_id": 0}).to_list(1000)
-    
     if low_stock:
-        spare_parts = [p for p in spare_parts if p["quantite_stock"] <= p["seuil_minimum"]]
+        query["is_low_stock"] = True
     
-    return spare_parts
+    names = parse_fields(fields, SparePart)
+    check_not_modified(request, response, await list_etag(request, db.spare_parts, query))
+    return await list_response(response, db.spare_parts, SparePart, query, cursor, limit, count, names)
 
 @api_router.get("/spare-parts/{spare_part_id}", response_model=SparePart)
-async def get_spare_part(spare_part_id: str, current_user: dict = Depends(get_current_user)):
-    spare_part = await db.spare_parts.find_one({"id": spare_part_id}, {"_id": 0})
+async def get_spare_part(spare_part_id: str, request: Request, response: Response, fields: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    names = parse_fields(fields, SparePart)
+    spare_part = await db.spare_parts.find_one({"id": spare_part_id}, {"_id": 0, **(fields_projection(names, ("updated_at",)) or {})})
     if not spare_part:
         raise HTTPException(status_code=404, detail="Pièce non trouvée")
+    check_not_modified(request, response, document_etag(request, spare_part))
+    if names:
+        return sparse_response(spare_part, SparePart, names, response)
     return spare_part
 
 @api_router.put("/spare-parts/{spare_part_id}", response_model=SparePart)
+@invalidates("spare_parts")
 async def update_spare_part(spare_part_id: str, data: SparePartUpdate, current_user: dict = Depends(get_current_user)):
     update_data = {k: v for k, v in data.model_dump().items() if v is not None}
     if not update_data:
         raise HTTPException(status_code=400, detail="Aucune donnée à mettre à jour")
     
-    result = await db.spare_parts.update_one({"id": spare_part_id}, {"$set": update_data})
-    if result.matched_count == 0:
+    # $literal keeps user-supplied strings from being read as field paths in the pipeline
+    _, spare_part = await update_spare_part_stock(
+        spare_part_id,
+        [{"$set": {k: {"$literal": v} for k, v in update_data.items()}}, SET_LOW_STOCK]
+    )
+    if not spare_part:
         raise HTTPException(status_code=404, detail="Pièce non trouvée")
-    spare_part = await db.spare_parts.find_one({"id": spare_part_id}, {"_id": 0})
+    await refresh_item_alert("spare_part", spare_part_id)
     return spare_part
 
 @api_router.delete("/spare-parts/{spare_part_id}")
+@invalidates("spare_parts")
 async def delete_spare_part(spare_part_id: str, current_user: dict = Depends(get_current_user)):
-    result = await db.spare_parts.delete_one({"id": spare_part_id})
-    if result.deleted_count == 0:
+    deleted = await db.spare_parts.find_one_and_delete({"id": spare_part_id}, projection={"is_low_stock": 1})
+    if not deleted:
         raise HTTPException(status_code=404, detail="Pièce non trouvée")
+    await record_deletions("spare_parts", [spare_part_id])
+    await bump_counters({"spare_parts.total": -1, "spare_parts.low_stock": -int(bool(deleted.get("is_low_stock")))})
+    await refresh_item_alert("spare_part", spare_part_id)
     return {"message": "Pièce supprimée"}
 
 # Spare parts file uploads
 @api_router.post("/spare-parts/{spare_part_id}/photos")
+@invalidates("spare_parts")
 async def upload_spare_part_photo(
     spare_part_id: str,
     file: UploadFile = File(...),
@@ -1525,11 +3089,12 @@ async def upload_spare_part_photo(
     photo_url = f"/api/uploads/spareparts/{unique_filename}"
     await db.spare_parts.update_one(
         {"id": spare_part_id},
-        {"$push": {"photos": photo_url}}
+        touch({"$push": {"photos": photo_url}})
     )
     return {"filename": file.filename, "url": photo_url}
 
 @api_router.post("/spare-parts/{spare_part_id}/documents")
+@invalidates("spare_parts")
 async def upload_spare_part_document(
     spare_part_id: str,
     file: UploadFile = File(...),
@@ -1557,11 +3122,12 @@ async def upload_spare_part_document(
     }
     await db.spare_parts.update_one(
         {"id": spare_part_id},
-        {"$push": {"documents": doc_info}}
+        touch({"$push": {"documents": doc_info}})
     )
     return doc_info
 
 @api_router.delete("/spare-parts/{spare_part_id}/photos")
+@invalidates("spare_parts")
 async def delete_spare_part_photo(
     spare_part_id: str,
     photo_url: str,
@@ -1569,7 +3135,7 @@ async def delete_spare_part_photo(
 ):
     await db.spare_parts.update_one(
         {"id": spare_part_id},
-        {"$pull": {"photos": photo_url}}
+        touch({"$pull": {"photos": photo_url}})
     )
     filename = photo_url.split("/")[-1]
     file_path = UPLOADS_DIR / "spareparts" / filename
@@ -1578,6 +3144,7 @@ async def delete_spare_part_photo(
     return {"message": "Photo supprimée"}
 
 @api_router.delete("/spare-parts/{spare_part_id}/documents")
+@invalidates("spare_parts")
 async def delete_spare_part_document(
     spare_part_id: str,
     doc_url: str,
@@ -1585,7 +3152,7 @@ async def delete_spare_part_document(
 ):
     await db.spare_parts.update_one(
         {"id": spare_part_id},
-        {"$pull": {"documents": {"url": doc_url}}}
+        touch({"$pull": {"documents": {"url": doc_url}}})
     )
     filename = doc_url.split("/")[-1]
     file_path = UPLOADS_DIR / "spareparts" / filename
@@ -1593,34 +3160,148 @@ async def delete_spare_part_document(
         file_path.unlink()
     return {"message": "Document supprimé"}
 
+# ==================== SEARCH ====================
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 50
+# Prefix matches on identifiers rank above text matches; an exact identifier ranks highest.
+# Text scores are unbounded (weights up to 10), so they are squashed below SEARCH_PREFIX_SCORE.
+SEARCH_PREFIX_SCORE = 20.0
+SEARCH_EXACT_SCORE = 30.0
+
+def text_search_score(text_score: float) -> float:
+    """Map a $text score (0..inf) into [0, SEARCH_PREFIX_SCORE), keeping its order"""
+    return SEARCH_PREFIX_SCORE * text_score / (text_score + 1)
+
+# hit type -> collection, indexed identifier fields used for prefix matching, title/subtitle fields
+SEARCH_TARGETS = {
+    "equipment": {
+        "collection": "equipments",
+        "prefix_fields": ["reference", "numero_serie"],
+        "title": lambda d: f"{d.get('type', '')} - {d.get('reference', '')}",
+        "subtitle": lambda d: d.get("numero_serie"),
+    },
+    "subequipment": {
+        "collection": "subequipments",
+        "prefix_fields": ["reference", "numero_serie"],
+        "title": lambda d: d.get("nom"),
+        "subtitle": lambda d: d.get("reference"),
+    },
+    "spare_part": {
+        "collection": "spare_parts",
+        "prefix_fields": ["reference_fabricant"],
+        "title": lambda d: d.get("nom"),
+        "subtitle": lambda d: d.get("reference_fabricant"),
+    },
+    "work_order": {
+        "collection": "work_orders",
+        "prefix_fields": [],
+        "title": lambda d: d.get("titre"),
+        "subtitle": lambda d: d.get("statut"),
+    },
+}
+
+async def search_collection(hit_type: str, q: str, limit: int) -> List[dict]:
+    """Prefix and text hits of one collection, each with a relevance score"""
+    target = SEARCH_TARGETS[hit_type]
+    collection = db[target["collection"]]
+    scores = {}
+    docs = {}
+
+    # Anchored, case-sensitive regexes are resolved as index range scans; references are usually upper case
+    prefixes = [re.compile("^" + re.escape(v)) for v in dict.fromkeys([q, q.upper()])]
+    for field in target["prefix_fields"]:
+        async for doc in collection.find({field: {"$in": prefixes}}, {"_id": 0}).limit(limit):
+            score = SEARCH_EXACT_SCORE if doc.get(field) in (q, q.upper()) else SEARCH_PREFIX_SCORE
+            if score > scores.get(doc["id"], 0):
+                scores[doc["id"]] = score
+                docs[doc["id"]] = doc
+
+    text_cursor = collection.find(
+        {"$text": {"$search": q}},
+        {"_id": 0, "score": {"$meta": "textScore"}}
+    ).sort([("score", {"$meta": "textScore"})]).limit(limit)
+    async for doc in text_cursor:
+        score = text_search_score(doc.pop("score"))
+        if score > scores.get(doc["id"], 0):
+            scores[doc["id"]] = score
+            docs[doc["id"]] = doc
+
+    return [
+        {
+            "type": hit_type,
+            "id": doc_id,
+            "title": target["title"](docs[doc_id]),
+            "subtitle": target["subtitle"](docs[doc_id]),
+            "score": round(score, 3)
+        }
+        for doc_id, score in scores.items()
+    ]
+
+@api_router.get("/search")
+async def search(
+    q: str = Query(..., min_length=1, max_length=100),
+    types: Optional[str] = None,
+    limit: int = Query(SEARCH_DEFAULT_LIMIT, ge=1, le=SEARCH_MAX_LIMIT),
+    current_user: dict = Depends(get_current_user)
+):
+    """Ranked search across equipments, sub-equipments, spare parts and work orders"""
+    q = q.strip()
+    if not q:
+        raise HTTPException(status_code=400, detail="Recherche vide")
+    hit_types = list(SEARCH_TARGETS)
+    if types:
+        hit_types = [t.strip() for t in types.split(",") if t.strip()]
+        unknown = [t for t in hit_types if t not in SEARCH_TARGETS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Types inconnus: {', '.join(unknown)}")
+
+    results = await asyncio.gather(*(search_collection(t, q, limit) for t in hit_types))
+    hits = sorted((hit for hits in results for hit in hits), key=lambda h: h["score"], reverse=True)
+    return {
+        "query": q,
+        "total": len(hits),
+        "results": hits[:limit]
+    }
+
 # ==================== DASHBOARD / ALERTS ROUTES ====================
 
-@api_router.get("/dashboard/stats")
-async def get_dashboard_stats(current_user: dict = Depends(get_current_user)):
+async def dashboard_stats() -> dict:
+    # Point read of the maintained counters; the compressor list comes from the (type, _id) index
+    counters, compresseurs = await asyncio.gather(
+        db.counters.find_one({"_id": COUNTERS_ID}),
+        db.equipments.find(
+            {"type": "compresseur"},
+            {"_id": 0, "id": 1, "reference": 1, "numero_serie": 1, "compteur_horaire": 1, "statut": 1}
+        ).to_list(1000)
+    )
+    if not counters:
+        counters = await reconcile_counters()
+    
     # Count equipments by status
-    equipments = await db.equipments.find({}, {"_id": 0}).to_list(1000)
+    equipment_counts = counters.get("equipments", {})
+    equipment_statuts = equipment_counts.get("statut", {})
     equipment_stats = {
-        "total": len(equipments),
-        "en_service": len([e for e in equipments if e.get("statut") == "en_service"]),
-        "maintenance": len([e for e in equipments if e.get("statut") == "maintenance"]),
-        "hors_service": len([e for e in equipments if e.get("statut") == "hors_service"])
+        "total": equipment_counts.get("total", 0),
+        "en_service": equipment_statuts.get("en_service", 0),
+        "maintenance": equipment_statuts.get("maintenance", 0),
+        "hors_service": equipment_statuts.get("hors_service", 0)
     }
     
     # Work orders stats
-    work_orders = await db.work_orders.find({}, {"_id": 0}).to_list(1000)
+    work_order_counts = counters.get("work_orders", {})
+    work_order_statuts = work_order_counts.get("statut", {})
     work_order_stats = {
-        "total": len(work_orders),
-        "planifiee": len([w for w in work_orders if w.get("statut") == "planifiee"]),
-        "en_cours": len([w for w in work_orders if w.get("statut") == "en_cours"]),
-        "terminee": len([w for w in work_orders if w.get("statut") == "terminee"])
+        "total": work_order_counts.get("total", 0),
+        "planifiee": work_order_statuts.get("planifiee", 0),
+        "en_cours": work_order_statuts.get("en_cours", 0),
+        "terminee": work_order_statuts.get("terminee", 0)
     }
     
     # Spare parts with low stock
-    spare_parts = await db.spare_parts.find({}, {"_id": 0}).to_list(1000)
-    low_stock_parts = [p for p in spare_parts if p["quantite_stock"] <= p["seuil_minimum"]]
+    spare_part_totals = counters.get("spare_parts", {})
     
     # Compresseurs avec compteur horaire
-    compresseurs = [e for e in equipments if e.get("type") == "compresseur"]
     compresseurs_stats = []
     for comp in compresseurs:
         compresseurs_stats.append({
@@ -1634,247 +3315,788 @@ async def get_dashboard_stats(current_user: dict = Depends(get_current_user)):
     return {
         "equipment_stats": equipment_stats,
         "work_order_stats": work_order_stats,
-        "low_stock_count": len(low_stock_parts),
-        "total_spare_parts": len(spare_parts),
+        "low_stock_count": spare_part_totals.get("low_stock", 0),
+        "total_spare_parts": spare_part_totals.get("total", 0),
         "compresseurs": compresseurs_stats
     }
 
+@api_router.get("/dashboard/stats")
+async def get_dashboard_stats(current_user: dict = Depends(get_current_user)):
+    return await dashboard_stats()
+
 @api_router.get("/dashboard/alerts")
-async def get_alerts(current_user: dict = Depends(get_current_user)):
-    alerts = []
-    today = datetime.now(timezone.utc).date()
-    
-    # Low stock alerts
-    spare_parts = await db.spare_parts.find({}, {"_id": 0}).to_list(1000)
-    for part in spare_parts:
-        if part["quantite_stock"] <= part["seuil_minimum"]:
-            alerts.append({
-                "type": "stock_bas",
-                "severity": "warning",
-                "title": f"Stock bas: {part['nom']}",
-                "description": f"Quantité: {part['quantite_stock']} / Seuil: {part['seuil_minimum']}",
-                "item_id": part["id"],
-                "item_type": "spare_part"
-            })
-    
-    # Inspection expiration alerts (30 days before)
-    inspections = await db.inspections.find({}, {"_id": 0}).to_list(1000)
-    for inspection in inspections:
-        try:
-            expiry_date = datetime.strptime(inspection["date_validite"], "%Y-%m-%d").date()
-            days_until_expiry = (expiry_date - today).days
-            
-            if days_until_expiry < 0:
-                alerts.append({
-                    "type": "controle_expire",
-                    "severity": "critical",
-                    "title": f"Contrôle expiré: {inspection['titre']}",
-                    "description": f"Expiré depuis {abs(days_until_expiry)} jours",
-                    "item_id": inspection["id"],
-                    "item_type": "inspection"
-                })
-            elif days_until_expiry <= 30:
-                alerts.append({
-                    "type": "controle_proche",
-                    "severity": "warning",
-                    "title": f"Contrôle à renouveler: {inspection['titre']}",
-                    "description": f"Expire dans {days_until_expiry} jours",
-                    "item_id": inspection["id"],
-                    "item_type": "inspection"
-                })
-        except (ValueError, KeyError):
-            pass
-    
-    # Overdue work orders
-    work_orders = await db.work_orders.find({"statut": {"$in": ["planifiee", "en_cours"]}}, {"_id": 0}).to_list(1000)
-    for wo in work_orders:
-        try:
-            planned_date = datetime.strptime(wo["date_planifiee"], "%Y-%m-%d").date()
-            if planned_date < today:
-                days_overdue = (today - planned_date).days
-                alerts.append({
-                    "type": "maintenance_retard",
-                    "severity": "critical" if days_overdue > 7 else "warning",
-                    "title": f"Maintenance en retard: {wo['titre']}",
-                    "description": f"En retard de {days_overdue} jours",
-                    "item_id": wo["id"],
-                    "item_type": "work_order"
-                })
-        except (ValueError, KeyError):
-            pass
-    
-    # Equipment out of service
-    equipments = await db.equipments.find({"statut": "hors_service"}, {"_id": 0}).to_list(1000)
-    for eq in equipments:
-        alerts.append({
-            "type": "equipement_hs",
-            "severity": "critical",
-            "title": f"Équipement hors service: {eq['type']}",
-            "description": f"Réf: {eq['reference']} - S/N: {eq['numero_serie']}",
-            "item_id": eq["id"],
-            "item_type": "equipment"
-        })
-    
-    # Sort by severity
-    severity_order = {"critical": 0, "warning": 1, "info": 2}
-    alerts.sort(key=lambda x: severity_order.get(x["severity"], 3))
+async def get_alerts(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    if_none_match: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user)
+):
+    """Alerts from the precomputed index, most severe first (keyset pagination, ETag)"""
+    version = await db.counters.find_one({"_id": ALERTS_VERSION_ID})
+    etag = f'W/"alerts-{version.get("version", 0) if version else 0}"'
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers={"ETag": etag})
     
+    limit = limit or DEFAULT_PAGE_SIZE
+    query = {}
+    if cursor:
+        rank, key = decode_alert_cursor(cursor)
+        query = {"$or": [{"severity_rank": {"$gt": rank}}, {"severity_rank": rank, "_id": {"$gt": key}}]}
+    alerts = await db.alerts.find(query).sort([("severity_rank", 1), ("_id", 1)]).limit(limit + 1).to_list(limit + 1)
+    if len(alerts) > limit:
+        alerts = alerts[:limit]
+        response.headers["X-Next-Cursor"] = encode_alert_cursor(alerts[-1])
+    response.headers["ETag"] = etag
+    
+    for alert in alerts:
+        del alert["_id"]
+        del alert["severity_rank"]
     return alerts
 
-@api_router.get("/dashboard/upcoming-maintenance")
-async def get_upcoming_maintenance(current_user: dict = Depends(get_current_user)):
-    today = datetime.now(timezone.utc).date()
-    work_orders = await db.work_orders.find(
-        {"statut": {"$in": ["planifiee", "en_cours"]}},
-        {"_id": 0}
-    ).to_list(1000)
-    
+UPCOMING_DEFAULT_LIMIT = 10
+CALENDAR_PAST_WEEKS = 4
+CALENDAR_FUTURE_WEEKS = 52
+CALENDAR_GROUPINGS = ("week",)
+
+def date_window(from_date: Optional[str], to_date_: Optional[str], default_start=None, default_end=None) -> dict:
+    """`date_planifiee` range filter for the from/to query parameters (defaults when omitted)"""
+    start = parse_date_param(from_date) if from_date else default_start
+    end = parse_date_param(to_date_) if to_date_ else default_end
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="Période invalide: 'from' est postérieur à 'to'")
+    window = {}
+    if start:
+        window["$gte"] = start
+    if end:
+        window["$lte"] = end
+    return window
+
+def upcoming_maintenance(work_orders: List[dict], today, limit: int = UPCOMING_DEFAULT_LIMIT) -> List[dict]:
+    """Next `limit` open work orders (overdue first) with their days_until / is_overdue"""
     upcoming = []
     for wo in work_orders:
-        try:
-            planned_date = datetime.strptime(wo["date_planifiee"], "%Y-%m-%d").date()
+        if wo.get("statut") not in ("planifiee", "en_cours"):
+            continue
+        planned_date = to_date(wo.get("date_planifiee"))
+        if planned_date:
             days_diff = (planned_date - today).days
-            wo["days_until"] = days_diff
-            wo["is_overdue"] = days_diff < 0
-            upcoming.append(wo)
-        except (ValueError, KeyError):
-            pass
+            upcoming.append({
+                **wo,
+                "date_planifiee": planned_date.isoformat(),
+                "days_until": days_diff,
+                "is_overdue": days_diff < 0
+            })
     
     # Sort by date
     upcoming.sort(key=lambda x: x.get("days_until", 999))
     
-    return upcoming[:10]  # Return next 10
+    return upcoming[:limit]
 
-@api_router.get("/dashboard/calendar")
-async def get_maintenance_calendar(current_user: dict = Depends(get_current_user)):
-    """Retourne les maintenances planifiées sur 52 semaines pour le calendrier"""
+@api_router.get("/dashboard/upcoming-maintenance")
+async def get_upcoming_maintenance(
+    from_date: Optional[str] = Query(None, alias="from"),
+    to_date_: Optional[str] = Query(None, alias="to"),
+    limit: int = Query(UPCOMING_DEFAULT_LIMIT, ge=1, le=MAX_PAGE_SIZE),
+    current_user: dict = Depends(get_current_user)
+):
+    """Next open work orders by planned date, optionally restricted to [from, to]"""
+    return await find_upcoming_maintenance(from_date, to_date_, limit)
+
+async def find_upcoming_maintenance(from_date: Optional[str] = None, to_date_: Optional[str] = None,
+                                    limit: int = UPCOMING_DEFAULT_LIMIT) -> List[dict]:
+    """Indexed read of the `limit` earliest open work orders (statut, date_planifiee)"""
     today = datetime.now(timezone.utc).date()
-    end_date = today + timedelta(weeks=52)
-    
     work_orders = await db.work_orders.find(
-        {"statut": {"$in": ["planifiee", "en_cours", "terminee"]}},
+        {
+            "statut": {"$in": ["planifiee", "en_cours"]},
+            "date_planifiee": {"$type": "date", **date_window(from_date, to_date_)}
+        },
         {"_id": 0}
-    ).to_list(1000)
-    
-    calendar_data = []
-    
-    for wo in work_orders:
-        try:
-            planned_date = datetime.strptime(wo["date_planifiee"], "%Y-%m-%d").date()
-            # Inclure les maintenances passées (4 semaines) et futures (52 semaines)
-            if planned_date >= today - timedelta(weeks=4) and planned_date <= end_date:
-                # Calculer le numéro de semaine
-                week_number = planned_date.isocalendar()[1]
-                year = planned_date.year
-                
-                calendar_data.append({
-                    "id": wo["id"],
-                    "titre": wo["titre"],
-                    "type_maintenance": wo.get("type_maintenance", "preventive"),
-                    "date_planifiee": wo["date_planifiee"],
-                    "statut": wo["statut"],
-                    "equipment_id": wo.get("equipment_id"),
-                    "priorite": wo.get("priorite", "normale"),
-                    "week_number": week_number,
-                    "year": year,
-                    "periodicite_jours": wo.get("periodicite_jours"),
-                    "periodicite_heures": wo.get("periodicite_heures")
-                })
-        except (ValueError, KeyError):
-            pass
-    
-    # Trier par date
-    calendar_data.sort(key=lambda x: x["date_planifiee"])
+    ).sort("date_planifiee", 1).limit(limit).to_list(limit)
+    return upcoming_maintenance(work_orders, today, limit)
+
+# Fields of a work order shown in the calendar
+CALENDAR_FIELDS = ("id", "titre", "type_maintenance", "date_planifiee", "statut", "equipment_id",
+                   "priorite", "periodicite_jours", "periodicite_heures")
+
+def calendar_entry(wo: dict, planned_date) -> dict:
+    return {
+        "id": wo["id"],
+        "titre": wo["titre"],
+        "type_maintenance": wo.get("type_maintenance", "preventive"),
+        "date_planifiee": planned_date.isoformat(),
+        "statut": wo["statut"],
+        "equipment_id": wo.get("equipment_id"),
+        "priorite": wo.get("priorite", "normale"),
+        "week_number": planned_date.isocalendar()[1],
+        "year": planned_date.year,
+        "periodicite_jours": wo.get("periodicite_jours"),
+        "periodicite_heures": wo.get("periodicite_heures")
+    }
+
+@api_router.get("/dashboard/calendar")
+async def get_maintenance_calendar(
+    from_date: Optional[str] = Query(None, alias="from"),
+    to_date_: Optional[str] = Query(None, alias="to"),
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    group_by: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Retourne les maintenances planifiées entre `from` et `to` (par défaut -4 / +52 semaines).
+
+    Avec `group_by=week`, les maintenances sont regroupées par semaine ISO côté base.
+    """
+    if group_by and group_by not in CALENDAR_GROUPINGS:
+        raise HTTPException(status_code=400, detail=f"Regroupement inconnu: {group_by}")
+    return await find_maintenance_calendar(from_date, to_date_, limit, group_by)
+
+async def find_maintenance_calendar(from_date: Optional[str] = None, to_date_: Optional[str] = None,
+                                    limit: int = MAX_PAGE_SIZE, group_by: Optional[str] = None) -> List[dict]:
+    """Indexed, windowed read of the calendar entries (optionally grouped by ISO week)"""
+    today = datetime.now(timezone.utc).date()
+    query = {
+        "statut": {"$in": ["planifiee", "en_cours", "terminee"]},
+        "date_planifiee": date_window(
+            from_date, to_date_,
+            day_start(today - timedelta(weeks=CALENDAR_PAST_WEEKS)),
+            day_start(today + timedelta(weeks=CALENDAR_FUTURE_WEEKS))
+        )
+    }
+    projection = {"_id": 0, **{name: 1 for name in CALENDAR_FIELDS}}
+    
+    if group_by == "week":
+        weeks = await db.work_orders.aggregate([
+            {"$match": query},
+            {"$sort": {"date_planifiee": 1}},
+            {"$limit": limit},
+            {"$project": projection},
+            {"$group": {
+                "_id": {"year": {"$isoWeekYear": "$date_planifiee"}, "week": {"$isoWeek": "$date_planifiee"}},
+                "count": {"$sum": 1},
+                "work_orders": {"$push": "$$ROOT"}
+            }},
+            {"$sort": {"_id.year": 1, "_id.week": 1}}
+        ]).to_list(None)
+        return [
+            {
+                "year": week["_id"]["year"],
+                "week_number": week["_id"]["week"],
+                "count": week["count"],
+                "work_orders": [calendar_entry(wo, to_date(wo["date_planifiee"])) for wo in week["work_orders"]]
+            }
+            for week in weeks
+        ]
     
-    return calendar_data
+    work_orders = await db.work_orders.find(query, projection).sort("date_planifiee", 1).limit(limit).to_list(limit)
+    return [calendar_entry(wo, to_date(wo["date_planifiee"])) for wo in work_orders]
+
+DASHBOARD_SECTIONS = ("stats", "alerts", "upcoming", "calendar", "caisson")
+
+@api_router.get("/dashboard/summary")
+async def get_dashboard_summary(include: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    """All dashboard sections in one response; `include` selects a comma-separated subset"""
+    sections = DASHBOARD_SECTIONS
+    if include:
+        sections = [s.strip() for s in include.split(",") if s.strip()]
+        unknown = [s for s in sections if s not in DASHBOARD_SECTIONS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Sections inconnues: {', '.join(unknown)}")
+    jobs = {}
+    if "stats" in sections:
+        jobs["stats"] = dashboard_stats()
+    if "alerts" in sections:
+        jobs["alerts"] = db.alerts.find({}, {"_id": 0, "severity_rank": 0}).sort([("severity_rank", 1), ("_id", 1)]).to_list(None)
+    if "caisson" in sections:
+        jobs["caisson"] = db.caisson.find_one({}, {"_id": 0})
+    # Same bounded, indexed queries as /dashboard/upcoming-maintenance and /dashboard/calendar
+    if "upcoming" in sections:
+        jobs["upcoming"] = find_upcoming_maintenance()
+    if "calendar" in sections:
+        jobs["calendar"] = find_maintenance_calendar()
+    
+    return dict(zip(jobs, await asyncio.gather(*jobs.values())))
 
 # ==================== EXPORT ROUTES ====================
 
+EXPORT_MODELS = {
+    "equipments": Equipment,
+    "work_orders": WorkOrder,
+    "interventions": Intervention,
+    "inspections": Inspection,
+    "spare_parts": SparePart,
+}
+
+# Documents read so far by the export running in this context (set by background export jobs)
+export_progress = contextvars.ContextVar("export_progress", default=None)
+
+async def export_batches(collection: str, query: Optional[dict] = None, projection: Optional[dict] = None,
+                         sort: Optional[list] = None, include_id: bool = False):
+    """Documents of `collection` in _id order (or `sort`), one batch of EXPORT_BATCH_SIZE at a time"""
+    progress = export_progress.get()
+    batch = []
+    cursor = db[collection].find(query or {}, projection if include_id else {**(projection or {}), "_id": 0})
+    async for doc in cursor.sort(sort or [("_id", 1)]).batch_size(EXPORT_BATCH_SIZE):
+        batch.append(doc)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            if progress is not None:
+                progress["processed"] += len(batch)
+            yield batch
+            batch = []
+    if batch:
+        if progress is not None:
+            progress["processed"] += len(batch)
+        yield batch
+
+async def stored_keys(collection: str) -> List[str]:
+    """Union of the top-level keys stored in `collection`, sorted"""
+    result = await db[collection].aggregate([
+        {"$project": {"_id": 0, "keys": {"$map": {"input": {"$objectToArray": "$$ROOT"}, "in": "$$this.k"}}}},
+        {"$unwind": "$keys"},
+        {"$group": {"_id": None, "keys": {"$addToSet": "$keys"}}}
+    ]).to_list(1)
+    return sorted(k for k in (result[0]["keys"] if result else []) if k != "_id")
+
+async def csv_columns(collection: str) -> List[str]:
+    """Model fields in declaration order, then any other stored key (legacy fields) sorted"""
+    columns = list(EXPORT_MODELS[collection].model_fields)
+    return columns + [k for k in await stored_keys(collection) if k not in columns]
+
+def csv_value(value):
+    """Flatten a stored value into one CSV cell.
+
+    Lists of scalars are joined with " | "; objects and lists of objects are written as
+    compact JSON with sorted keys, so the same document always gives the same cell.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, list) and not any(isinstance(v, (dict, list)) for v in value):
+        return " | ".join(str(csv_value(v)) for v in value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=json_default)
+    return value
+
+def export_document(collection: str, doc: dict) -> dict:
+    """Stored dates of DATE_FIELDS written back as "YYYY-MM-DD", like the API returns them"""
+    for name in DATE_FIELDS.get(collection, ()):
+        if name in doc:
+            doc[name] = format_date_value(doc[name])
+    return doc
+
+async def csv_rows(collection: str, columns: List[str]):
+    """CSV text of `collection`, header first, then one chunk per batch of documents"""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(columns)
+    async for batch in export_batches(collection):
+        for doc in batch:
+            doc = export_document(collection, doc)
+            writer.writerow([csv_value(doc.get(column)) for column in columns])
+        yield output.getvalue()
+        output.seek(0)
+        output.truncate()
+    if output.tell():
+        yield output.getvalue()
+
 @api_router.get("/export/csv/{collection}")
 async def export_csv(collection: str, current_user: dict = Depends(get_current_user)):
     # Check permission
     if not can_export(current_user):
         raise HTTPException(status_code=403, detail="Accès réservé aux administrateurs et techniciens")
     
-    valid_collections = ["equipments", "work_orders", "interventions", "inspections", "spare_parts"]
-    if collection not in valid_collections:
+    if collection not in EXPORT_MODELS:
         raise HTTPException(status_code=400, detail="Collection invalide")
     
-    data = await db[collection].find({}, {"_id": 0}).to_list(10000)
-    
-    if not data:
+    if not await db[collection].find_one({}, {"_id": 1}):
         raise HTTPException(status_code=404, detail="Aucune donnée à exporter")
     
-    output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=data[0].keys())
-    writer.writeheader()
-    writer.writerows(data)
-    
-    output.seek(0)
     return StreamingResponse(
-        iter([output.getvalue()]),
+        csv_rows(collection, await csv_columns(collection)),
         media_type="text/csv",
         headers={"Content-Disposition": f"attachment; filename={collection}.csv"}
     )
 
+SQL_EXPORT_MODELS = {
+    "caisson": Caisson,
+    "equipments": Equipment,
+    "work_orders": WorkOrder,
+    "interventions": Intervention,
+    "inspections": Inspection,
+    "spare_parts": SparePart,
+    "users": User,
+}
+SQL_TYPES = {str: "TEXT", int: "INTEGER", float: "REAL", bool: "BOOLEAN", datetime: "TIMESTAMP"}
+# Columns of the child tables holding List[dict] fields; other keys go to the JSON `data` column
+SQL_CHILD_COLUMNS = {
+    "documents": [("filename", "TEXT"), ("url", "TEXT"), ("uploaded_at", "TIMESTAMP")],
+    "procedure_documents": [("filename", "TEXT"), ("url", "TEXT"), ("uploaded_at", "TIMESTAMP")],
+    "historique_compteur": [
+        ("date", "TIMESTAMP"), ("valeur", "REAL"), ("ancienne_valeur", "REAL"),
+        ("technicien", "TEXT"), ("intervention", "BOOLEAN")
+    ],
+    "pieces_utilisees": [("spare_part_id", "TEXT"), ("nom", "TEXT"), ("quantite", "INTEGER")],
+}
+
+def sql_column_type(table: str, name: str, annotation) -> str:
+    if name in DATE_FIELDS.get(table, ()):
+        return "DATE"
+    if typing.get_origin(annotation) is typing.Union:
+        annotation = next(a for a in typing.get_args(annotation) if a is not type(None))
+    return SQL_TYPES.get(annotation, "TEXT")
+
+@functools.lru_cache(maxsize=None)
+def sql_schema(table: str) -> dict:
+    """Columns of `table` typed from its model; list fields become child tables.
+
+    Child rows reference the parent id and keep the list position. Lists of scalars
+    have a single `value` column, lists of objects the columns of SQL_CHILD_COLUMNS.
+    """
+    columns, children = [], []
+    for name, field in SQL_EXPORT_MODELS[table].model_fields.items():
+        item_type = typing.get_args(field.annotation)[0] if typing.get_origin(field.annotation) is list else None
+        if item_type is None:
+            columns.append((name, sql_column_type(table, name, field.annotation)))
+        elif item_type is dict:
+            children.append((f"{table}_{name}", name, SQL_CHILD_COLUMNS.get(name, []) + [("data", "TEXT")]))
+        else:
+            children.append((f"{table}_{name}", name, [("value", SQL_TYPES.get(item_type, "TEXT"))]))
+    return {"columns": columns, "children": children}
+
+def sql_create_statements(table: str) -> List[str]:
+    schema = sql_schema(table)
+    columns = ", ".join(f"{name} {kind}{' PRIMARY KEY' if name == 'id' else ''}" for name, kind in schema["columns"])
+    statements = [f"CREATE TABLE IF NOT EXISTS {table} ({columns});"]
+    for child, _, child_columns in schema["children"]:
+        columns = ", ".join(f"{name} {kind}" for name, kind in child_columns)
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {child} (parent_id TEXT REFERENCES {table}(id), position INTEGER, {columns});"
+        )
+    return statements
+
+def sql_value(value, kind: str):
+    """Python value stored for a column of type `kind` (also what sqlite3 receives)"""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if kind == "DATE":
+        return format_date_value(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, sort_keys=True, default=json_default)
+    return str(value)
+
+def sql_literal(value) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + value.replace("'", "''") + "'"
+
+def sql_rows(table: str, docs: List[dict]) -> List[tuple]:
+    """(table, column names, rows) for a batch of documents: the parent table, then each child table"""
+    schema = sql_schema(table)
+    rows = [tuple(sql_value(doc.get(name), kind) for name, kind in schema["columns"]) for doc in docs]
+    tables = [(table, [name for name, _ in schema["columns"]], rows)]
+    for child, field, child_columns in schema["children"]:
+        child_rows = []
+        for doc in docs:
+            items = doc.get(field) or []
+            for position, item in enumerate(items if isinstance(items, list) else [items]):
+                if child_columns[0][0] == "value":
+                    child_rows.append((doc.get("id"), position, sql_value(item, child_columns[0][1])))
+                    continue
+                item = item if isinstance(item, dict) else {"value": item}
+                declared = child_columns[:-1]
+                rest = {k: v for k, v in item.items() if k not in dict(declared)}
+                child_rows.append(
+                    (doc.get("id"), position)
+                    + tuple(sql_value(item.get(name), kind) for name, kind in declared)
+                    + (sql_value(rest, "TEXT") if rest else None,)
+                )
+        names = ["parent_id", "position"] + [name for name, _ in child_columns]
+        tables.append((child, names, child_rows))
+    return tables
+
+async def sql_export_batches(tables: List[str]):
+    """(table, column names, rows) for every table, EXPORT_BATCH_SIZE parent documents at a time"""
+    for table in tables:
+        model = SQL_EXPORT_MODELS[table]
+        async for docs in export_batches(table, projection=model_projection(model)):
+            for entry in sql_rows(table, docs):
+                if entry[2]:
+                    yield entry
+
+async def sql_dump_chunks(tables: List[str]):
+    """SQL script: CREATE TABLE statements, then one multi-row INSERT per table and batch"""
+    header = [
+        "-- HyperbareManager Database Export",
+        f"-- Generated: {datetime.now(timezone.utc).isoformat()}",
+        "",
+        "BEGIN;",
+    ]
+    for table in tables:
+        header.extend(sql_create_statements(table))
+    yield "\n".join(header) + "\n\n"
+    async for table, names, rows in sql_export_batches(tables):
+        values = ",\n".join("(" + ", ".join(sql_literal(v) for v in row) + ")" for row in rows)
+        yield f"INSERT INTO {table} ({', '.join(names)}) VALUES\n{values};\n\n"
+    yield "COMMIT;\n"
+
+async def build_sqlite_export(tables: List[str]) -> str:
+    """Write the SQL export to a temporary SQLite file and return its path.
+
+    Mongo is read on the event loop; every sqlite3 call runs on one worker thread,
+    with executemany per table and batch.
+    """
+    fd, path = tempfile.mkstemp(prefix="hyperbaremanager_", suffix=".sqlite")
+    os.close(fd)
+    loop = asyncio.get_running_loop()
+    writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-export")
+
+    def open_database():
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        for table in tables:
+            for statement in sql_create_statements(table):
+                conn.execute(statement)
+        return conn
+
+    def insert(conn, table, names, rows):
+        placeholders = ", ".join("?" for _ in names)
+        conn.executemany(f"INSERT INTO {table} ({', '.join(names)}) VALUES ({placeholders})", rows)
+
+    conn = None
+    try:
+        conn = await loop.run_in_executor(writer, open_database)
+        async for table, names, rows in sql_export_batches(tables):
+            await loop.run_in_executor(writer, insert, conn, table, names, rows)
+        await loop.run_in_executor(writer, conn.commit)
+        return path
+    except Exception:
+        os.unlink(path)
+        raise
+    finally:
+        if conn is not None:
+            await loop.run_in_executor(writer, conn.close)
+        writer.shutdown(wait=False)
+
 @api_router.get("/export/sql")
-async def export_sql(current_user: dict = Depends(get_current_user)):
+async def export_sql(format: str = "sql", current_user: dict = Depends(get_current_user)):
+    """SQL dump (`format=sql`) or ready-to-open SQLite database (`format=sqlite`)"""
     # Check permission
     if not can_export(current_user):
         raise HTTPException(status_code=403, detail="Accès réservé aux administrateurs et techniciens")
     
-    collections = ["caisson", "equipments", "work_orders", "interventions", "inspections", "spare_parts", "users"]
-    
-    sql_output = []
-    sql_output.append("-- HyperbareManager Database Export")
-    sql_output.append(f"-- Generated: {datetime.now(timezone.utc).isoformat()}")
-    sql_output.append("")
-    
-    for coll_name in collections:
-        data = await db[coll_name].find({}, {"_id": 0}).to_list(10000)
-        if data:
-            # Create table statement
-            sample = data[0]
-            columns = ", ".join([f"{k} TEXT" for k in sample.keys()])
-            sql_output.append(f"CREATE TABLE IF NOT EXISTS {coll_name} ({columns});")
-            sql_output.append("")
-            
-            # Insert statements
-            for row in data:
-                cols = ", ".join(row.keys())
-                vals = ", ".join([f"'{str(v).replace(chr(39), chr(39)+chr(39))}'" for v in row.values()])
-                sql_output.append(f"INSERT INTO {coll_name} ({cols}) VALUES ({vals});")
-            sql_output.append("")
-    
-    output = "\n".join(sql_output)
+    tables = list(SQL_EXPORT_MODELS)
+    if format == "sqlite":
+        path = await build_sqlite_export(tables)
+        return FileResponse(
+            path,
+            media_type="application/vnd.sqlite3",
+            filename="hyperbaremanager_export.sqlite",
+            background=BackgroundTask(os.unlink, path)
+        )
+    if format != "sql":
+        raise HTTPException(status_code=400, detail="Format invalide (sql ou sqlite)")
     
     return StreamingResponse(
-        iter([output]),
+        sql_dump_chunks(tables),
         media_type="application/sql",
         headers={"Content-Disposition": "attachment; filename=hyperbaremanager_export.sql"}
     )
 
+# Columnar exports: dataset -> source collection. historique_compteur is one row per hour-meter reading
+COLUMNAR_DATASETS = {
+    "interventions": "interventions",
+    "work_orders": "work_orders",
+    "spare_parts": "spare_parts",
+    "historique_compteur": "equipments",
+}
+COLUMNAR_FORMATS = {
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "arrow": ("arrow", "application/vnd.apache.arrow.file"),
+}
+READING_COLUMNS = SQL_CHILD_COLUMNS["historique_compteur"] + [("data", "TEXT")]
+HISTORIQUE_COLUMNS = [("equipment_id", "TEXT"), ("equipment_reference", "TEXT"), ("position", "INTEGER")] + READING_COLUMNS
+
+def arrow_type(kind: str):
+    return {
+        "TEXT": pyarrow.string(),
+        "INTEGER": pyarrow.int64(),
+        "REAL": pyarrow.float64(),
+        "BOOLEAN": pyarrow.bool_(),
+        "TIMESTAMP": pyarrow.timestamp("ms", tz="UTC"),
+        "DATE": pyarrow.date32(),
+    }[kind]
+
+def columnar_layout(dataset: str) -> List[tuple]:
+    """[(column, form, type)] of a dataset, typed like the SQL export.
+
+    `form` is "value" (type: SQL type), "list" for lists of scalars (type of the items)
+    or "records" for lists of objects (type: the columns of the SQL child table).
+    """
+    if dataset == "historique_compteur":
+        return [(name, "value", kind) for name, kind in HISTORIQUE_COLUMNS]
+    schema = sql_schema(dataset)
+    layout = [(name, "value", kind) for name, kind in schema["columns"]]
+    for _, field, child_columns in schema["children"]:
+        if child_columns[0][0] == "value":
+            layout.append((field, "list", child_columns[0][1]))
+        else:
+            layout.append((field, "records", child_columns))
+    return layout
+
+def arrow_schema(dataset: str):
+    fields = []
+    for name, form, kind in columnar_layout(dataset):
+        if form == "records":
+            fields.append((name, pyarrow.list_(pyarrow.struct([(n, arrow_type(k)) for n, k in kind]))))
+        elif form == "list":
+            fields.append((name, pyarrow.list_(arrow_type(kind))))
+        else:
+            fields.append((name, arrow_type(kind)))
+    return pyarrow.schema(fields)
+
+def arrow_value(value, kind: str):
+    """`value` converted for a column of type `kind`; values that do not fit become null"""
+    if value is None:
+        return None
+    try:
+        if kind == "TIMESTAMP":
+            moment = value if isinstance(value, datetime) else datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+            return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+        if kind == "DATE":
+            return to_date(value)
+        if kind == "INTEGER":
+            return int(value)
+        if kind == "REAL":
+            return float(value)
+        if kind == "BOOLEAN":
+            # bool("false") is True: only real booleans and 0/1 are kept
+            if isinstance(value, bool):
+                return value
+            return bool(value) if isinstance(value, int) and value in (0, 1) else None
+    except (TypeError, ValueError):
+        return None
+    text = sql_value(value, kind)
+    return text if isinstance(text, str) else str(text)
+
+def arrow_record(item: dict, columns: List[tuple]) -> dict:
+    """Declared keys of a list item typed, any other key kept as JSON in `data`"""
+    record = {name: arrow_value(item.get(name), kind) for name, kind in columns if name != "data"}
+    rest = {k: v for k, v in item.items() if k not in record}
+    record["data"] = sql_value(rest, "TEXT") if rest else None
+    return record
+
+def columnar_rows(dataset: str, docs: List[dict]) -> List[dict]:
+    if dataset == "historique_compteur":
+        return [
+            {"equipment_id": doc.get("id"), "equipment_reference": doc.get("reference"), "position": position,
+             **arrow_record(reading, READING_COLUMNS)}
+            for doc in docs
+            for position, reading in enumerate(doc.get("historique_compteur") or [])
+            if isinstance(reading, dict)
+        ]
+    layout = columnar_layout(dataset)
+    rows = []
+    for doc in docs:
+        row = {}
+        for name, form, kind in layout:
+            value = doc.get(name)
+            if form == "records":
+                row[name] = [arrow_record(item, kind) for item in value if isinstance(item, dict)] if isinstance(value, list) else []
+            elif form == "list":
+                row[name] = [arrow_value(item, kind) for item in value] if isinstance(value, list) else []
+            else:
+                row[name] = arrow_value(value, kind)
+        rows.append(row)
+    return rows
+
+async def build_columnar_export(dataset: str, format: str) -> str:
+    """Write `dataset` to a temporary Parquet or Arrow IPC file and return its path.
+
+    Mongo is read on the event loop in EXPORT_BATCH_SIZE batches; turning each batch
+    into a record batch and writing it runs on one worker thread.
+    """
+    fd, path = tempfile.mkstemp(prefix="hyperbaremanager_", suffix=f".{COLUMNAR_FORMATS[format][0]}")
+    os.close(fd)
+    loop = asyncio.get_running_loop()
+    writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="columnar-export")
+    schema = arrow_schema(dataset)
+    if dataset == "historique_compteur":
+        query, projection = {"historique_compteur.0": {"$exists": True}}, {"id": 1, "reference": 1, "historique_compteur": 1}
+    else:
+        query, projection = None, model_projection(SQL_EXPORT_MODELS[dataset])
+
+    def open_sink():
+        if format == "parquet":
+            return pyarrow.parquet.ParquetWriter(path, schema, compression="zstd")
+        return pyarrow.ipc.new_file(path, schema)
+
+    def write(sink, docs):
+        rows = columnar_rows(dataset, docs)
+        if rows:
+            sink.write_batch(pyarrow.RecordBatch.from_pylist(rows, schema=schema))
+
+    sink = None
+    try:
+        sink = await loop.run_in_executor(writer, open_sink)
+        async for docs in export_batches(COLUMNAR_DATASETS[dataset], query, projection):
+            await loop.run_in_executor(writer, write, sink, docs)
+        await loop.run_in_executor(writer, sink.close)
+        sink = None
+        return path
+    except Exception:
+        if sink is not None:
+            await loop.run_in_executor(writer, sink.close)
+        os.unlink(path)
+        raise
+    finally:
+        writer.shutdown(wait=False)
+
+@api_router.get("/export/parquet/{dataset}")
+async def export_parquet(dataset: str, format: str = "parquet", current_user: dict = Depends(get_current_user)):
+    """Typed columnar export of one dataset, as Parquet or (`format=arrow`) Arrow IPC file"""
+    if not can_export(current_user):
+        raise HTTPException(status_code=403, detail="Accès réservé aux administrateurs et techniciens")
+    if pyarrow is None:
+        raise HTTPException(status_code=501, detail="Export Parquet indisponible : pyarrow n'est pas installé")
+    if dataset not in COLUMNAR_DATASETS:
+        raise HTTPException(status_code=400, detail="Jeu de données invalide")
+    if format not in COLUMNAR_FORMATS:
+        raise HTTPException(status_code=400, detail="Format invalide (parquet ou arrow)")
+    
+    path = await build_columnar_export(dataset, format)
+    extension, media_type = COLUMNAR_FORMATS[format]
+    return FileResponse(
+        path,
+        media_type=media_type,
+        filename=f"{dataset}.{extension}",
+        background=BackgroundTask(os.unlink, path)
+    )
+
+JSON_EXPORT_COLLECTIONS = ["caisson", "equipments", "work_orders", "interventions", "inspections", "spare_parts"]
+
+async def json_export_chunks(collections: List[str]):
+    """One JSON object {collection: [documents]} written collection by collection, one document per line"""
+    yield b"{"
+    for position, collection in enumerate(collections):
+        yield (b",\n  " if position else b"\n  ") + encode_json(collection) + b": ["
+        first = True
+        async for batch in export_batches(collection):
+            lines = []
+            for doc in batch:
+                lines.append((b"\n    " if first else b",\n    ") + encode_json(export_document(collection, doc)))
+                first = False
+            yield b"".join(lines)
+        yield b"]" if first else b"\n  ]"
+    yield b"\n}\n"
+
+async def ndjson_export_chunks(collections: List[str]):
+    """One JSON record per line, tagged with its source collection in `_collection`"""
+    for collection in collections:
+        async for batch in export_batches(collection):
+            yield b"".join(
+                encode_json({"_collection": collection, **export_document(collection, doc)}) + b"\n"
+                for doc in batch
+            )
+
 @api_router.get("/export/json")
 async def export_json(current_user: dict = Depends(get_current_user)):
     # Check permission
     if not can_export(current_user):
         raise HTTPException(status_code=403, detail="Accès réservé aux administrateurs et techniciens")
     
-    collections = ["caisson", "equipments", "work_orders", "interventions", "inspections", "spare_parts"]
-    
-    export_data = {}
-    for coll_name in collections:
-        data = await db[coll_name].find({}, {"_id": 0}).to_list(10000)
-        export_data[coll_name] = data
-    
-    output = json.dumps(export_data, indent=2, ensure_ascii=False, default=str)
-    
     return StreamingResponse(
-        iter([output]),
+        json_export_chunks(JSON_EXPORT_COLLECTIONS),
         media_type="application/json",
         headers={"Content-Disposition": "attachment; filename=hyperbaremanager_export.json"}
     )
 
+@api_router.get("/export/ndjson")
+async def export_ndjson(current_user: dict = Depends(get_current_user)):
+    """Same content as /export/json, one `_collection`-tagged record per line"""
+    if not can_export(current_user):
+        raise HTTPException(status_code=403, detail="Accès réservé aux administrateurs et techniciens")
+    
+    return StreamingResponse(
+        ndjson_export_chunks(JSON_EXPORT_COLLECTIONS),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=hyperbaremanager_export.ndjson"}
+    )
+
+# counters document holding the time of the last backup restore: older resume tokens are refused
+RESTORE_EPOCH_ID = "restore_epoch"
+
+def encode_resume_token(checkpoint: datetime) -> str:
+    return base64.urlsafe_b64encode(checkpoint.isoformat().encode()).decode().rstrip("=")
+
+def decode_resume_token(token: str) -> datetime:
+    try:
+        checkpoint = datetime.fromisoformat(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode())
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Point de reprise invalide")
+    if checkpoint.tzinfo is None:
+        raise HTTPException(status_code=400, detail="Point de reprise invalide")
+    return checkpoint
+
+async def change_chunks(collections: List[str], since: Optional[datetime], until: datetime, token: str):
+    """NDJSON of the documents written in (since, until] and the deletions in the same window.
+
+    Documents are tagged `"_op": "upsert"`, deletions `"_op": "delete"` with the id and
+    deletion time; the last line carries the token of the next call.
+    """
+    window = {"$gt": since, "$lte": until} if since else {"$lte": until}
+    for collection in collections:
+        async for batch in export_batches(collection, {"updated_at": window}, sort=[("updated_at", 1), ("_id", 1)]):
+            yield b"".join(
+                encode_json({"_collection": collection, "_op": "upsert", **export_document(collection, doc)}) + b"\n"
+                for doc in batch
+            )
+        if since is None:
+            continue
+        async for batch in export_batches("tombstones", {"collection": collection, "deleted_at": window},
+                                          {"id": 1, "deleted_at": 1}, sort=[("deleted_at", 1), ("_id", 1)]):
+            yield b"".join(
+                encode_json({"_collection": collection, "_op": "delete", **doc}) + b"\n" for doc in batch
+            )
+    yield encode_json({"_resume_token": token}) + b"\n"
+
+@api_router.get("/export/changes")
+async def export_changes(since: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    """Delta of the JSON export since the `since` resume token, as NDJSON (full snapshot without it).
+
+    The new token is in the X-Resume-Token header and on the last line. It stops
+    CHANGES_SETTLE_SECONDS in the past so in-flight writes are picked up by the next call.
+    """
+    if not can_export(current_user):
+        raise HTTPException(status_code=403, detail="Accès réservé aux administrateurs et techniciens")
+    
+    now = datetime.now(timezone.utc)
+    checkpoint = decode_resume_token(since) if since else None
+    if checkpoint and checkpoint < now - timedelta(days=TOMBSTONE_RETENTION_DAYS):
+        raise HTTPException(status_code=410, detail="Point de reprise expiré, un export complet est nécessaire")
+    restore = await db.counters.find_one({"_id": RESTORE_EPOCH_ID})
+    restored_at = restore["at"].replace(tzinfo=timezone.utc) if restore else None
+    if checkpoint and restored_at and checkpoint < restored_at:
+        raise HTTPException(status_code=410, detail="Base restaurée depuis ce point de reprise, un export complet est nécessaire")
+    
+    until = now - timedelta(seconds=CHANGES_SETTLE_SECONDS)
+    until = until.replace(microsecond=until.microsecond // 1000 * 1000)  # BSON dates are in milliseconds
+    # Tokens issued after a restore must not fall before it, or they would be refused right away
+    until = max(t for t in (until, checkpoint, restored_at) if t)
+    token = encode_resume_token(until)
+    return StreamingResponse(
+        change_chunks(JSON_EXPORT_COLLECTIONS, checkpoint, until, token),
+        media_type="application/x-ndjson",
+        headers={"X-Resume-Token": token}
+    )
+
 # ==================== FILE UPLOAD ROUTES ====================
 
 ALLOWED_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
@@ -1885,6 +4107,7 @@ def get_file_extension(filename: str) -> str:
     return Path(filename).suffix.lower()
 
 @api_router.post("/equipments/{equipment_id}/photos")
+@invalidates("equipments")
 async def upload_equipment_photo(
     equipment_id: str,
     file: UploadFile = File(...),
@@ -1913,12 +4136,13 @@ async def upload_equipment_photo(
     photo_url = f"/api/uploads/equipments/{unique_filename}"
     await db.equipments.update_one(
         {"id": equipment_id},
-        {"$push": {"photos": photo_url}}
+        touch({"$push": {"photos": photo_url}})
     )
     
     return {"filename": file.filename, "url": photo_url}
 
 @api_router.post("/equipments/{equipment_id}/documents")
+@invalidates("equipments")
 async def upload_equipment_document(
     equipment_id: str,
     file: UploadFile = File(...),
@@ -1952,12 +4176,13 @@ async def upload_equipment_document(
     }
     await db.equipments.update_one(
         {"id": equipment_id},
-        {"$push": {"documents": doc_info}}
+        touch({"$push": {"documents": doc_info}})
     )
     
     return doc_info
 
 @api_router.delete("/equipments/{equipment_id}/photos")
+@invalidates("equipments")
 async def delete_equipment_photo(
     equipment_id: str,
     photo_url: str,
@@ -1967,7 +4192,7 @@ async def delete_equipment_photo(
     # Remove from database
     await db.equipments.update_one(
         {"id": equipment_id},
-        {"$pull": {"photos": photo_url}}
+        touch({"$pull": {"photos": photo_url}})
     )
     
     # Delete file
@@ -1979,6 +4204,7 @@ async def delete_equipment_photo(
     return {"message": "Photo supprimée"}
 
 @api_router.delete("/equipments/{equipment_id}/documents")
+@invalidates("equipments")
 async def delete_equipment_document(
     equipment_id: str,
     doc_url: str,
@@ -1988,7 +4214,7 @@ async def delete_equipment_document(
     # Remove from database
     await db.equipments.update_one(
         {"id": equipment_id},
-        {"$pull": {"documents": {"url": doc_url}}}
+        touch({"$pull": {"documents": {"url": doc_url}}})
     )
     
     # Delete file
@@ -2000,6 +4226,7 @@ async def delete_equipment_document(
     return {"message": "Document supprimé"}
 
 @api_router.post("/inspections/{inspection_id}/procedures")
+@invalidates("inspections")
 async def upload_inspection_procedure(
     inspection_id: str,
     file: UploadFile = File(...),
@@ -2033,12 +4260,13 @@ async def upload_inspection_procedure(
     }
     await db.inspections.update_one(
         {"id": inspection_id},
-        {"$push": {"procedure_documents": doc_info}}
+        touch({"$push": {"procedure_documents": doc_info}})
     )
     
     return doc_info
 
 @api_router.delete("/inspections/{inspection_id}/procedures")
+@invalidates("inspections")
 async def delete_inspection_procedure(
     inspection_id: str,
     doc_url: str,
@@ -2048,7 +4276,7 @@ async def delete_inspection_procedure(
     # Remove from database
     await db.inspections.update_one(
         {"id": inspection_id},
-        {"$pull": {"procedure_documents": {"url": doc_url}}}
+        touch({"$pull": {"procedure_documents": {"url": doc_url}}})
     )
     
     # Delete file
@@ -2086,12 +4314,7 @@ async def get_uploaded_file(folder: str, filename: str):
 
 # ==================== MAINTENANCE REPORT ====================
 
-@api_router.get("/reports/maintenance")
-async def get_maintenance_report(
-    start_date: Optional[str] = None,
-    end_date: Optional[str] = None,
-    current_user: dict = Depends(get_current_user)
-):
+async def maintenance_report(start_date: Optional[str] = None, end_date: Optional[str] = None) -> dict:
     """Generate a maintenance report"""
     query = {}
     
@@ -2099,9 +4322,9 @@ async def get_maintenance_report(
     if start_date or end_date:
         date_filter = {}
         if start_date:
-            date_filter["$gte"] = start_date
+            date_filter["$gte"] = parse_date_param(start_date)
         if end_date:
-            date_filter["$lte"] = end_date
+            date_filter["$lte"] = parse_date_param(end_date)
         query["date_intervention"] = date_filter
     
     # Get interventions
@@ -2141,7 +4364,7 @@ async def get_maintenance_report(
             report["summary"]["corrective_count"] += 1
         
         report["interventions"].append({
-            "date": intervention.get("date_intervention"),
+            "date": format_date_value(intervention.get("date_intervention")),
             "technicien": intervention.get("technicien"),
             "ordre_travail": wo.get("titre", "N/A"),
             "type_maintenance": wo.get("type_maintenance", "N/A"),
@@ -2154,6 +4377,21 @@ async def get_maintenance_report(
     
     return report
 
+# Collections the JSON reports are built from
+MAINTENANCE_REPORT_SOURCES = ("interventions", "work_orders", "equipments")
+STATISTICS_REPORT_SOURCES = ("equipments", "work_orders", "interventions", "inspections", "spare_parts")
+
+@api_router.get("/reports/maintenance")
+async def get_maintenance_report(
+    request: Request,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    return await cached_response(
+        request, current_user, MAINTENANCE_REPORT_SOURCES, lambda: maintenance_report(start_date, end_date)
+    )
+
 @api_router.get("/reports/maintenance/csv")
 async def export_maintenance_report_csv(
     start_date: Optional[str] = None,
@@ -2165,7 +4403,7 @@ async def export_maintenance_report_csv(
     if not can_export(current_user):
         raise HTTPException(status_code=403, detail="Accès réservé aux administrateurs et techniciens")
     
-    report = await get_maintenance_report(start_date, end_date, current_user)
+    report = await maintenance_report(start_date, end_date)
     
     output = io.StringIO()
     writer = csv.writer(output, delimiter=';')
@@ -2198,12 +4436,8 @@ async def export_maintenance_report_csv(
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
 
-@api_router.get("/reports/statistics")
-async def get_statistics_report(current_user: dict = Depends(get_current_user)):
+async def statistics_report() -> dict:
     """Get comprehensive statistics report"""
-    if not can_export(current_user):
-        raise HTTPException(status_code=403, detail="Accès réservé aux administrateurs et techniciens")
-    
     today = datetime.now(timezone.utc).date()
     
     # Equipment stats
@@ -2222,41 +4456,39 @@ async def get_statistics_report(current_user: dict = Depends(get_current_user)):
     work_orders = await db.work_orders.find({}, {"_id": 0}).to_list(1000)
     wo_by_status = {"planifiee": 0, "en_cours": 0, "terminee": 0, "annulee": 0}
     wo_by_type = {"preventive": 0, "corrective": 0}
-    overdue_count = 0
     
     for wo in work_orders:
         wo_by_status[wo.get("statut", "planifiee")] = wo_by_status.get(wo.get("statut", "planifiee"), 0) + 1
         wo_by_type[wo.get("type_maintenance", "corrective")] = wo_by_type.get(wo.get("type_maintenance", "corrective"), 0) + 1
-        try:
-            planned_date = datetime.strptime(wo["date_planifiee"], "%Y-%m-%d").date()
-            if planned_date < today and wo.get("statut") in ["planifiee", "en_cours"]:
-                overdue_count += 1
-        except:
-            pass
+    overdue_count = await db.work_orders.count_documents({
+        "statut": {"$in": ["planifiee", "en_cours"]},
+        "date_planifiee": {"$lt": day_start(today)}
+    })
     
     # Interventions stats
     interventions = await db.interventions.find({}, {"_id": 0}).to_list(1000)
     total_duration = sum(i.get("duree_minutes", 0) or 0 for i in interventions)
     
     # Inspections stats
-    inspections = await db.inspections.find({}, {"_id": 0}).to_list(1000)
-    expired_inspections = 0
-    upcoming_inspections = 0
-    
-    for insp in inspections:
-        try:
-            validity_date = datetime.strptime(insp.get("date_validite", ""), "%Y-%m-%d").date()
-            if validity_date < today:
-                expired_inspections += 1
-            elif (validity_date - today).days <= 30:
-                upcoming_inspections += 1
-        except:
-            pass
+    total_inspections, expired_inspections, upcoming_inspections = await asyncio.gather(
+        db.inspections.count_documents({}),
+        db.inspections.count_documents({"date_validite": {"$lt": day_start(today)}}),
+        db.inspections.count_documents({
+            "date_validite": {"$gte": day_start(today), "$lte": day_start(today + timedelta(days=30))}
+        })
+    )
     
     # Spare parts stats
-    spare_parts = await db.spare_parts.find({}, {"_id": 0}).to_list(1000)
-    low_stock_count = sum(1 for p in spare_parts if p.get("quantite_stock", 0) <= p.get("seuil_minimum", 1))
-    total_stock_value = sum((p.get("quantite_stock", 0) * (p.get("prix_unitaire", 0) or 0)) for p in spare_parts)
+    low_stock_count = await db.spare_parts.count_documents({"is_low_stock": True})
+    stock_totals = await db.spare_parts.aggregate([
+        {"$group": {
+            "_id": None,
+            "total": {"$sum": 1},
+            "value": {"$sum": {"$multiply": [{"$ifNull": ["$quantite_stock", 0]}, {"$ifNull": ["$prix_unitaire", 0]}]}}
+        }}
+    ]).to_list(1)
+    total_spare_parts = stock_totals[0]["total"] if stock_totals else 0
+    total_stock_value = stock_totals[0]["value"] if stock_totals else 0
     
     return {
         "generated_at": datetime.now(timezone.utc).isoformat(),
@@ -2278,24 +4510,30 @@ async def get_statistics_report(current_user: dict = Depends(get_current_user)):
             "average_duration_minutes": round(total_duration / len(interventions), 1) if interventions else 0
         },
         "inspections": {
-            "total": len(inspections),
+            "total": total_inspections,
             "expired": expired_inspections,
             "upcoming_30_days": upcoming_inspections
         },
         "spare_parts": {
-            "total": len(spare_parts),
+            "total": total_spare_parts,
             "low_stock": low_stock_count,
             "total_stock_value": round(total_stock_value, 2)
         }
     }
 
+@api_router.get("/reports/statistics")
+async def get_statistics_report(request: Request, current_user: dict = Depends(get_current_user)):
+    if not can_export(current_user):
+        raise HTTPException(status_code=403, detail="Accès réservé aux administrateurs et techniciens")
+    return await cached_response(request, current_user, STATISTICS_REPORT_SOURCES, statistics_report)
+
 @api_router.get("/reports/statistics/csv")
 async def export_statistics_csv(current_user: dict = Depends(get_current_user)):
     """Export statistics as CSV"""
     if not can_export(current_user):
         raise HTTPException(status_code=403, detail="Accès réservé aux administrateurs et techniciens")
     
-    stats = await get_statistics_report(current_user)
+    stats = await statistics_report()
     
     output = io.StringIO()
     writer = csv.writer(output, delimiter=';')
@@ -2545,7 +4783,7 @@ async def generate_statistics_pdf(current_user: dict = Depends(get_current_user)
     elements.append(t)
     
     # Build PDF
-    doc.build(elements)
+    await asyncio.to_thread(doc.build, elements)
     buffer.seek(0)
     
     filename = f"statistiques_hyperbaremanager_{datetime.now().strftime('%Y%m%d')}.pdf"
@@ -2571,16 +4809,17 @@ async def generate_maintenance_pdf(
     
     elements, styles = create_pdf_header("Rapport de Maintenance", period)
     
-    # Get work orders
+    # Get work orders, filtered by date if provided
     query = {}
+    if start_date or end_date:
+        date_filter = {}
+        if start_date:
+            date_filter["$gte"] = parse_date_param(start_date)
+        if end_date:
+            date_filter["$lte"] = parse_date_param(end_date)
+        query["date_planifiee"] = date_filter
     work_orders = await db.work_orders.find(query, {"_id": 0}).to_list(1000)
     
-    # Filter by date if provided
-    if start_date:
-        work_orders = [w for w in work_orders if w.get('date_planifiee', '') >= start_date]
-    if end_date:
-        work_orders = [w for w in work_orders if w.get('date_planifiee', '') <= end_date]
-    
     # Get equipment map
     equipments = await db.equipments.find({}, {"_id": 0}).to_list(1000)
     eq_map = {e['id']: e for e in equipments}
@@ -2610,7 +4849,7 @@ async def generate_maintenance_pdf(
                 eq.get('reference', 'Caisson')[:20],
                 'Préventive' if wo.get('type_maintenance') == 'preventive' else 'Curative',
                 wo.get('statut', 'N/A'),
-                wo.get('date_planifiee', 'N/A')[:10] if wo.get('date_planifiee') else 'N/A'
+                format_date_value(wo.get('date_planifiee')) or 'N/A'
             ])
         
         t = Table(detail_data, colWidths=[5*cm, 4*cm, 2.5*cm, 2.5*cm, 2.5*cm])
@@ -2619,7 +4858,7 @@ async def generate_maintenance_pdf(
     else:
         elements.append(Paragraph("Aucune maintenance trouvée pour cette période.", styles['PDFNormal']))
     
-    doc.build(elements)
+    await asyncio.to_thread(doc.build, elements)
     buffer.seek(0)
     
     filename = f"rapport_maintenance_{datetime.now().strftime('%Y%m%d')}.pdf"
@@ -2688,7 +4927,7 @@ async def generate_equipment_pdf(equipment_id: str, current_user: dict = Depends
                 wo.get('titre', 'N/A')[:35],
                 'Préventive' if wo.get('type_maintenance') == 'preventive' else 'Curative',
                 wo.get('statut', 'N/A'),
-                wo.get('date_planifiee', 'N/A')[:10] if wo.get('date_planifiee') else 'N/A'
+                format_date_value(wo.get('date_planifiee')) or 'N/A'
             ])
         
         t = Table(maint_data, colWidths=[7*cm, 3*cm, 3*cm, 3*cm])
@@ -2720,7 +4959,7 @@ async def generate_equipment_pdf(equipment_id: str, current_user: dict = Depends
     else:
         elements.append(Paragraph("Aucune intervention enregistrée.", styles['PDFNormal']))
     
-    doc.build(elements)
+    await asyncio.to_thread(doc.build, elements)
     buffer.seek(0)
     
     filename = f"fiche_equipement_{equipment.get('reference', 'unknown')}_{datetime.now().strftime('%Y%m%d')}.pdf"
@@ -2746,23 +4985,24 @@ async def generate_interventions_pdf(
     
     elements, styles = create_pdf_header("Rapport des Interventions", period)
     
-    # Get data
-    interventions = await db.interventions.find({}, {"_id": 0}).to_list(1000)
-    
-    # Filter by date
-    if start_date:
-        interventions = [i for i in interventions if i.get('date_realisation', '') >= start_date]
-    if end_date:
-        interventions = [i for i in interventions if i.get('date_realisation', '') <= end_date]
-    
-    # Get maps
-    users = await db.users.find({}, {"_id": 0}).to_list(100)
-    user_map = {u['id']: f"{u.get('prenom', '')} {u.get('nom', '')}" for u in users}
+    # Get interventions, filtered by date if provided
+    query = {}
+    if start_date or end_date:
+        date_filter = {}
+        if start_date:
+            date_filter["$gte"] = parse_date_param(start_date)
+        if end_date:
+            date_filter["$lte"] = parse_date_param(end_date)
+        query["date_intervention"] = date_filter
+    interventions = await db.interventions.find(query, {"_id": 0}).sort("date_intervention", -1).to_list(1000)
     
-    work_orders = await db.work_orders.find({}, {"_id": 0}).to_list(1000)
+    # Get maps of the referenced work orders and spare parts only
+    wo_ids = list({i.get('work_order_id') for i in interventions if i.get('work_order_id')})
+    work_orders = await db.work_orders.find({"id": {"$in": wo_ids}}, {"_id": 0, "id": 1, "titre": 1}).to_list(None)
     wo_map = {w['id']: w for w in work_orders}
     
-    spare_parts = await db.spare_parts.find({}, {"_id": 0}).to_list(1000)
+    sp_ids = list({p.get('spare_part_id') for i in interventions for p in i.get('pieces_utilisees', [])})
+    spare_parts = await db.spare_parts.find({"id": {"$in": sp_ids}}, {"_id": 0, "id": 1, "nom": 1}).to_list(None)
     sp_map = {s['id']: s for s in spare_parts}
     
     # Summary
@@ -2787,9 +5027,9 @@ async def generate_interventions_pdf(
                 pieces_str += "..."
             
             detail_data.append([
-                inter.get('date_realisation', 'N/A')[:10] if inter.get('date_realisation') else 'N/A',
+                format_date_value(inter.get('date_intervention')) or 'N/A',
                 wo.get('titre', 'N/A')[:25],
-                user_map.get(inter.get('technicien_id'), 'N/A')[:20],
+                (inter.get('technicien') or 'N/A')[:20],
                 pieces_str or 'Aucune'
             ])
         
@@ -2799,7 +5039,7 @@ async def generate_interventions_pdf(
     else:
         elements.append(Paragraph("Aucune intervention trouvée pour cette période.", styles['PDFNormal']))
     
-    doc.build(elements)
+    await asyncio.to_thread(doc.build, elements)
     buffer.seek(0)
     
     filename = f"rapport_interventions_{datetime.now().strftime('%Y%m%d')}.pdf"
@@ -2817,30 +5057,16 @@ async def generate_planning_pdf(current_user: dict = Depends(get_current_user)):
     
     elements, styles = create_pdf_header("Planning de Maintenance", "52 prochaines semaines")
     
-    # Get upcoming maintenances
-    today = datetime.now(timezone.utc)
+    # Get upcoming maintenances, sorted by date
+    today = datetime.now(timezone.utc).date()
     end_date = today + timedelta(weeks=52)
     
-    work_orders = await db.work_orders.find({
+    upcoming = await db.work_orders.find({
         "statut": {"$in": ["planifiee", "en_cours"]},
-        "date_planifiee": {"$ne": None}
-    }, {"_id": 0}).to_list(1000)
-    
-    # Filter by date range
-    upcoming = []
-    for wo in work_orders:
-        try:
-            date_str = wo.get('date_planifiee', '')
-            if date_str:
-                date_obj = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                if today <= date_obj <= end_date:
-                    wo['date_obj'] = date_obj
-                    upcoming.append(wo)
-        except:
-            pass
-    
-    # Sort by date
-    upcoming.sort(key=lambda x: x.get('date_obj', today))
+        "date_planifiee": {"$gte": day_start(today), "$lte": day_start(end_date)}
+    }, {"_id": 0}).sort("date_planifiee", 1).to_list(1000)
+    for wo in upcoming:
+        wo['date_obj'] = to_date(wo['date_planifiee'])
     
     # Get equipment map
     equipments = await db.equipments.find({}, {"_id": 0}).to_list(1000)
@@ -2888,7 +5114,7 @@ async def generate_planning_pdf(current_user: dict = Depends(get_current_user)):
     else:
         elements.append(Paragraph("Aucune maintenance planifiée pour les 52 prochaines semaines.", styles['PDFNormal']))
     
-    doc.build(elements)
+    await asyncio.to_thread(doc.build, elements)
     buffer.seek(0)
     
     filename = f"planning_maintenance_{datetime.now().strftime('%Y%m%d')}.pdf"
@@ -2898,6 +5124,368 @@ async def generate_planning_pdf(current_user: dict = Depends(get_current_user)):
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
 
+# ==================== BACKUP / RESTORE ====================
+
+class ZipStream(io.RawIOBase):
+    """Unseekable sink for zipfile; the response generator drains what has been written so far"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+async def backup_collections() -> List[str]:
+    names = await db.list_collection_names()
+    return sorted(n for n in names if not n.startswith("system.") and n not in BACKUP_EXCLUDED_COLLECTIONS)
+
+async def backup_chunks(collections: List[str]):
+    """Zip archive streamed as it is written: collections/<name>.ndjson, uploads/..., manifest.json.
+
+    Documents are written as relaxed Extended JSON (ObjectId, dates... survive the round
+    trip) and upload files are copied from disk in BACKUP_CHUNK_BYTES pieces; compression
+    and file reads run in threads. Collections are read one after the other, so the
+    archive is not a point-in-time snapshot of writes made while it is built.
+    """
+    sink = ZipStream()
+    archive = zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED)
+    manifest = {"created_at": datetime.now(timezone.utc).isoformat(), "collections": {}, "uploads": 0}
+    for name in collections:
+        entry = archive.open(f"collections/{name}.ndjson", "w", force_zip64=True)
+        count = 0
+        async for batch in export_batches(name, include_id=True):
+            data = "".join(json_util.dumps(doc, json_options=json_util.RELAXED_JSON_OPTIONS) + "\n" for doc in batch)
+            await asyncio.to_thread(entry.write, data.encode())
+            count += len(batch)
+            yield sink.drain()
+        await asyncio.to_thread(entry.close)
+        manifest["collections"][name] = count
+
+    for path in sorted(p for p in UPLOADS_DIR.rglob("*") if p.is_file()):
+        info = zipfile.ZipInfo.from_file(path, f"uploads/{path.relative_to(UPLOADS_DIR).as_posix()}")
+        info.compress_type = zipfile.ZIP_STORED  # images and PDFs are already compressed
+        entry = archive.open(info, "w", force_zip64=True)
+        with open(path, "rb") as f:
+            while chunk := await asyncio.to_thread(f.read, BACKUP_CHUNK_BYTES):
+                await asyncio.to_thread(entry.write, chunk)
+                yield sink.drain()
+        entry.close()
+        manifest["uploads"] += 1
+
+    archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+    archive.close()
+    yield sink.drain()
+
+def read_ndjson_batch(lines, size: int) -> List[dict]:
+    batch = []
+    for line in lines:
+        if line.strip():
+            batch.append(json_util.loads(line))
+            if len(batch) >= size:
+                break
+    return batch
+
+def extract_upload(archive: zipfile.ZipFile, info: zipfile.ZipInfo, target: Path):
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with archive.open(info) as source, open(target, "wb") as destination:
+        shutil.copyfileobj(source, destination, BACKUP_CHUNK_BYTES)
+
+async def restore_archive(archive_file, replace: bool = False) -> dict:
+    """Load a backup archive (path or file object) into the database and the uploads tree.
+
+    Each collection is bulk-loaded with insert_many(ordered=False) in RESTORE_BATCH_SIZE
+    batches; documents that fail (duplicate _id...) are counted, not fatal. Without
+    `replace`, collections that already hold documents are refused; with it they are
+    emptied first (indexes are kept). Returns the counts and timings per collection.
+    """
+    try:
+        archive = zipfile.ZipFile(archive_file)
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail="Archive de sauvegarde invalide")
+    with archive:
+        names = archive.namelist()
+        if "manifest.json" not in names:
+            raise HTTPException(status_code=400, detail="Archive de sauvegarde invalide")
+        collections = [n[len("collections/"):-len(".ndjson")] for n in names
+                       if n.startswith("collections/") and n.endswith(".ndjson")]
+        if not replace:
+            non_empty = [name for name in collections if await db[name].find_one({}, {"_id": 1})]
+            if non_empty:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Collections non vides: {', '.join(non_empty)} (relancer avec replace=true)"
+                )
+
+        started = time.perf_counter()
+        report = {"collections": {}}
+        for name in collections:
+            collection_started = time.perf_counter()
+            inserted = errors = 0
+            if replace:
+                await db[name].delete_many({})
+            with archive.open(f"collections/{name}.ndjson") as entry:
+                lines = io.TextIOWrapper(entry, encoding="utf-8")
+                while batch := await asyncio.to_thread(read_ndjson_batch, lines, RESTORE_BATCH_SIZE):
+                    try:
+                        result = await db[name].insert_many(batch, ordered=False)
+                        inserted += len(result.inserted_ids)
+                    except BulkWriteError as e:
+                        inserted += e.details["nInserted"]
+                        errors += len(e.details["writeErrors"])
+            report["collections"][name] = {
+                "documents": inserted,
+                "errors": errors,
+                "seconds": round(time.perf_counter() - collection_started, 3)
+            }
+            logger.info(f"Restored {inserted} {name} ({errors} errors) in {report['collections'][name]['seconds']}s")
+            await publish_invalidation(name)
+
+        uploads_started = time.perf_counter()
+        uploads_root = UPLOADS_DIR.resolve()
+        files = size = 0
+        for info in archive.infolist():
+            if not info.filename.startswith("uploads/") or info.is_dir():
+                continue
+            target = (UPLOADS_DIR / info.filename[len("uploads/"):]).resolve()
+            if uploads_root not in target.parents:
+                logger.warning(f"Skipped upload outside the uploads directory: {info.filename}")
+                continue
+            await asyncio.to_thread(extract_upload, archive, info, target)
+            files += 1
+            size += info.file_size
+        report["uploads"] = {"files": files, "bytes": size, "seconds": round(time.perf_counter() - uploads_started, 3)}
+
+    # Restored documents keep their old updated_at and replaced ones leave no tombstones, so
+    # /export/changes resume tokens issued before now would silently miss them: expire them
+    await db.counters.update_one(
+        {"_id": RESTORE_EPOCH_ID}, {"$set": {"at": datetime.now(timezone.utc)}}, upsert=True
+    )
+
+    await ensure_indexes()
+    await reconcile_counters()
+    await rebuild_alerts()
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    return report
+
+@api_router.get("/admin/backup")
+async def backup_database(current_user: dict = Depends(get_current_user)):
+    """Full backup: every collection as NDJSON plus the uploaded files, as a streamed zip"""
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Accès réservé aux administrateurs")
+    
+    filename = f"hyperbaremanager_backup_{datetime.now().strftime('%Y%m%d_%H%M')}.zip"
+    return StreamingResponse(
+        backup_chunks(await backup_collections()),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+@api_router.post("/admin/restore")
+async def restore_database(
+    archive: UploadFile = File(...),
+    replace: bool = False,
+    admin: dict = Depends(require_admin)
+):
+    """Restore an archive made by /admin/backup (see also backend/restore_backup.py)"""
+    return await restore_archive(archive.file, replace)
+
+# ==================== EXPORT JOBS ====================
+
+def is_admin(user: dict) -> bool:
+    return user.get("role") == "admin"
+
+def any_user(user: dict) -> bool:
+    return True
+
+# kind -> (route building the artifact, collections it reads, who may queue it)
+EXPORT_JOB_KINDS = {
+    "csv": (export_csv, lambda p: [p.get("collection")], can_export),
+    "json": (export_json, lambda p: JSON_EXPORT_COLLECTIONS, can_export),
+    "ndjson": (export_ndjson, lambda p: JSON_EXPORT_COLLECTIONS, can_export),
+    "sql": (export_sql, lambda p: list(SQL_EXPORT_MODELS), can_export),
+    "parquet": (export_parquet, lambda p: [COLUMNAR_DATASETS.get(p.get("dataset"))], can_export),
+    "backup": (backup_database, lambda p: sorted(INDEX_SPECS), is_admin),
+    "pdf_statistics": (generate_statistics_pdf, lambda p: [], any_user),
+    "pdf_maintenance": (generate_maintenance_pdf, lambda p: [], any_user),
+    "pdf_equipment": (generate_equipment_pdf, lambda p: [], any_user),
+    "pdf_interventions": (generate_interventions_pdf, lambda p: [], any_user),
+    "pdf_planning": (generate_planning_pdf, lambda p: [], any_user),
+}
+EXPORT_JOB_ACTIVE = ["queued", "running"]
+
+class ExportJobCreate(BaseModel):
+    kind: str
+    params: dict = {}
+
+export_job_slots = asyncio.Semaphore(EXPORT_JOB_WORKERS)
+export_job_tasks = set()
+
+def export_job_view(job: dict) -> dict:
+    """Job status as returned by the API (no internal fields)"""
+    view = {k: v for k, v in job.items() if k not in ("_id", "user_id", "heartbeat_at", "slot")}
+    total = job.get("total") or 0
+    view["progress"] = 1.0 if job["status"] == "done" else (min(job.get("processed", 0) / total, 0.99) if total else 0.0)
+    return view
+
+async def save_export_artifact(response, path: Path) -> tuple:
+    """Write the body of an export or report route's response to `path`: (filename, media type, size)"""
+    if isinstance(response, FileResponse):
+        await asyncio.to_thread(shutil.move, response.path, path)
+    else:
+        with open(path, "wb") as f:
+            async for chunk in response.body_iterator:
+                await asyncio.to_thread(f.write, chunk if isinstance(chunk, bytes) else chunk.encode(response.charset))
+    match = re.search(r'filename="?([^";]+)"?', response.headers.get("content-disposition", ""))
+    return (match.group(1) if match else path.name), response.media_type, path.stat().st_size
+
+async def run_export_job(job: dict, user: dict):
+    """Build the artifact of `job` on disk, reporting progress until it is done or failed.
+
+    At most EXPORT_JOB_WORKERS jobs build at once in this worker; the others stay queued.
+    A heartbeat saves the number of documents read every EXPORT_JOB_HEARTBEAT_SECONDS.
+    """
+    handler = EXPORT_JOB_KINDS[job["kind"]][0]
+    path = EXPORT_JOBS_DIR / job["id"]
+    progress = {"processed": 0}
+    export_progress.set(progress)
+
+    async def heartbeat():
+        while True:
+            await db.export_jobs.update_one(
+                {"id": job["id"], "status": {"$in": EXPORT_JOB_ACTIVE}},
+                {"$set": {"processed": progress["processed"], "heartbeat_at": datetime.now(timezone.utc)}}
+            )
+            await asyncio.sleep(EXPORT_JOB_HEARTBEAT_SECONDS)
+
+    beat = asyncio.create_task(heartbeat())
+    try:
+        async with export_job_slots:
+            await db.export_jobs.update_one(
+                {"id": job["id"]}, {"$set": {"status": "running", "started_at": datetime.now(timezone.utc)}}
+            )
+            response = await handler(**job["params"], current_user=user)
+            filename, media_type, size = await save_export_artifact(response, path)
+        now = datetime.now(timezone.utc)
+        changes = {
+            "status": "done", "filename": filename, "media_type": media_type, "size": size,
+            "processed": progress["processed"], "finished_at": now,
+            "expires_at": now + timedelta(hours=EXPORT_ARTIFACT_TTL_HOURS)
+        }
+    except HTTPException as e:
+        changes = {"status": "failed", "error": e.detail, "finished_at": datetime.now(timezone.utc)}
+    except Exception as e:
+        logger.error(f"Export job {job['id']} ({job['kind']}) failed: {e}")
+        changes = {"status": "failed", "error": "Erreur lors de l'export", "finished_at": datetime.now(timezone.utc)}
+    finally:
+        beat.cancel()
+    if changes["status"] == "failed":
+        path.unlink(missing_ok=True)
+    await db.export_jobs.update_one({"id": job["id"]}, {"$set": changes, "$unset": {"slot": ""}})
+
+async def expire_export_jobs():
+    """Delete artifacts past their TTL and fail jobs whose worker stopped (no heartbeat)"""
+    now = datetime.now(timezone.utc)
+    for statuses, query, changes in [
+        (["done"], {"expires_at": {"$lte": now}}, {"status": "expired"}),
+        (EXPORT_JOB_ACTIVE, {"heartbeat_at": {"$lt": now - timedelta(seconds=EXPORT_JOB_STALE_SECONDS)}},
+         {"status": "failed", "error": "Export interrompu par un redémarrage du serveur", "finished_at": now}),
+    ]:
+        ids = await db.export_jobs.distinct("id", {"status": {"$in": statuses}, **query})
+        for job_id in ids:
+            (EXPORT_JOBS_DIR / job_id).unlink(missing_ok=True)
+        if ids:
+            await db.export_jobs.update_many(
+                {"id": {"$in": ids}, "status": {"$in": statuses}}, {"$set": changes, "$unset": {"slot": ""}}
+            )
+            logger.info(f"{len(ids)} export jobs marked {changes['status']}")
+
+async def get_own_export_job(job_id: str, user: dict) -> dict:
+    job = await db.export_jobs.find_one({"id": job_id}, {"_id": 0})
+    if not job or (job["user_id"] != user["id"] and user.get("role") != "admin"):
+        raise HTTPException(status_code=404, detail="Export non trouvé")
+    return job
+
+@api_router.post("/exports")
+async def create_export_job(data: ExportJobCreate, current_user: dict = Depends(get_current_user)):
+    """Queue an export or PDF report build; poll GET /exports/{id} then download the artifact"""
+    if data.kind not in EXPORT_JOB_KINDS:
+        raise HTTPException(status_code=400, detail=f"Type d'export inconnu: {data.kind}")
+    handler, sources, allowed = EXPORT_JOB_KINDS[data.kind]
+    if not allowed(current_user):
+        raise HTTPException(status_code=403, detail="Accès non autorisé pour ce type d'export")
+    parameters = {name: p for name, p in inspect.signature(handler).parameters.items() if name != "current_user"}
+    unknown = sorted(set(data.params) - set(parameters))
+    if unknown or not all(isinstance(v, str) for v in data.params.values()):
+        raise HTTPException(status_code=400, detail=f"Paramètres invalides: {', '.join(unknown) or 'valeurs texte attendues'}")
+    missing = [name for name, p in parameters.items() if p.default is inspect.Parameter.empty and name not in data.params]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Paramètres manquants: {', '.join(missing)}")
+    
+    total = 0
+    for coll_name in sources(data.params):
+        if coll_name in INDEX_SPECS:
+            total += await db[coll_name].estimated_document_count()
+    now = datetime.now(timezone.utc)
+    job = {
+        "id": str(uuid.uuid4()),
+        "user_id": current_user["id"],
+        "kind": data.kind,
+        "params": data.params,
+        "status": "queued",
+        "processed": 0,
+        "total": total,
+        "created_at": now,
+        "heartbeat_at": now,
+    }
+    # The job takes one of the user's EXPORT_JOBS_PER_USER slots; the unique index on `slot`
+    # makes this atomic across concurrent requests and workers. Slots are released when the
+    # job finishes, fails or goes stale.
+    for n in range(EXPORT_JOBS_PER_USER):
+        try:
+            await db.export_jobs.insert_one({**job, "slot": f"{current_user['id']}:{n}"})
+            break
+        except DuplicateKeyError:
+            continue
+    else:
+        raise HTTPException(
+            status_code=429,
+            detail="Trop d'exports en cours, réessayez quand ils seront terminés",
+            headers={"Retry-After": str(EXPORT_JOB_HEARTBEAT_SECONDS * 5)}
+        )
+    task = asyncio.create_task(run_export_job(job, current_user))
+    export_job_tasks.add(task)
+    task.add_done_callback(export_job_tasks.discard)
+    return export_job_view(job)
+
+@api_router.get("/exports")
+async def get_export_jobs(current_user: dict = Depends(get_current_user)):
+    """Export jobs of the current user, most recent first"""
+    jobs = await db.export_jobs.find({"user_id": current_user["id"]}, {"_id": 0}).sort("created_at", -1).to_list(50)
+    return [export_job_view(job) for job in jobs]
+
+@api_router.get("/exports/{job_id}")
+async def get_export_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    return export_job_view(await get_own_export_job(job_id, current_user))
+
+@api_router.get("/exports/{job_id}/download")
+async def download_export_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    job = await get_own_export_job(job_id, current_user)
+    if job["status"] in EXPORT_JOB_ACTIVE:
+        raise HTTPException(status_code=409, detail="Export en cours de préparation")
+    path = EXPORT_JOBS_DIR / job_id
+    if job["status"] != "done" or not path.exists():
+        raise HTTPException(status_code=410, detail=job.get("error") or "Export expiré, relancez-le")
+    return FileResponse(path, media_type=job["media_type"], filename=job["filename"])
+
 # ==================== HEALTH CHECK ====================
 
 @api_router.get("/")
@@ -2908,6 +5496,27 @@ async def root():
 async def health():
     return {"status": "healthy"}
 
+@api_router.get("/admin/indexes")
+async def verify_indexes(admin: dict = Depends(require_admin)):
+    """Explain every route query shape and flag the ones planned as COLLSCAN"""
+    plans = await explain_query_shapes()
+    collscans = [p for p in plans if p["collscan"]]
+    return {
+        "ok": not collscans,
+        "collscan_count": len(collscans),
+        "plans": plans
+    }
+
+@api_router.get("/admin/cache-stats")
+async def get_cache_stats(admin: dict = Depends(require_admin)):
+    """Hit/miss counters of the in-process caches"""
+    return {
+        "principal": principal_cache.stats(),
+        "responses": response_cache.stats(),
+        "invalidation_bus": {"enabled": INVALIDATION_BUS_ENABLED, "worker_id": WORKER_ID, **invalidation_bus_stats},
+        "password_hashing": password_hash_pool.stats()
+    }
+
 # ==================== EMAIL ALERTS ====================
 
 @api_router.post("/alerts/check")
@@ -2930,7 +5539,7 @@ async def check_and_send_alerts(admin: dict = Depends(require_admin)):
     # 1. Check maintenances coming up (30 days) and overdue
     maintenances = await db.work_orders.find({
         "statut": "planifiee",
-        "date_planifiee": {"$ne": None}
+        "date_planifiee": {"$lte": day_start(today + timedelta(days=30))}
     }, {"_id": 0}).to_list(1000)
     
     equipments_map = {}
@@ -2940,10 +5549,7 @@ async def check_and_send_alerts(admin: dict = Depends(require_admin)):
     
     for wo in maintenances:
         try:
-            date_planifiee = datetime.fromisoformat(wo["date_planifiee"].replace("Z", "+00:00")).date() if isinstance(wo["date_planifiee"], str) else wo["date_planifiee"]
-            if isinstance(date_planifiee, str):
-                date_planifiee = datetime.strptime(date_planifiee, "%Y-%m-%d").date()
-            
+            date_planifiee = to_date(wo["date_planifiee"])
             days_diff = (date_planifiee - today).days
             equipment = equipments_map.get(wo.get("equipment_id"), {})
             equipment_ref = equipment.get("reference", "Caisson entier")
@@ -2954,7 +5560,7 @@ async def check_and_send_alerts(admin: dict = Depends(require_admin)):
                     admin_email,
                     wo["titre"],
                     equipment_ref,
-                    wo["date_planifiee"],
+                    date_planifiee.isoformat(),
                     abs(days_diff)
                 )
                 alerts_sent["maintenance_overdue"] += 1
@@ -2964,7 +5570,7 @@ async def check_and_send_alerts(admin: dict = Depends(require_admin)):
                     admin_email,
                     wo["titre"],
                     equipment_ref,
-                    wo["date_planifiee"],
+                    date_planifiee.isoformat(),
                     days_diff
                 )
                 alerts_sent["maintenance_reminders"] += 1
@@ -2972,17 +5578,16 @@ async def check_and_send_alerts(admin: dict = Depends(require_admin)):
             logging.error(f"Error processing maintenance alert: {e}")
     
     # 2. Check low stock
-    spare_parts = await db.spare_parts.find({}, {"_id": 0}).to_list(1000)
+    spare_parts = await db.spare_parts.find({"is_low_stock": True}, {"_id": 0}).to_list(1000)
     for part in spare_parts:
-        if part.get("quantite_stock", 0) <= part.get("seuil_minimum", 1):
-            await send_low_stock_email(
-                admin_email,
-                part["nom"],
-                part.get("reference_fabricant", "N/A"),
-                part.get("quantite_stock", 0),
-                part.get("seuil_minimum", 1)
-            )
-            alerts_sent["low_stock"] += 1
+        await send_low_stock_email(
+            admin_email,
+            part["nom"],
+            part.get("reference_fabricant", "N/A"),
+            part.get("quantite_stock", 0),
+            part.get("seuil_minimum", 1)
+        )
+        alerts_sent["low_stock"] += 1
     
     # 3. Check hour counter alerts for compressors
     hour_maintenances = await db.work_orders.find({
@@ -3038,12 +5643,15 @@ async def test_email(admin: dict = Depends(require_admin)):
 # Include router and middleware
 app.include_router(api_router)
 
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_BYTES)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Total-Count-Capped", "ETag", "X-Resume-Token"],
 )
 
 logging.basicConfig(
@@ -3052,6 +5660,56 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Long-running tasks started at startup and cancelled at shutdown
+background_tasks = []
+
+async def run_periodically(name: str, interval_seconds: float, job):
+    """Run `job` every `interval_seconds` until cancelled, logging failures"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await job()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Periodic job {name} failed: {e}")
+
+async def run_daily(name: str, job):
+    """Run `job` shortly after every UTC midnight until cancelled, logging failures"""
+    while True:
+        now = datetime.now(timezone.utc)
+        next_midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+        await asyncio.sleep((next_midnight - now).total_seconds() + 1)
+        try:
+            await job()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Daily job {name} failed: {e}")
+
+@app.on_event("startup")
+async def startup_tasks():
+    await ensure_indexes()
+    await backfill_low_stock_flags()
+    await backfill_updated_at()
+    await migrate_date_fields()
+    await reconcile_counters()
+    await rebuild_alerts()
+    await sync_revocations()
+    if INVALIDATION_BUS_ENABLED:
+        try:
+            last_event_id = await ensure_invalidation_bus()
+            background_tasks.append(asyncio.create_task(listen_invalidations(last_event_id)))
+        except Exception as e:
+            logger.error(f"Invalidation bus unavailable, relying on cache TTLs: {e}")
+    background_tasks.append(asyncio.create_task(run_periodically("sync_revocations", REVOCATION_SYNC_SECONDS, sync_revocations)))
+    background_tasks.append(asyncio.create_task(run_periodically("reconcile_counters", COUNTERS_RECONCILE_SECONDS, reconcile_counters)))
+    background_tasks.append(asyncio.create_task(run_daily("rebuild_alerts", rebuild_alerts)))
+    background_tasks.append(asyncio.create_task(run_periodically("expire_export_jobs", 600, expire_export_jobs)))
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    for task in [*background_tasks, *export_job_tasks]:
+        task.cancel()
     client.close()
+    password_hash_pool.shutdown()
@@ -0,0 +1,96 @@
+"""
+Test suite for the full backup archive
+- GET /api/admin/backup streams a zip with every collection and a manifest
+- POST /api/admin/restore refuses invalid archives and non-empty collections
+- A restore expires the /export/changes resume tokens issued before it
+"""
+import pytest
+import requests
+import os
+import io
+import json
+import zipfile
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+# Test credentials
+TEST_EMAIL = "admin@hypermaint.fr"
+TEST_PASSWORD = "admin123"
+
+
+class TestBackup:
+    """Backup / restore tests"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Setup: Get auth token before each test"""
+        self.session = requests.Session()
+
+        response = self.session.post(f"{BASE_URL}/api/auth/login", json={
+            "email": TEST_EMAIL,
+            "password": TEST_PASSWORD
+        })
+
+        if response.status_code != 200:
+            pytest.skip(f"Login failed with status {response.status_code}")
+
+        self.token = response.json().get("access_token")
+        self.session.headers.update({"Authorization": f"Bearer {self.token}"})
+
+    def test_backup_archive(self):
+        """Test: The archive holds every collection, the manifest counts and the uploads"""
+        response = self.session.get(f"{BASE_URL}/api/admin/backup")
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+        assert response.headers["content-type"] == "application/zip"
+
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        assert archive.testzip() is None
+        manifest = json.loads(archive.read("manifest.json"))
+        for name in ["users", "equipment_types", "equipments", "subequipments", "work_orders"]:
+            assert name in manifest["collections"], f"{name} missing from the backup"
+            lines = archive.read(f"collections/{name}.ndjson").decode().splitlines()
+            assert len(lines) == manifest["collections"][name]
+
+        user_emails = [json.loads(line)["email"] for line in archive.read("collections/users.ndjson").decode().splitlines()]
+        assert TEST_EMAIL in user_emails
+        uploads = [n for n in archive.namelist() if n.startswith("uploads/")]
+        assert len(uploads) == manifest["uploads"]
+        print(f"✓ Backup: {manifest['collections']}, {manifest['uploads']} files")
+
+    def test_restore_rejections(self):
+        """Test: A non-zip is 400 and restoring over existing data without replace is 409"""
+        response = self.session.post(f"{BASE_URL}/api/admin/restore", files={
+            "archive": ("backup.zip", b"not a zip", "application/zip")
+        })
+        assert response.status_code == 400, f"Expected 400, got {response.status_code}"
+
+        backup = self.session.get(f"{BASE_URL}/api/admin/backup")
+        response = self.session.post(f"{BASE_URL}/api/admin/restore", files={
+            "archive": ("backup.zip", backup.content, "application/zip")
+        })
+        assert response.status_code == 409, f"Expected 409, got {response.status_code}"
+        assert "users" in response.json()["detail"]
+        print("✓ Invalid archive and non-empty collections refused")
+
+    def test_restore_expires_resume_tokens(self):
+        """Test: A /export/changes token issued before a restore gives 410 afterwards"""
+        response = self.session.get(f"{BASE_URL}/api/export/changes")
+        assert response.status_code == 200
+        token = response.headers["X-Resume-Token"]
+
+        # An archive without collections or files: restores nothing but still marks the restore
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr("manifest.json", json.dumps({"collections": {}, "uploads": 0}))
+        response = self.session.post(f"{BASE_URL}/api/admin/restore", files={
+            "archive": ("empty.zip", buffer.getvalue(), "application/zip")
+        })
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+
+        response = self.session.get(f"{BASE_URL}/api/export/changes", params={"since": token})
+        assert response.status_code == 410, f"Expected 410, got {response.status_code}"
+        print("✓ Resume token issued before the restore expired")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,61 @@
+"""
+Test suite for response compression
+- Large JSON list responses are compressed when the client accepts gzip
+- Small responses and clients without Accept-Encoding get the plain body
+"""
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+# Test credentials
+TEST_EMAIL = "admin@hypermaint.fr"
+TEST_PASSWORD = "admin123"
+
+
+class TestCompression:
+    """Compression middleware tests"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Setup: Get auth token before each test"""
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+
+        response = self.session.post(f"{BASE_URL}/api/auth/login", json={
+            "email": TEST_EMAIL,
+            "password": TEST_PASSWORD
+        })
+
+        if response.status_code != 200:
+            pytest.skip(f"Login failed with status {response.status_code}")
+
+        self.token = response.json().get("access_token")
+        self.session.headers.update({"Authorization": f"Bearer {self.token}"})
+
+    def test_large_list_is_compressed(self):
+        """Test: A list above the size threshold is gzipped and decodes to the same JSON"""
+        plain = self.session.get(f"{BASE_URL}/api/work-orders", headers={"Accept-Encoding": "identity"})
+        assert plain.status_code == 200
+        assert "Content-Encoding" not in plain.headers
+        if len(plain.content) < 1024:
+            pytest.skip("Not enough work orders to cross the compression threshold")
+
+        compressed = self.session.get(f"{BASE_URL}/api/work-orders", headers={"Accept-Encoding": "gzip"})
+        assert compressed.status_code == 200
+        assert compressed.headers.get("Content-Encoding") == "gzip"
+        assert "Accept-Encoding" in compressed.headers.get("Vary", "")
+        assert compressed.json() == plain.json()
+        print(f"✓ Work orders gzipped ({len(plain.content)} bytes uncompressed)")
+
+    def test_small_response_not_compressed(self):
+        """Test: A response below the threshold is sent as is"""
+        response = self.session.get(f"{BASE_URL}/api/auth/me", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert "Content-Encoding" not in response.headers
+        print("✓ Small response left uncompressed")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
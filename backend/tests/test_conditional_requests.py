@@ -0,0 +1,86 @@
+"""
+Test suite for conditional GETs
+- List and detail endpoints return a weak ETag
+- Replaying it in If-None-Match gives 304 without a body
+- A write changes the ETag
+"""
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+# Test credentials
+TEST_EMAIL = "admin@hypermaint.fr"
+TEST_PASSWORD = "admin123"
+
+
+class TestConditionalRequests:
+    """ETag / If-None-Match tests"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Setup: Get auth token before each test"""
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+
+        response = self.session.post(f"{BASE_URL}/api/auth/login", json={
+            "email": TEST_EMAIL,
+            "password": TEST_PASSWORD
+        })
+
+        if response.status_code != 200:
+            pytest.skip(f"Login failed with status {response.status_code}")
+
+        self.token = response.json().get("access_token")
+        self.session.headers.update({"Authorization": f"Bearer {self.token}"})
+
+    @pytest.mark.parametrize("path", ["/api/work-orders", "/api/equipments", "/api/spare-parts", "/api/equipment-types"])
+    def test_list_not_modified(self, path):
+        """Test: A list replayed with its ETag answers 304"""
+        response = self.session.get(f"{BASE_URL}{path}")
+        assert response.status_code == 200
+        etag = response.headers.get("ETag")
+        assert etag and etag.startswith('W/"'), f"Expected a weak ETag, got {etag}"
+
+        replay = self.session.get(f"{BASE_URL}{path}", headers={"If-None-Match": etag})
+        assert replay.status_code == 304, f"Expected 304, got {replay.status_code}"
+        assert replay.content == b""
+        print(f"✓ {path} not modified")
+
+    def test_write_changes_etags(self):
+        """Test: Updating an equipment changes both the list and the detail ETags"""
+        response = self.session.post(f"{BASE_URL}/api/equipments", json={
+            "type": "capteur",
+            "reference": "TEST_ETAG_001",
+            "numero_serie": "TEST_ETAG_SN_001",
+            "caisson_id": "test"
+        })
+        assert response.status_code == 200
+        equipment = response.json()
+
+        try:
+            list_etag = self.session.get(f"{BASE_URL}/api/equipments").headers["ETag"]
+            detail_etag = self.session.get(f"{BASE_URL}/api/equipments/{equipment['id']}").headers["ETag"]
+
+            response = self.session.put(f"{BASE_URL}/api/equipments/{equipment['id']}", json={
+                "type": "capteur",
+                "reference": "TEST_ETAG_001",
+                "numero_serie": "TEST_ETAG_SN_001",
+                "caisson_id": "test",
+                "statut": "maintenance"
+            })
+            assert response.status_code == 200
+
+            replay = self.session.get(f"{BASE_URL}/api/equipments", headers={"If-None-Match": list_etag})
+            assert replay.status_code == 200
+            replay = self.session.get(f"{BASE_URL}/api/equipments/{equipment['id']}", headers={"If-None-Match": detail_etag})
+            assert replay.status_code == 200
+            assert replay.json()["statut"] == "maintenance"
+            print("✓ Update invalidated the list and detail ETags")
+        finally:
+            self.session.delete(f"{BASE_URL}/api/equipments/{equipment['id']}")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,78 @@
+"""
+Test suite for the precomputed alert index
+- GET /api/dashboard/alerts is sorted by severity and paginated
+- The ETag validator returns 304 when nothing changed
+"""
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+# Test credentials
+TEST_EMAIL = "admin@hypermaint.fr"
+TEST_PASSWORD = "admin123"
+
+SEVERITY_ORDER = {"critical": 0, "warning": 1, "info": 2}
+
+
+class TestDashboardAlerts:
+    """Alert index endpoint tests"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Setup: Get auth token before each test"""
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+
+        response = self.session.post(f"{BASE_URL}/api/auth/login", json={
+            "email": TEST_EMAIL,
+            "password": TEST_PASSWORD
+        })
+
+        if response.status_code != 200:
+            pytest.skip(f"Login failed with status {response.status_code}")
+
+        self.token = response.json().get("access_token")
+        self.session.headers.update({"Authorization": f"Bearer {self.token}"})
+
+    def test_alerts_sorted_by_severity(self):
+        """Test: Alerts come most severe first"""
+        response = self.session.get(f"{BASE_URL}/api/dashboard/alerts")
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+
+        ranks = [SEVERITY_ORDER.get(a["severity"], 3) for a in response.json()]
+        assert ranks == sorted(ranks)
+        print(f"✓ {len(ranks)} alerts in severity order")
+
+    def test_alerts_pages_cover_full_list(self):
+        """Test: Following X-Next-Cursor returns the same alerts as one request"""
+        full = self.session.get(f"{BASE_URL}/api/dashboard/alerts").json()
+
+        paged = []
+        params = {"limit": 2}
+        while True:
+            response = self.session.get(f"{BASE_URL}/api/dashboard/alerts", params=params)
+            assert response.status_code == 200
+            paged.extend(response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            params = {"limit": 2, "cursor": cursor}
+
+        assert paged == full
+        print(f"✓ {len(paged)} alerts across pages")
+
+    def test_etag_not_modified(self):
+        """Test: Sending the ETag back returns 304"""
+        response = self.session.get(f"{BASE_URL}/api/dashboard/alerts")
+        etag = response.headers.get("ETag")
+        assert etag, "ETag header missing"
+
+        response = self.session.get(f"{BASE_URL}/api/dashboard/alerts", headers={"If-None-Match": etag})
+        assert response.status_code == 304, f"Expected 304, got {response.status_code}"
+        print(f"✓ 304 for {etag}")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
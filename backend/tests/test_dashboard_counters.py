@@ -0,0 +1,117 @@
+"""
+Test suite for the maintained dashboard counters
+- Creating, updating and deleting an equipment or a spare part moves
+  GET /api/dashboard/stats without a recount
+"""
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+# Test credentials
+TEST_EMAIL = "admin@hypermaint.fr"
+TEST_PASSWORD = "admin123"
+
+
+class TestDashboardCounters:
+    """Dashboard counter tests"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Setup: Get auth token before each test"""
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+
+        response = self.session.post(f"{BASE_URL}/api/auth/login", json={
+            "email": TEST_EMAIL,
+            "password": TEST_PASSWORD
+        })
+
+        if response.status_code != 200:
+            pytest.skip(f"Login failed with status {response.status_code}")
+
+        self.token = response.json().get("access_token")
+        self.session.headers.update({"Authorization": f"Bearer {self.token}"})
+
+    def get_stats(self):
+        response = self.session.get(f"{BASE_URL}/api/dashboard/stats")
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+        return response.json()
+
+    def test_equipment_counters(self):
+        """Test: Equipment create, status change and delete move the totals and status counts"""
+        before = self.get_stats()["equipment_stats"]
+
+        response = self.session.post(f"{BASE_URL}/api/equipments", json={
+            "type": "capteur",
+            "reference": "TEST_COUNTER_001",
+            "numero_serie": "TEST_COUNTER_SN_001",
+            "caisson_id": "test",
+            "statut": "en_service"
+        })
+        assert response.status_code == 200
+        equipment = response.json()
+
+        try:
+            created = self.get_stats()["equipment_stats"]
+            assert created["total"] == before["total"] + 1
+            assert created["en_service"] == before["en_service"] + 1
+
+            response = self.session.put(f"{BASE_URL}/api/equipments/{equipment['id']}", json={
+                "type": "capteur",
+                "reference": "TEST_COUNTER_001",
+                "numero_serie": "TEST_COUNTER_SN_001",
+                "caisson_id": "test",
+                "statut": "maintenance"
+            })
+            assert response.status_code == 200
+            updated = self.get_stats()["equipment_stats"]
+            assert updated["total"] == before["total"] + 1
+            assert updated["en_service"] == before["en_service"]
+            assert updated["maintenance"] == before["maintenance"] + 1
+        finally:
+            self.session.delete(f"{BASE_URL}/api/equipments/{equipment['id']}")
+
+        assert self.get_stats()["equipment_stats"] == before
+        print("✓ Equipment counters followed create, update and delete")
+
+    def test_spare_part_low_stock_counters(self):
+        """Test: Spare part create, stock update and delete move the total and low-stock counts"""
+        before = self.get_stats()
+
+        response = self.session.post(f"{BASE_URL}/api/spare-parts", json={
+            "nom": "TEST_COUNTER_PART",
+            "reference_fabricant": "TEST_COUNTER_REF",
+            "equipment_type": "capteur",
+            "quantite_stock": 5,
+            "seuil_minimum": 2
+        })
+        assert response.status_code == 200
+        part = response.json()
+
+        try:
+            created = self.get_stats()
+            assert created["total_spare_parts"] == before["total_spare_parts"] + 1
+            assert created["low_stock_count"] == before["low_stock_count"]
+
+            response = self.session.put(f"{BASE_URL}/api/spare-parts/{part['id']}", json={"quantite_stock": 1})
+            assert response.status_code == 200
+            assert response.json()["is_low_stock"] is True
+            assert self.get_stats()["low_stock_count"] == before["low_stock_count"] + 1
+
+            response = self.session.put(f"{BASE_URL}/api/spare-parts/{part['id']}", json={"seuil_minimum": 0})
+            assert response.status_code == 200
+            assert response.json()["is_low_stock"] is False
+            assert self.get_stats()["low_stock_count"] == before["low_stock_count"]
+        finally:
+            self.session.delete(f"{BASE_URL}/api/spare-parts/{part['id']}")
+
+        after = self.get_stats()
+        assert after["total_spare_parts"] == before["total_spare_parts"]
+        assert after["low_stock_count"] == before["low_stock_count"]
+        print("✓ Spare part counters followed create, update and delete")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
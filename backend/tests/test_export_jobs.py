@@ -0,0 +1,92 @@
+"""
+Test suite for background export jobs
+- POST /api/exports queues a job that builds the artifact with progress
+- The finished artifact is downloaded from /api/exports/{id}/download
+- Unknown kinds and parameters are rejected
+"""
+import pytest
+import requests
+import os
+import time
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+# Test credentials
+TEST_EMAIL = "admin@hypermaint.fr"
+TEST_PASSWORD = "admin123"
+
+
+class TestExportJobs:
+    """Export job tests"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Setup: Get auth token before each test"""
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+
+        response = self.session.post(f"{BASE_URL}/api/auth/login", json={
+            "email": TEST_EMAIL,
+            "password": TEST_PASSWORD
+        })
+
+        if response.status_code != 200:
+            pytest.skip(f"Login failed with status {response.status_code}")
+
+        self.token = response.json().get("access_token")
+        self.session.headers.update({"Authorization": f"Bearer {self.token}"})
+
+    def wait_for(self, job_id, timeout=60):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = self.session.get(f"{BASE_URL}/api/exports/{job_id}").json()
+            if job["status"] not in ("queued", "running"):
+                return job
+            assert 0 <= job["progress"] < 1
+            time.sleep(0.5)
+        pytest.fail(f"Export job {job_id} still {job['status']} after {timeout}s")
+
+    @pytest.mark.parametrize("kind,params,media_type", [
+        ("csv", {"collection": "equipments"}, "text/csv"),
+        ("ndjson", {}, "application/x-ndjson"),
+        ("pdf_statistics", {}, "application/pdf"),
+    ])
+    def test_job_builds_artifact(self, kind, params, media_type):
+        """Test: A queued job finishes and its artifact can be downloaded"""
+        response = self.session.post(f"{BASE_URL}/api/exports", json={"kind": kind, "params": params})
+        if response.status_code == 429:
+            pytest.skip("Export job limit reached for the test user")
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+        job = response.json()
+        assert job["status"] in ("queued", "running")
+
+        job = self.wait_for(job["id"])
+        assert job["status"] == "done", f"Job failed: {job.get('error')}"
+        assert job["progress"] == 1.0
+
+        download = self.session.get(f"{BASE_URL}/api/exports/{job['id']}/download")
+        assert download.status_code == 200
+        assert download.headers["Content-Type"].startswith(media_type)
+        assert len(download.content) == job["size"]
+        print(f"✓ {kind} job built {job['filename']} ({job['size']} bytes)")
+
+    def test_invalid_jobs_rejected(self):
+        """Test: Unknown kinds, unknown parameters and missing required parameters give 400"""
+        response = self.session.post(f"{BASE_URL}/api/exports", json={"kind": "xml"})
+        assert response.status_code == 400
+        response = self.session.post(f"{BASE_URL}/api/exports", json={"kind": "csv", "params": {"table": "x"}})
+        assert response.status_code == 400
+        for kind in ["csv", "parquet", "pdf_equipment"]:
+            response = self.session.post(f"{BASE_URL}/api/exports", json={"kind": kind})
+            assert response.status_code == 400, f"{kind} without its required parameter: {response.status_code}"
+        print("✓ Invalid export jobs rejected")
+
+    def test_unknown_job_not_found(self):
+        """Test: Another id gives 404"""
+        response = self.session.get(f"{BASE_URL}/api/exports/does-not-exist")
+        assert response.status_code == 404
+        print("✓ Unknown export job not found")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,183 @@
+"""
+Test suite for the export endpoints
+- CSV exports stream every document with a header covering all stored keys
+- JSON and NDJSON full exports contain the same records
+- The SQL dump and the SQLite export load into SQLite with the same rows
+- Delta exports report writes and deletions since a resume token
+- Parquet exports are typed (needs pyarrow on both sides)
+"""
+import csv
+import io
+import json
+import sqlite3
+import tempfile
+import time
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+# Test credentials
+TEST_EMAIL = "admin@hypermaint.fr"
+TEST_PASSWORD = "admin123"
+
+
+class TestExports:
+    """Export tests"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Setup: Get auth token before each test"""
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+
+        response = self.session.post(f"{BASE_URL}/api/auth/login", json={
+            "email": TEST_EMAIL,
+            "password": TEST_PASSWORD
+        })
+
+        if response.status_code != 200:
+            pytest.skip(f"Login failed with status {response.status_code}")
+
+        self.token = response.json().get("access_token")
+        self.session.headers.update({"Authorization": f"Bearer {self.token}"})
+
+    def test_csv_export_includes_every_equipment(self):
+        """Test: The CSV export has one row per equipment and flattens list fields"""
+        response = self.session.post(f"{BASE_URL}/api/equipments", json={
+            "type": "capteur",
+            "reference": "TEST_EXPORT_001",
+            "numero_serie": "TEST_EXPORT_SN_001",
+            "caisson_id": "test"
+        })
+        assert response.status_code == 200
+        equipment = response.json()
+
+        try:
+            counted = self.session.get(f"{BASE_URL}/api/equipments", params={"limit": 1, "count": "true"})
+            total = int(counted.headers["X-Total-Count"])
+
+            response = self.session.get(f"{BASE_URL}/api/export/csv/equipments")
+            assert response.status_code == 200
+            assert response.headers["Content-Type"].startswith("text/csv")
+
+            rows = list(csv.DictReader(io.StringIO(response.text)))
+            if "X-Total-Count-Capped" not in counted.headers:
+                assert len(rows) == total, f"Expected {total} rows, got {len(rows)}"
+            for column in ("id", "reference", "photos", "historique_compteur"):
+                assert column in rows[0], f"Missing column {column}"
+
+            row = next(r for r in rows if r["id"] == equipment["id"])
+            assert row["reference"] == "TEST_EXPORT_001"
+            assert row["photos"] == ""
+            print(f"✓ CSV export contains {len(rows)} equipments")
+        finally:
+            self.session.delete(f"{BASE_URL}/api/equipments/{equipment['id']}")
+
+    def test_json_and_ndjson_exports_match(self):
+        """Test: The NDJSON export holds the JSON export's records, tagged with their collection"""
+        response = self.session.get(f"{BASE_URL}/api/export/json")
+        assert response.status_code == 200
+        export = response.json()
+        assert set(export) == {"caisson", "equipments", "work_orders", "interventions", "inspections", "spare_parts"}
+
+        response = self.session.get(f"{BASE_URL}/api/export/ndjson")
+        assert response.status_code == 200
+        assert response.headers["Content-Type"].startswith("application/x-ndjson")
+
+        records = {}
+        for line in response.text.splitlines():
+            record = json.loads(line)
+            records.setdefault(record.pop("_collection"), []).append(record)
+        for collection, documents in export.items():
+            assert records.get(collection, []) == documents, f"{collection} differs between JSON and NDJSON"
+        print(f"✓ JSON and NDJSON exports match ({sum(len(d) for d in export.values())} records)")
+
+    def test_sql_dump_and_sqlite_export_match(self):
+        """Test: The SQL dump replays into SQLite and matches the SQLite export table by table"""
+        response = self.session.get(f"{BASE_URL}/api/export/sql")
+        assert response.status_code == 200
+        dump = sqlite3.connect(":memory:")
+        dump.executescript(response.text)
+
+        response = self.session.get(f"{BASE_URL}/api/export/sql", params={"format": "sqlite"})
+        assert response.status_code == 200
+        with tempfile.NamedTemporaryFile(suffix=".sqlite") as f:
+            f.write(response.content)
+            f.flush()
+            exported = sqlite3.connect(f.name)
+            tables = [name for (name,) in exported.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+            assert "interventions_pieces_utilisees" in tables
+            for table in tables:
+                counts = [c.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for c in (dump, exported)]
+                assert counts[0] == counts[1], f"{table}: {counts[0]} rows in the dump, {counts[1]} in SQLite"
+            columns = [row[1] for row in exported.execute("PRAGMA table_info(users)")]
+            assert "password_hash" not in columns
+            exported.close()
+        print(f"✓ SQL dump and SQLite export match ({len(tables)} tables)")
+
+    def test_changes_since_resume_token(self):
+        """Test: /export/changes returns the documents updated and deleted after the token"""
+        response = self.session.get(f"{BASE_URL}/api/export/changes")
+        assert response.status_code == 200
+        token = response.headers["X-Resume-Token"]
+        assert json.loads(response.text.splitlines()[-1]) == {"_resume_token": token}
+
+        # Writes within the settle window (5s) are left to the next delta
+        time.sleep(6)
+        response = self.session.post(f"{BASE_URL}/api/equipments", json={
+            "type": "capteur",
+            "reference": "TEST_DELTA_001",
+            "numero_serie": "TEST_DELTA_SN_001",
+            "caisson_id": "test"
+        })
+        assert response.status_code == 200
+        equipment = response.json()
+        self.session.delete(f"{BASE_URL}/api/equipments/{equipment['id']}")
+        time.sleep(6)
+
+        response = self.session.get(f"{BASE_URL}/api/export/changes", params={"since": token})
+        assert response.status_code == 200
+        records = [json.loads(line) for line in response.text.splitlines()]
+        ops = [r["_op"] for r in records if r.get("_collection") == "equipments" and r.get("id") == equipment["id"]]
+        assert "delete" in ops, f"Deletion missing from the delta: {ops}"
+        assert records[-1]["_resume_token"] == response.headers["X-Resume-Token"]
+        print(f"✓ Delta export returned {len(records) - 1} changes")
+
+    def test_changes_invalid_token(self):
+        """Test: An unreadable resume token gives 400"""
+        response = self.session.get(f"{BASE_URL}/api/export/changes", params={"since": "not-a-token"})
+        assert response.status_code == 400
+        print("✓ Invalid resume token rejected")
+
+    @pytest.mark.parametrize("dataset", ["interventions", "work_orders", "spare_parts", "historique_compteur"])
+    def test_parquet_export_is_typed(self, dataset):
+        """Test: Parquet exports carry date/number types instead of strings"""
+        pq = pytest.importorskip("pyarrow.parquet")
+        response = self.session.get(f"{BASE_URL}/api/export/parquet/{dataset}")
+        if response.status_code == 501:
+            pytest.skip("pyarrow not installed on the server")
+        assert response.status_code == 200
+
+        table = pq.read_table(io.BytesIO(response.content))
+        types = {field.name: str(field.type) for field in table.schema}
+        expected = {
+            "interventions": {"date_intervention": "date32[day]", "duree_minutes": "int64"},
+            "work_orders": {"date_planifiee": "date32[day]", "periodicite_jours": "int64"},
+            "spare_parts": {"quantite_stock": "int64", "prix_unitaire": "double"},
+            "historique_compteur": {"date": "timestamp[ms, tz=UTC]", "valeur": "double"},
+        }[dataset]
+        for name, kind in expected.items():
+            assert types[name] == kind, f"{dataset}.{name}: expected {kind}, got {types[name]}"
+        print(f"✓ {dataset}.parquet has {table.num_rows} typed rows")
+
+    def test_csv_export_unknown_collection(self):
+        """Test: Exporting a collection outside the allowed list gives 400"""
+        response = self.session.get(f"{BASE_URL}/api/export/csv/users")
+        assert response.status_code == 400
+        print("✓ Unknown collection rejected")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,51 @@
+"""
+Test suite for database indexes
+- Every filtered route query is planned with an index (GET /api/admin/indexes)
+"""
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+# Test credentials
+TEST_EMAIL = "admin@hypermaint.fr"
+TEST_PASSWORD = "admin123"
+
+
+class TestIndexes:
+    """Query plan verification tests"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Setup: Get auth token before each test"""
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+
+        response = self.session.post(f"{BASE_URL}/api/auth/login", json={
+            "email": TEST_EMAIL,
+            "password": TEST_PASSWORD
+        })
+
+        if response.status_code != 200:
+            pytest.skip(f"Login failed with status {response.status_code}")
+
+        self.token = response.json().get("access_token")
+        self.session.headers.update({"Authorization": f"Bearer {self.token}"})
+
+    def test_no_route_query_plans_collscan(self):
+        """Test: explain() of every route query shape uses an index"""
+        response = self.session.get(f"{BASE_URL}/api/admin/indexes")
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+
+        data = response.json()
+        offenders = [
+            f"{p['route']} on {p['collection']}: {' > '.join(p['stages'])}"
+            for p in data["plans"] if p["collscan"]
+        ]
+        assert data["ok"], "COLLSCAN planned for:\n" + "\n".join(offenders)
+        print(f"✓ {len(data['plans'])} query shapes use an index")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,94 @@
+"""
+Test suite for the cross-worker invalidation bus
+- An event written to the cache_events capped collection by another worker
+  invalidates this worker's cached responses
+Needs direct access to the server's database (MONGO_URL / DB_NAME), e.g. a local
+mongod replica set.
+"""
+import pytest
+import requests
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+MONGO_URL = os.environ.get('MONGO_URL')
+DB_NAME = os.environ.get('DB_NAME', 'hypermaint')
+
+# Test credentials
+TEST_EMAIL = "admin@hypermaint.fr"
+TEST_PASSWORD = "admin123"
+
+
+class TestInvalidationBus:
+    """Invalidation bus tests"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Setup: Get auth token and a database handle before each test"""
+        if not MONGO_URL:
+            pytest.skip("MONGO_URL not set")
+        from pymongo import MongoClient
+
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+
+        response = self.session.post(f"{BASE_URL}/api/auth/login", json={
+            "email": TEST_EMAIL,
+            "password": TEST_PASSWORD
+        })
+
+        if response.status_code != 200:
+            pytest.skip(f"Login failed with status {response.status_code}")
+
+        self.token = response.json().get("access_token")
+        self.session.headers.update({"Authorization": f"Bearer {self.token}"})
+
+        stats = self.session.get(f"{BASE_URL}/api/admin/cache-stats").json()
+        if not stats["invalidation_bus"]["enabled"]:
+            pytest.skip("Invalidation bus disabled")
+
+        self.client = MongoClient(MONGO_URL)
+        self.db = self.client[DB_NAME]
+        yield
+        self.client.close()
+
+    def test_foreign_event_invalidates_cached_response(self):
+        """Test: A write published by another worker is visible on the next read"""
+        before = self.session.get(f"{BASE_URL}/api/equipment-types").json()
+        type_id = str(uuid.uuid4())
+        self.db.equipment_types.insert_one({"id": type_id, "nom": "TEST_BUS_TYPE"})
+
+        try:
+            # Without an event the cached list is still served
+            assert self.session.get(f"{BASE_URL}/api/equipment-types").json() == before
+
+            self.db.cache_events.insert_one({
+                "origin": "test-worker",
+                "collection": "equipment_types",
+                "id": type_id,
+                "at": datetime.now(timezone.utc)
+            })
+
+            deadline = time.time() + 5
+            while time.time() < deadline:
+                types = self.session.get(f"{BASE_URL}/api/equipment-types").json()
+                if any(t["id"] == type_id for t in types):
+                    break
+                time.sleep(0.2)
+            else:
+                pytest.fail("Cached equipment types were not invalidated by the bus event")
+            print("✓ Foreign invalidation event applied")
+        finally:
+            self.db.equipment_types.delete_one({"id": type_id})
+            self.db.cache_events.insert_one({
+                "origin": "test-worker",
+                "collection": "equipment_types",
+                "id": type_id,
+                "at": datetime.now(timezone.utc)
+            })
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
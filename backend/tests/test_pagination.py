@@ -0,0 +1,90 @@
+"""
+Test suite for keyset pagination of the list endpoints
+- Consecutive pages follow X-Next-Cursor without overlap or gaps
+- The first page reports X-Total-Count with count=true
+"""
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+# Test credentials
+TEST_EMAIL = "admin@hypermaint.fr"
+TEST_PASSWORD = "admin123"
+
+
+class TestPagination:
+    """Cursor pagination tests"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Setup: Get auth token and create a few equipments before each test"""
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+
+        response = self.session.post(f"{BASE_URL}/api/auth/login", json={
+            "email": TEST_EMAIL,
+            "password": TEST_PASSWORD
+        })
+
+        if response.status_code != 200:
+            pytest.skip(f"Login failed with status {response.status_code}")
+
+        self.token = response.json().get("access_token")
+        self.session.headers.update({"Authorization": f"Bearer {self.token}"})
+
+        self.created = []
+        for i in range(5):
+            response = self.session.post(f"{BASE_URL}/api/equipments", json={
+                "type": "capteur",
+                "reference": f"TEST_PAGE_{i:03d}",
+                "numero_serie": f"TEST_PAGE_SN_{i:03d}",
+                "caisson_id": "test"
+            })
+            assert response.status_code == 200
+            self.created.append(response.json()["id"])
+        yield
+        for equipment_id in self.created:
+            self.session.delete(f"{BASE_URL}/api/equipments/{equipment_id}")
+
+    def test_two_pages_match_one_larger_page(self):
+        """Test: Pages 1 and 2 of size 2 are disjoint and equal the first page of size 4"""
+        first = self.session.get(f"{BASE_URL}/api/equipments", params={"limit": 2, "count": "true"})
+        assert first.status_code == 200
+        cursor = first.headers.get("X-Next-Cursor")
+        assert cursor, "Expected a next cursor"
+        assert int(first.headers["X-Total-Count"]) >= len(self.created)
+
+        second = self.session.get(f"{BASE_URL}/api/equipments", params={"limit": 2, "cursor": cursor})
+        assert second.status_code == 200
+
+        first_ids = [e["id"] for e in first.json()]
+        second_ids = [e["id"] for e in second.json()]
+        assert len(first_ids) == 2 and len(second_ids) == 2
+        assert not set(first_ids) & set(second_ids), "Pages overlap"
+
+        reference = self.session.get(f"{BASE_URL}/api/equipments", params={"limit": 4})
+        assert first_ids + second_ids == [e["id"] for e in reference.json()], "Items missing between pages"
+        print("✓ Two pages of 2 match one page of 4")
+
+    def test_walk_all_pages(self):
+        """Test: Following the cursor to the end returns every equipment exactly once"""
+        seen = []
+        params = {"limit": 2, "fields": "reference"}
+        while True:
+            response = self.session.get(f"{BASE_URL}/api/equipments", params=params)
+            assert response.status_code == 200
+            seen.extend(e["id"] for e in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            params["cursor"] = cursor
+
+        assert len(seen) == len(set(seen)), "An equipment was returned twice"
+        assert set(self.created) <= set(seen), "A created equipment is missing"
+        print(f"✓ Walked {len(seen)} equipments without duplicates")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
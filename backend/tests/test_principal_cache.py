@@ -0,0 +1,74 @@
+"""
+Test suite for the authenticated-principal cache
+- Repeated authenticated calls are served from the cache (GET /api/admin/cache-stats)
+- A password change invalidates the cached user document
+"""
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+# Test credentials
+TEST_EMAIL = "admin@hypermaint.fr"
+TEST_PASSWORD = "admin123"
+
+
+class TestPrincipalCache:
+    """Principal cache tests"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Setup: Get auth token before each test"""
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+
+        response = self.session.post(f"{BASE_URL}/api/auth/login", json={
+            "email": TEST_EMAIL,
+            "password": TEST_PASSWORD
+        })
+
+        if response.status_code != 200:
+            pytest.skip(f"Login failed with status {response.status_code}")
+
+        self.token = response.json().get("access_token")
+        self.session.headers.update({"Authorization": f"Bearer {self.token}"})
+
+    def get_principal_stats(self):
+        response = self.session.get(f"{BASE_URL}/api/admin/cache-stats")
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+        return response.json()["principal"]
+
+    def test_repeated_requests_hit_cache(self):
+        """Test: Authenticated calls after the first one do not miss the cache"""
+        self.session.get(f"{BASE_URL}/api/auth/me")
+        before = self.get_principal_stats()
+
+        for _ in range(5):
+            response = self.session.get(f"{BASE_URL}/api/auth/me")
+            assert response.status_code == 200
+
+        after = self.get_principal_stats()
+        # The stats call itself is authenticated too
+        assert after["hits"] - before["hits"] >= 6, f"Expected cache hits, got {before} -> {after}"
+        assert after["misses"] == before["misses"], "No DB lookup expected for a cached principal"
+        print(f"✓ Principal served from cache: {after}")
+
+    def test_password_change_invalidates_cache(self):
+        """Test: Changing the password drops the cached user document"""
+        self.session.get(f"{BASE_URL}/api/auth/me")
+        before = self.get_principal_stats()
+
+        response = self.session.put(f"{BASE_URL}/api/users/me/change-password", json={
+            "current_password": TEST_PASSWORD,
+            "new_password": TEST_PASSWORD
+        })
+        assert response.status_code == 200
+
+        after = self.get_principal_stats()
+        assert after["misses"] > before["misses"], "Expected a cache miss after invalidation"
+        print("✓ Password change invalidated the cached principal")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,79 @@
+"""
+Test suite for the GET response cache
+- Repeated reads of a cached route are hits (GET /api/admin/cache-stats)
+- A write to the source collection invalidates the cached responses
+"""
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+# Test credentials
+TEST_EMAIL = "admin@hypermaint.fr"
+TEST_PASSWORD = "admin123"
+
+
+class TestResponseCache:
+    """Response cache tests"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Setup: Get auth token before each test"""
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+
+        response = self.session.post(f"{BASE_URL}/api/auth/login", json={
+            "email": TEST_EMAIL,
+            "password": TEST_PASSWORD
+        })
+
+        if response.status_code != 200:
+            pytest.skip(f"Login failed with status {response.status_code}")
+
+        self.token = response.json().get("access_token")
+        self.session.headers.update({"Authorization": f"Bearer {self.token}"})
+
+    def get_route_stats(self, route):
+        response = self.session.get(f"{BASE_URL}/api/admin/cache-stats")
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+        return response.json()["responses"]["routes"].get(route, {"hits": 0, "misses": 0})
+
+    def test_repeated_reads_hit_cache(self):
+        """Test: Reads after the first one are served from the cache"""
+        first = self.session.get(f"{BASE_URL}/api/equipment-types")
+        assert first.status_code == 200
+        before = self.get_route_stats("/api/equipment-types")
+
+        for _ in range(3):
+            response = self.session.get(f"{BASE_URL}/api/equipment-types")
+            assert response.json() == first.json()
+
+        after = self.get_route_stats("/api/equipment-types")
+        assert after["hits"] - before["hits"] == 3, f"Expected 3 hits, got {before} -> {after}"
+        print(f"✓ Equipment types served from cache: {after}")
+
+    def test_write_invalidates_cache(self):
+        """Test: Creating an equipment is visible in the next list read"""
+        before = self.session.get(f"{BASE_URL}/api/equipments", params={"fields": "reference"}).json()
+
+        response = self.session.post(f"{BASE_URL}/api/equipments", json={
+            "type": "capteur",
+            "reference": "TEST_CACHE_001",
+            "numero_serie": "TEST_CACHE_SN_001",
+            "caisson_id": "test"
+        })
+        assert response.status_code == 200
+        created = response.json()
+
+        try:
+            after = self.session.get(f"{BASE_URL}/api/equipments", params={"fields": "reference"}).json()
+            assert len(after) == len(before) + 1
+            assert any(e["id"] == created["id"] for e in after)
+            print("✓ Equipment creation invalidated the cached list")
+        finally:
+            self.session.delete(f"{BASE_URL}/api/equipments/{created['id']}")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,105 @@
+"""
+Test suite for the search endpoint
+- GET /api/search finds an equipment by reference prefix
+- Hits are typed and sorted by score, and the result cap is enforced
+- Exact and prefix identifier hits rank above text hits
+"""
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+# Test credentials
+TEST_EMAIL = "admin@hypermaint.fr"
+TEST_PASSWORD = "admin123"
+
+
+class TestSearch:
+    """Cross-collection search tests"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Setup: Get auth token before each test"""
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+
+        response = self.session.post(f"{BASE_URL}/api/auth/login", json={
+            "email": TEST_EMAIL,
+            "password": TEST_PASSWORD
+        })
+
+        if response.status_code != 200:
+            pytest.skip(f"Login failed with status {response.status_code}")
+
+        self.token = response.json().get("access_token")
+        self.session.headers.update({"Authorization": f"Bearer {self.token}"})
+
+    def test_search_by_reference_prefix(self):
+        """Test: An equipment is found from the start of its reference"""
+        equipments = self.session.get(f"{BASE_URL}/api/equipments", params={"limit": 1}).json()
+        if not equipments:
+            pytest.skip("No equipment to search for")
+        equipment = equipments[0]
+
+        response = self.session.get(f"{BASE_URL}/api/search", params={
+            "q": equipment["reference"][:3],
+            "types": "equipment"
+        })
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+
+        results = response.json()["results"]
+        assert equipment["id"] in [hit["id"] for hit in results]
+        assert all(hit["type"] == "equipment" for hit in results)
+        print(f"✓ {equipment['reference']} found among {len(results)} hits")
+
+    def test_results_ranked_and_capped(self):
+        """Test: Hits are sorted by descending score and limited"""
+        response = self.session.get(f"{BASE_URL}/api/search", params={"q": "a", "limit": 5})
+        assert response.status_code == 200
+
+        scores = [hit["score"] for hit in response.json()["results"]]
+        assert len(scores) <= 5
+        assert scores == sorted(scores, reverse=True)
+        print(f"✓ {len(scores)} hits in score order")
+
+    def test_exact_reference_outranks_text_hits(self):
+        """Test: An exact reference ranks first even against a heavily matching work order title"""
+        response = self.session.post(f"{BASE_URL}/api/equipments", json={
+            "type": "capteur",
+            "reference": "TESTRANK001",
+            "numero_serie": "TESTRANK_SN_001",
+            "caisson_id": "test"
+        })
+        assert response.status_code == 200
+        equipment = response.json()
+        response = self.session.post(f"{BASE_URL}/api/work-orders", json={
+            "titre": "TESTRANK001 TESTRANK001 TESTRANK001",
+            "description": "TESTRANK001 TESTRANK001",
+            "type_maintenance": "corrective",
+            "date_planifiee": "2030-01-01"
+        })
+        assert response.status_code == 200
+        work_order = response.json()
+
+        try:
+            response = self.session.get(f"{BASE_URL}/api/search", params={"q": "TESTRANK001"})
+            assert response.status_code == 200
+            results = response.json()["results"]
+            assert results[0]["id"] == equipment["id"], f"Expected the equipment first, got {results[0]}"
+            text_hit = next(hit for hit in results if hit["id"] == work_order["id"])
+            assert text_hit["score"] < 20, f"Text score {text_hit['score']} not below the prefix band"
+            print(f"✓ Exact reference {results[0]['score']} > text hit {text_hit['score']}")
+        finally:
+            self.session.delete(f"{BASE_URL}/api/equipments/{equipment['id']}")
+            self.session.delete(f"{BASE_URL}/api/work-orders/{work_order['id']}")
+
+    def test_unknown_type_rejected(self):
+        """Test: An unknown hit type returns 400"""
+        response = self.session.get(f"{BASE_URL}/api/search", params={"q": "a", "types": "unknown"})
+        assert response.status_code == 400, f"Expected 400, got {response.status_code}"
+        print("✓ Unknown type rejected")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,78 @@
+"""
+Test suite for access/refresh tokens
+- Login returns a short-lived access token and a refresh token
+- POST /api/auth/refresh exchanges a refresh token for a new access token
+- Access tokens are refused by /auth/refresh and refresh tokens by protected routes
+"""
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+# Test credentials
+TEST_EMAIL = "admin@hypermaint.fr"
+TEST_PASSWORD = "admin123"
+
+
+class TestTokenRefresh:
+    """Token refresh endpoint tests"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Setup: Login to get both tokens before each test"""
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+
+        response = self.session.post(f"{BASE_URL}/api/auth/login", json={
+            "email": TEST_EMAIL,
+            "password": TEST_PASSWORD
+        })
+
+        if response.status_code != 200:
+            pytest.skip(f"Login failed with status {response.status_code}")
+
+        self.tokens = response.json()
+
+    def test_login_returns_refresh_token(self):
+        """Test: Login response carries both tokens and the access token lifetime"""
+        assert self.tokens.get("access_token")
+        assert self.tokens.get("refresh_token")
+        assert self.tokens.get("expires_in", 0) > 0
+        print(f"✓ Access token valid for {self.tokens['expires_in']}s")
+
+    def test_refresh_returns_new_access_token(self):
+        """Test: A refresh token yields a working access token"""
+        response = self.session.post(f"{BASE_URL}/api/auth/refresh", json={
+            "refresh_token": self.tokens["refresh_token"]
+        })
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+
+        data = response.json()
+        assert data["user"]["email"] == TEST_EMAIL
+
+        me = self.session.get(f"{BASE_URL}/api/auth/me", headers={
+            "Authorization": f"Bearer {data['access_token']}"
+        })
+        assert me.status_code == 200
+        print("✓ Refreshed access token accepted")
+
+    def test_access_token_cannot_refresh(self):
+        """Test: An access token is not accepted as a refresh token"""
+        response = self.session.post(f"{BASE_URL}/api/auth/refresh", json={
+            "refresh_token": self.tokens["access_token"]
+        })
+        assert response.status_code == 401, f"Expected 401, got {response.status_code}"
+        print("✓ Access token rejected by /auth/refresh")
+
+    def test_refresh_token_cannot_authenticate(self):
+        """Test: A refresh token is not accepted as a bearer token"""
+        response = self.session.get(f"{BASE_URL}/api/users", headers={
+            "Authorization": f"Bearer {self.tokens['refresh_token']}"
+        })
+        assert response.status_code == 401, f"Expected 401, got {response.status_code}"
+        print("✓ Refresh token rejected as bearer token")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
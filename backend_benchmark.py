@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+HyperMaint GMAO Backend Benchmarks
+Measures throughput and latency of the API against a running backend
+
+Usage: python backend_benchmark.py [scenario ...]
+"""
+
+import requests
+import statistics
+import sys
+import threading
+import time
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+# Configuration
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', 'http://localhost:8001').rstrip('/') + "/api"
+AUTH_EMAIL = "admin@hypermaint.fr"
+AUTH_PASSWORD = "admin123"
+# Direct database access, only used to seed large datasets
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = os.environ.get('DB_NAME', 'hypermaint')
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def describe(latencies_ms):
+    """Summarize a list of latencies in milliseconds"""
+    if not latencies_ms:
+        return "no samples"
+    return (
+        f"n={len(latencies_ms)} "
+        f"p50={percentile(latencies_ms, 50):.1f}ms "
+        f"p95={percentile(latencies_ms, 95):.1f}ms "
+        f"p99={percentile(latencies_ms, 99):.1f}ms "
+        f"mean={statistics.mean(latencies_ms):.1f}ms"
+    )
+
+
+class HyperMaintBenchmark:
+    def __init__(self):
+        self.session = requests.Session()
+        self.token = None
+
+    def authenticate(self):
+        """Authenticate and get JWT token"""
+        response = self.session.post(f"{BASE_URL}/auth/login", json={
+            "email": AUTH_EMAIL,
+            "password": AUTH_PASSWORD
+        })
+        if response.status_code != 200:
+            print(f"❌ Authentication failed: {response.status_code}")
+            return False
+        self.token = response.json().get('access_token')
+        self.session.headers.update({'Authorization': f'Bearer {self.token}'})
+        return True
+
+    def timed_get(self, session, path, **kwargs):
+        """GET a path and return (status_code, latency_ms)"""
+        start = time.perf_counter()
+        response = session.get(f"{BASE_URL}{path}", **kwargs)
+        return response.status_code, (time.perf_counter() - start) * 1000
+
+    def bench_login_storm(self, logins=200, login_threads=32, probe_path="/health", duration_guard=120):
+        """Login storm: login throughput and p99 of unrelated GETs while it runs"""
+        print(f"\n🔐 Login storm: {logins} logins over {login_threads} threads, probing {probe_path}")
+
+        statuses = {}
+        login_latencies = []
+        probe_latencies = []
+        lock = threading.Lock()
+        storm_done = threading.Event()
+
+        def do_login(_):
+            session = requests.Session()
+            start = time.perf_counter()
+            response = session.post(f"{BASE_URL}/auth/login", json={
+                "email": AUTH_EMAIL,
+                "password": AUTH_PASSWORD
+            })
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                if response.status_code == 200:
+                    login_latencies.append(elapsed)
+
+        def probe():
+            session = requests.Session()
+            session.headers.update({'Authorization': f'Bearer {self.token}'})
+            deadline = time.monotonic() + duration_guard
+            while not storm_done.is_set() and time.monotonic() < deadline:
+                status_code, elapsed = self.timed_get(session, probe_path)
+                if status_code == 200:
+                    probe_latencies.append(elapsed)
+
+        # Baseline latency of the probe route with no login traffic
+        baseline = [self.timed_get(self.session, probe_path)[1] for _ in range(50)]
+
+        prober = threading.Thread(target=probe)
+        prober.start()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=login_threads) as executor:
+            list(executor.map(do_login, range(logins)))
+        wall = time.perf_counter() - start
+        storm_done.set()
+        prober.join()
+
+        ok = statuses.get(200, 0)
+        print(f"  Login statuses: {statuses}")
+        print(f"  Login throughput: {ok / wall:.1f} logins/s ({ok} ok in {wall:.1f}s)")
+        print(f"  Login latency: {describe(login_latencies)}")
+        print(f"  {probe_path} baseline: {describe(baseline)}")
+        print(f"  {probe_path} during storm: {describe(probe_latencies)}")
+
+    def bench_dashboard_stats(self, sizes=(1000, 10000, 100000), requests_per_size=30):
+        """Dashboard stats latency as the work order collection grows"""
+        from pymongo import MongoClient
+
+        print(f"\n📊 Dashboard stats with {', '.join(str(s) for s in sizes)} seeded work orders")
+        collection = MongoClient(MONGO_URL)[DB_NAME].work_orders
+        statuts = ["planifiee", "en_cours", "terminee", "annulee"]
+        seeded = 0
+        try:
+            for size in sizes:
+                batch = []
+                for i in range(seeded, size):
+                    batch.append({
+                        "id": str(uuid.uuid4()),
+                        "titre": f"Benchmark {i}",
+                        "description": "Ordre de travail de benchmark",
+                        "type_maintenance": "preventive",
+                        "priorite": "normale",
+                        "statut": statuts[i % len(statuts)],
+                        "date_planifiee": "2030-01-01",
+                        "photos": [],
+                        "documents": [],
+                        "benchmark": True
+                    })
+                    if len(batch) == 5000:
+                        collection.insert_many(batch)
+                        batch = []
+                if batch:
+                    collection.insert_many(batch)
+                seeded = size
+
+                self.timed_get(self.session, "/dashboard/stats")  # warm-up
+                latencies = []
+                for _ in range(requests_per_size):
+                    status_code, elapsed = self.timed_get(self.session, "/dashboard/stats")
+                    if status_code == 200:
+                        latencies.append(elapsed)
+                print(f"  {size:>7} work orders: {describe(latencies)}")
+        finally:
+            collection.delete_many({"benchmark": True})
+
+    def bench_list_serialization(self, size=1000, requests_per_endpoint=20):
+        """Large list pages: latency and payload size, uncompressed and compressed.
+
+        Run once against a default server and once against one started with
+        FAST_JSON_RESPONSES=true. Set BENCHMARK_RESULTS=<file> to save a run and BENCHMARK_BASELINE=<file>
+        to print the change against a saved run.
+        """
+        import json
+        from pymongo import MongoClient
+
+        print(f"\n🧾 List serialization with {size} documents per collection")
+        database = MongoClient(MONGO_URL)[DB_NAME]
+        seeds = {
+            "work_orders": lambda i: {
+                "titre": f"Benchmark {i}",
+                "description": "Ordre de travail de benchmark",
+                "type_maintenance": "preventive",
+                "priorite": "normale",
+                "statut": "planifiee",
+                "date_planifiee": datetime(2030, 1, 1, tzinfo=timezone.utc),
+                "photos": [],
+                "documents": []
+            },
+            "spare_parts": lambda i: {
+                "nom": f"Pièce benchmark {i}",
+                "reference_fabricant": f"BENCH-{i}",
+                "equipment_type": "compresseur",
+                "quantite_stock": 10,
+                "seuil_minimum": 1,
+                "is_low_stock": False,
+                "photos": [],
+                "documents": []
+            },
+            "interventions": lambda i: {
+                "type_intervention": "curative",
+                "date_intervention": datetime(2030, 1, 1, tzinfo=timezone.utc),
+                "technicien": "Benchmark",
+                "actions_realisees": "Intervention de benchmark",
+                "pieces_utilisees": []
+            },
+        }
+        endpoints = {
+            "work_orders": "/work-orders",
+            "spare_parts": "/spare-parts",
+            "interventions": "/interventions",
+        }
+        results = {}
+        try:
+            now = datetime.now(timezone.utc)
+            for collection, make in seeds.items():
+                database[collection].insert_many([
+                    {"id": str(uuid.uuid4()), **make(i), "created_at": now.isoformat(), "updated_at": now, "benchmark": True}
+                    for i in range(size)
+                ])
+
+            for collection, path in endpoints.items():
+                for encoding in ("identity", "gzip, br"):
+                    headers = {"Accept-Encoding": encoding}
+                    params = {"limit": size}
+                    self.timed_get(self.session, path, params=params, headers=headers)  # warm-up
+                    latencies = []
+                    payload = 0
+                    for _ in range(requests_per_endpoint):
+                        start = time.perf_counter()
+                        response = self.session.get(f"{BASE_URL}{path}", params=params, headers=headers, stream=True)
+                        raw = response.raw.read(decode_content=False)
+                        if response.status_code == 200:
+                            latencies.append((time.perf_counter() - start) * 1000)
+                            payload = len(raw)
+                    key = f"{path} [{encoding.split(',')[0]}]"
+                    results[key] = {"p50_ms": percentile(latencies, 50), "p95_ms": percentile(latencies, 95), "bytes": payload}
+                    print(f"  {key:<32} {describe(latencies)} size={payload / 1024:.0f}KiB")
+        finally:
+            for collection in seeds:
+                database[collection].delete_many({"benchmark": True})
+
+        if os.environ.get("BENCHMARK_RESULTS"):
+            with open(os.environ["BENCHMARK_RESULTS"], "w") as f:
+                json.dump(results, f, indent=2)
+        if os.environ.get("BENCHMARK_BASELINE"):
+            with open(os.environ["BENCHMARK_BASELINE"]) as f:
+                baseline = json.load(f)
+            print("  Change against baseline:")
+            for key, result in results.items():
+                before = baseline.get(key)
+                if before and before["p50_ms"]:
+                    print(
+                        f"  {key:<32} p50 {before['p50_ms']:.1f} -> {result['p50_ms']:.1f}ms "
+                        f"({(result['p50_ms'] / before['p50_ms'] - 1) * 100:+.0f}%), "
+                        f"size {before['bytes'] / 1024:.0f} -> {result['bytes'] / 1024:.0f}KiB"
+                    )
+
+    def run(self, scenarios):
+        print("🚀 HyperMaint GMAO Backend Benchmarks")
+        print(f"🔗 Target: {BASE_URL}")
+        print("=" * 60)
+
+        if not self.authenticate():
+            return False
+
+        available = {
+            "login_storm": self.bench_login_storm,
+            "dashboard_stats": self.bench_dashboard_stats,
+            "list_serialization": self.bench_list_serialization,
+        }
+        for name in scenarios or available.keys():
+            if name not in available:
+                print(f"❌ Unknown scenario: {name} (choices: {', '.join(available)})")
+                continue
+            available[name]()
+        return True
+
+
+if __name__ == "__main__":
+    benchmark = HyperMaintBenchmark()
+    success = benchmark.run(sys.argv[1:])
+    sys.exit(0 if success else 1)
@@ -0,0 +1,24 @@
+import React from 'react';
+import { Button } from './ui/button';
+import { Loader2 } from 'lucide-react';
+
+// "Load more" footer for the lists built with usePagedList
+const LoadMore = ({ list }) => {
+  if (!list.hasMore) return null;
+
+  return (
+    <div className="flex justify-center pt-4">
+      <Button
+        variant="outline"
+        onClick={list.loadMore}
+        disabled={list.loadingMore}
+        data-testid="load-more"
+      >
+        {list.loadingMore && <Loader2 className="w-4 h-4 mr-2 animate-spin" />}
+        Charger plus ({list.items.length} / {list.total})
+      </Button>
+    </div>
+  );
+};
+
+export default LoadMore;
@@ -35,6 +35,7 @@ export const AuthProvider = ({ children }) => {
         updatePermissionsFromRole(parsedUser.role);
       } catch (e) {
         localStorage.removeItem('token');
+        localStorage.removeItem('refreshToken');
         localStorage.removeItem('user');
       }
     }
@@ -56,9 +57,10 @@ export const AuthProvider = ({ children }) => {
 
   const login = async (email, password) => {
     const response = await authAPI.login({ email, password });
-    const { access_token, user: userData } = response.data;
+    const { access_token, refresh_token, user: userData } = response.data;
     
     localStorage.setItem('token', access_token);
+    localStorage.setItem('refreshToken', refresh_token);
     localStorage.setItem('user', JSON.stringify(userData));
     setUser(userData);
     updatePermissionsFromRole(userData.role);
@@ -74,9 +76,10 @@ export const AuthProvider = ({ children }) => {
       return { pending_approval: true, message: response.data.message };
     }
     
-    const { access_token, user: newUser } = response.data;
+    const { access_token, refresh_token, user: newUser } = response.data;
     
     localStorage.setItem('token', access_token);
+    localStorage.setItem('refreshToken', refresh_token);
     localStorage.setItem('user', JSON.stringify(newUser));
     setUser(newUser);
     updatePermissionsFromRole(newUser.role);
@@ -86,6 +89,7 @@ export const AuthProvider = ({ children }) => {
 
   const logout = () => {
     localStorage.removeItem('token');
+    localStorage.removeItem('refreshToken');
     localStorage.removeItem('user');
     setUser(null);
     setPermissions({
@@ -0,0 +1,77 @@
+import { useEffect, useRef, useState } from 'react';
+
+// Keyset-paginated list: reload() fetches the first page, further pages are
+// fetched on demand by following X-Next-Cursor.
+// `params` are the filters the list endpoint applies server-side; they are sent
+// with every page and the list reloads when they change. With `all` (a filter
+// the endpoint does not support, e.g. a free-text search, is set) every matching
+// page is loaded through fetchAll, so that the page's client-side filtering
+// covers the whole list rather than the rows loaded so far.
+export function usePagedList(fetchPage, fetchAll, { params = {}, all = false } = {}) {
+  const [items, setItems] = useState([]);
+  const [cursor, setCursor] = useState(null);
+  const [total, setTotal] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  // Bumped by every reload so that late responses for older filters are dropped
+  const generation = useRef(0);
+  const mounted = useRef(false);
+  const paramsKey = JSON.stringify(params);
+
+  const reload = async () => {
+    const current = ++generation.current;
+    const response = all ? await fetchAll(params) : await fetchPage(null, params);
+    if (current !== generation.current) return;
+    setItems(response.data || []);
+    setCursor(response.headers['x-next-cursor'] || null);
+    const count = response.headers['x-total-count'];
+    setTotal(count !== undefined ? Number(count) : null);
+  };
+
+  // The first load is made by the page's loadData, alongside its other requests
+  useEffect(() => {
+    if (!mounted.current) {
+      mounted.current = true;
+      return;
+    }
+    reload().catch((error) => console.error('Erreur chargement:', error));
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [paramsKey, all]);
+
+  const loadMore = async () => {
+    if (!cursor || loadingMore) return;
+    const current = generation.current;
+    setLoadingMore(true);
+    try {
+      const response = await fetchPage(cursor, params);
+      if (current !== generation.current) return;
+      setItems((previous) => {
+        const known = new Set(previous.map((item) => item.id));
+        return [...previous, ...(response.data || []).filter((item) => !known.has(item.id))];
+      });
+      setCursor(response.headers['x-next-cursor'] || null);
+    } catch (error) {
+      console.error('Erreur chargement:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  // Pages are ordered by creation: a record just created belongs to the last
+  // page, show it on top of the loaded rows until that page is reached
+  const showCreated = (item) => {
+    if (!item?.id) return;
+    setItems((previous) => (
+      previous.some((existing) => existing.id === item.id) ? previous : [item, ...previous]
+    ));
+  };
+
+  return {
+    items,
+    reload,
+    showCreated,
+    total: total ?? items.length,
+    hasMore: Boolean(cursor),
+    loadingMore,
+    loadMore
+  };
+}
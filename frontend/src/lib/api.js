@@ -18,31 +18,140 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+// Conditional GETs: remember the ETag and body of GET responses, send the ETag
+// back as If-None-Match and answer a 304 from the remembered body
+const MAX_ETAG_ENTRIES = 200;
+const etagCache = new Map();
+
+const etagKey = (config) => api.getUri(config);
+
+api.interceptors.request.use((config) => {
+  if (!config.method || config.method === 'get') {
+    const cached = etagCache.get(etagKey(config));
+    if (cached) {
+      config.headers['If-None-Match'] = cached.etag;
+    }
+    config.validateStatus = (status) => (status >= 200 && status < 300) || status === 304;
+  }
+  return config;
+});
+
+const revalidated = (response) => {
+  if (response.config.method !== 'get') {
+    return response;
+  }
+  const key = etagKey(response.config);
+  const cached = etagCache.get(key);
+  if (response.status === 304 && cached) {
+    return { ...response, status: 200, data: cached.data, headers: { ...cached.headers, ...response.headers } };
+  }
+  // Only JSON bodies are remembered: blobs (exports, PDFs, backups) would stay in memory
+  const isJson = (response.headers['content-type'] || '').startsWith('application/json');
+  const isBinary = ['blob', 'arraybuffer'].includes(response.config.responseType);
+  if (response.headers.etag && isJson && !isBinary) {
+    etagCache.delete(key);
+    etagCache.set(key, { etag: response.headers.etag, data: response.data, headers: { ...response.headers } });
+    if (etagCache.size > MAX_ETAG_ENTRIES) {
+      etagCache.delete(etagCache.keys().next().value);
+    }
+  }
+  return response;
+};
+
+const clearSession = () => {
+  etagCache.clear();
+  localStorage.removeItem('token');
+  localStorage.removeItem('refreshToken');
+  localStorage.removeItem('user');
+  window.location.href = '/login';
+};
+
+// Access tokens are short-lived: exchange the refresh token once (shared by
+// concurrent requests) and replay the failed request
+let refreshPromise = null;
+
+const refreshAccessToken = () => {
+  if (!refreshPromise) {
+    const refreshToken = localStorage.getItem('refreshToken');
+    refreshPromise = axios
+      .post(`${API_URL}/api/auth/refresh`, { refresh_token: refreshToken })
+      .then((response) => {
+        localStorage.setItem('token', response.data.access_token);
+        localStorage.setItem('refreshToken', response.data.refresh_token);
+        localStorage.setItem('user', JSON.stringify(response.data.user));
+        return response.data.access_token;
+      })
+      .finally(() => {
+        refreshPromise = null;
+      });
+  }
+  return refreshPromise;
+};
+
+// 401s from these mean bad credentials or a dead refresh token, not an expired access token
+const AUTH_CALLS = ['/auth/login', '/auth/register', '/auth/refresh'];
+
 // Handle auth errors
 api.interceptors.response.use(
-  (response) => response,
-  (error) => {
+  revalidated,
+  async (error) => {
+    const original = error.config;
     if (error.response?.status === 401) {
-      localStorage.removeItem('token');
-      localStorage.removeItem('user');
-      window.location.href = '/login';
+      const isAuthCall = AUTH_CALLS.includes(original?.url);
+      if (!isAuthCall && !original._retried && localStorage.getItem('refreshToken')) {
+        original._retried = true;
+        try {
+          const token = await refreshAccessToken();
+          original.headers.Authorization = `Bearer ${token}`;
+          return api(original);
+        } catch (refreshError) {
+          clearSession();
+          return Promise.reject(refreshError);
+        }
+      }
+      if (!isAuthCall) {
+        clearSession();
+      }
     }
     return Promise.reject(error);
   }
 );
 
+// List endpoints are keyset-paginated: follow X-Next-Cursor until the last
+// page and resolve with the concatenated items
+const getAllPages = async (url, params = {}) => {
+  const response = await api.get(url, { params });
+  const items = [...response.data];
+  let cursor = response.headers['x-next-cursor'];
+  while (cursor) {
+    const page = await api.get(url, { params: { ...params, cursor } });
+    items.push(...page.data);
+    cursor = page.headers['x-next-cursor'];
+  }
+  return { ...response, data: items };
+};
+
+// List pages load one page at a time: without a cursor this is the first page
+// (with its X-Total-Count), then the page after `cursor`
+const LIST_PAGE_SIZE = 50;
+
+const getPage = (url, cursor, params = {}) =>
+  api.get(url, { params: { ...params, limit: LIST_PAGE_SIZE, ...(cursor ? { cursor } : { count: true }) } });
+
 // Auth
 export const authAPI = {
   login: (credentials) => api.post('/auth/login', credentials),
   register: (userData) => api.post('/auth/register', userData),
   getMe: () => api.get('/auth/me'),
+  refresh: (refreshToken) => api.post('/auth/refresh', { refresh_token: refreshToken }),
 };
 
 // Users
 export const usersAPI = {
-  getAll: () => api.get('/users'),
+  getAll: () => getAllPages('/users'),
+  getPage: (cursor, params) => getPage('/users', cursor, params),
   getPending: () => api.get('/users/pending'),
-  getTechnicians: () => api.get('/users/technicians'),
+  getTechnicians: () => api.get('/users/technicians', { params: { fields: 'id,nom,prenom,role' } }),
   create: (userData) => api.post('/users/create', userData),
   updateRole: (userId, role) => api.put(`/users/${userId}/role?role=${role}`),
   approve: (userId) => api.put(`/users/${userId}/approve`),
@@ -66,7 +175,8 @@ export const caissonAPI = {
 
 // Equipments
 export const equipmentsAPI = {
-  getAll: (params) => api.get('/equipments', { params }),
+  getAll: (params) => getAllPages('/equipments', params),
+  getPage: (cursor, params) => getPage('/equipments', cursor, params),
   getById: (id) => api.get(`/equipments/${id}`),
   create: (data) => api.post('/equipments', data),
   update: (id, data) => api.put(`/equipments/${id}`, data),
@@ -101,7 +211,8 @@ export const equipmentTypesAPI = {
 
 // Sub-Equipments
 export const subEquipmentsAPI = {
-  getAll: (params) => api.get('/subequipments', { params }),
+  getAll: (params) => getAllPages('/subequipments', params),
+  getPage: (cursor, params) => getPage('/subequipments', cursor, params),
   getById: (id) => api.get(`/subequipments/${id}`),
   create: (data) => api.post('/subequipments', data),
   update: (id, data) => api.put(`/subequipments/${id}`, data),
@@ -126,7 +237,8 @@ export const subEquipmentsAPI = {
 
 // Work Orders
 export const workOrdersAPI = {
-  getAll: (params) => api.get('/work-orders', { params }),
+  getAll: (params) => getAllPages('/work-orders', params),
+  getPage: (cursor, params) => getPage('/work-orders', cursor, params),
   getById: (id) => api.get(`/work-orders/${id}`),
   create: (data) => api.post('/work-orders', data),
   update: (id, data) => api.put(`/work-orders/${id}`, data),
@@ -151,14 +263,16 @@ export const workOrdersAPI = {
 
 // Interventions
 export const interventionsAPI = {
-  getAll: (params) => api.get('/interventions', { params }),
+  getAll: (params) => getAllPages('/interventions', params),
+  getPage: (cursor, params) => getPage('/interventions', cursor, params),
   getById: (id) => api.get(`/interventions/${id}`),
   create: (data) => api.post('/interventions', data),
 };
 
 // Inspections
 export const inspectionsAPI = {
-  getAll: () => api.get('/inspections'),
+  getAll: () => getAllPages('/inspections'),
+  getPage: (cursor, params) => getPage('/inspections', cursor, params),
   getById: (id) => api.get(`/inspections/${id}`),
   create: (data) => api.post('/inspections', data),
   update: (id, data) => api.put(`/inspections/${id}`, data),
@@ -167,7 +281,8 @@ export const inspectionsAPI = {
 
 // Spare Parts
 export const sparePartsAPI = {
-  getAll: (params) => api.get('/spare-parts', { params }),
+  getAll: (params) => getAllPages('/spare-parts', params),
+  getPage: (cursor, params) => getPage('/spare-parts', cursor, params),
   getById: (id) => api.get(`/spare-parts/${id}`),
   create: (data) => api.post('/spare-parts', data),
   update: (id, data) => api.put(`/spare-parts/${id}`, data),
@@ -193,9 +308,15 @@ export const sparePartsAPI = {
 // Dashboard
 export const dashboardAPI = {
   getStats: () => api.get('/dashboard/stats'),
-  getAlerts: () => api.get('/dashboard/alerts'),
-  getUpcomingMaintenance: () => api.get('/dashboard/upcoming-maintenance'),
-  getCalendar: () => api.get('/dashboard/calendar'),
+  getAlerts: () => getAllPages('/dashboard/alerts'),
+  getUpcomingMaintenance: (params) => api.get('/dashboard/upcoming-maintenance', { params }),
+  getCalendar: (params) => api.get('/dashboard/calendar', { params }),
+  getSummary: (include) => api.get('/dashboard/summary', { params: include ? { include } : {} }),
+};
+
+// Search
+export const searchAPI = {
+  search: (q, params) => api.get('/search', { params: { q, ...params } }),
 };
 
 // Alerts / Notifications
@@ -208,7 +329,44 @@ export const alertsAPI = {
 export const exportAPI = {
   csv: (collection) => api.get(`/export/csv/${collection}`, { responseType: 'blob' }),
   sql: () => api.get('/export/sql', { responseType: 'blob' }),
+  sqlite: () => api.get('/export/sql', { params: { format: 'sqlite' }, responseType: 'blob' }),
   json: () => api.get('/export/json', { responseType: 'blob' }),
+  ndjson: () => api.get('/export/ndjson', { responseType: 'blob' }),
+  parquet: (dataset, format = 'parquet') => api.get(`/export/parquet/${dataset}`, { params: { format }, responseType: 'blob' }),
+};
+
+// Background export jobs: the file is built server-side, polled, then downloaded
+export const exportJobsAPI = {
+  create: (kind, params = {}) => api.post('/exports', { kind, params }),
+  get: (id) => api.get(`/exports/${id}`),
+  list: () => api.get('/exports'),
+  download: (id) => api.get(`/exports/${id}/download`, { responseType: 'blob' }),
+};
+
+export const runExportJob = async (kind, params = {}, onProgress) => {
+  let { data: job } = await exportJobsAPI.create(kind, params);
+  while (job.status === 'queued' || job.status === 'running') {
+    if (onProgress) onProgress(job.progress);
+    await new Promise((resolve) => setTimeout(resolve, 1000));
+    ({ data: job } = await exportJobsAPI.get(job.id));
+  }
+  if (job.status !== 'done') {
+    throw new Error(job.error || 'Export échoué');
+  }
+  return exportJobsAPI.download(job.id);
+};
+
+// Full backup (admin): every collection plus the uploaded files, as a zip
+export const backupAPI = {
+  download: (onProgress) => runExportJob('backup', {}, onProgress),
+  restore: (file, replace = false) => {
+    const formData = new FormData();
+    formData.append('archive', file);
+    return api.post('/admin/restore', formData, {
+      params: { replace },
+      headers: { 'Content-Type': 'multipart/form-data' }
+    });
+  },
 };
 
 // Reports
@@ -228,22 +386,22 @@ export const reportsAPI = {
   getStatistics: () => api.get('/reports/statistics'),
   exportStatisticsCSV: () => api.get('/reports/statistics/csv', { responseType: 'blob' }),
   
-  // PDF Reports
-  statisticsPDF: () => api.get('/reports/pdf/statistics', { responseType: 'blob' }),
+  // PDF Reports (built by background export jobs)
+  statisticsPDF: () => runExportJob('pdf_statistics'),
   maintenancePDF: (startDate, endDate) => {
     const params = {};
     if (startDate) params.start_date = startDate;
     if (endDate) params.end_date = endDate;
-    return api.get('/reports/pdf/maintenance', { params, responseType: 'blob' });
+    return runExportJob('pdf_maintenance', params);
   },
-  equipmentPDF: (equipmentId) => api.get(`/reports/pdf/equipment/${equipmentId}`, { responseType: 'blob' }),
+  equipmentPDF: (equipmentId) => runExportJob('pdf_equipment', { equipment_id: equipmentId }),
   interventionsPDF: (startDate, endDate) => {
     const params = {};
     if (startDate) params.start_date = startDate;
     if (endDate) params.end_date = endDate;
-    return api.get('/reports/pdf/interventions', { params, responseType: 'blob' });
+    return runExportJob('pdf_interventions', params);
   },
-  planningPDF: () => api.get('/reports/pdf/planning', { responseType: 'blob' }),
+  planningPDF: () => runExportJob('pdf_planning'),
 };
 
 export default api;
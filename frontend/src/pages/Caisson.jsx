@@ -53,7 +53,7 @@ const Caisson = () => {
     try {
       const [caissonRes, equipmentsRes] = await Promise.all([
         caissonAPI.get(),
-        equipmentsAPI.getAll()
+        equipmentsAPI.getAll({ fields: 'id,type,reference,statut' })
       ]);
       
       if (caissonRes.data) {
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
-import { dashboardAPI, caissonAPI, alertsAPI } from '../lib/api';
+import { dashboardAPI, alertsAPI } from '../lib/api';
 import { formatDate, daysUntil } from '../lib/utils';
 import { useAuth } from '../context/AuthContext';
 import { Card, CardContent, CardHeader, CardTitle } from '../components/ui/card';
@@ -76,20 +76,13 @@ const Dashboard = () => {
 
   const loadDashboardData = async () => {
     try {
-      const [statsRes, alertsRes, upcomingRes, caissonRes, calendarRes] = await Promise.all([
-        dashboardAPI.getStats(),
-        dashboardAPI.getAlerts(),
-        dashboardAPI.getUpcomingMaintenance(),
-        caissonAPI.get(),
-        dashboardAPI.getCalendar()
-      ]);
+      const { data } = await dashboardAPI.getSummary();
       
-      setStats(statsRes.data);
-      setAlerts(alertsRes.data);
-      setUpcoming(upcomingRes.data);
-      setCaisson(caissonRes.data);
-      setCalendar(calendarRes.data || []);
-      setCaisson(caissonRes.data);
+      setStats(data.stats);
+      setAlerts(data.alerts);
+      setUpcoming(data.upcoming);
+      setCaisson(data.caisson);
+      setCalendar(data.calendar || []);
     } catch (error) {
       console.error('Erreur chargement dashboard:', error);
     } finally {
@@ -1,6 +1,8 @@
 import React, { useState, useEffect } from 'react';
 import { equipmentsAPI, caissonAPI, equipmentTypesAPI } from '../lib/api';
 import { useAuth } from '../context/AuthContext';
+import { usePagedList } from '../hooks/use-paged-list';
+import LoadMore from '../components/LoadMore';
 import { 
   formatDate, 
   statusLabels, 
@@ -77,7 +79,6 @@ const CRITICITES = ['critique', 'haute', 'normale', 'basse'];
 
 const Equipments = () => {
   const { canCreate, canModify, canDelete } = useAuth();
-  const [equipments, setEquipments] = useState([]);
   const [equipmentTypes, setEquipmentTypes] = useState([]);
   const [caisson, setCaisson] = useState(null);
   const [loading, setLoading] = useState(true);
@@ -85,6 +86,16 @@ const Equipments = () => {
   const [filterType, setFilterType] = useState('all');
   const [filterStatut, setFilterStatut] = useState('all');
   const [filterCriticite, setFilterCriticite] = useState('all');
+  // The selects are filtered by the API; the search term needs every matching equipment loaded
+  const equipmentsList = usePagedList(equipmentsAPI.getPage, equipmentsAPI.getAll, {
+    params: {
+      ...(filterType !== 'all' && { type: filterType }),
+      ...(filterStatut !== 'all' && { statut: filterStatut }),
+      ...(filterCriticite !== 'all' && { criticite: filterCriticite })
+    },
+    all: Boolean(searchTerm)
+  });
+  const equipments = equipmentsList.items;
   
   const [showModal, setShowModal] = useState(false);
   const [showDetailModal, setShowDetailModal] = useState(false);
@@ -112,12 +123,11 @@ const Equipments = () => {
 
   const loadData = async () => {
     try {
-      const [equipmentsRes, caissonRes, typesRes] = await Promise.all([
-        equipmentsAPI.getAll(),
+      const [, caissonRes, typesRes] = await Promise.all([
+        equipmentsList.reload(),
         caissonAPI.get(),
         equipmentTypesAPI.getAll()
       ]);
-      setEquipments(equipmentsRes.data || []);
       setCaisson(caissonRes.data);
       setEquipmentTypes(typesRes.data || []);
     } catch (error) {
@@ -216,13 +226,15 @@ const Equipments = () => {
         description: formData.description || null
       };
       
+      let created = null;
       if (selectedEquipment) {
         await equipmentsAPI.update(selectedEquipment.id, data);
       } else {
-        await equipmentsAPI.create(data);
+        created = (await equipmentsAPI.create(data)).data;
       }
       
       await loadData();
+      if (created) equipmentsList.showCreated(created);
       setShowModal(false);
     } catch (error) {
       console.error('Erreur sauvegarde:', error);
@@ -345,7 +357,7 @@ const Equipments = () => {
             Équipements
           </h1>
           <p className="text-slate-500 mt-1">
-            {equipments.length} équipement(s) enregistré(s)
+            {equipmentsList.total} équipement(s) enregistré(s)
           </p>
         </div>
         {canCreate() && (
@@ -533,6 +545,7 @@ const Equipments = () => {
               </TableBody>
             </Table>
           </div>
+          <LoadMore list={equipmentsList} />
         </CardContent>
       </Card>
 
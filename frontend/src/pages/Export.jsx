@@ -1,5 +1,6 @@
 import React, { useState } from 'react';
-import { exportAPI } from '../lib/api';
+import { runExportJob, backupAPI } from '../lib/api';
+import { useAuth } from '../context/AuthContext';
 import { downloadBlob } from '../lib/utils';
 import { Card, CardContent, CardHeader, CardTitle, CardDescription } from '../components/ui/card';
 import { Button } from '../components/ui/button';
@@ -9,19 +10,21 @@ import {
   Database,
   FileJson,
   Loader2,
-  CheckCircle2
+  CheckCircle2,
+  Archive
 } from 'lucide-react';
 
 const Export = () => {
   const [exporting, setExporting] = useState({});
   const [success, setSuccess] = useState({});
+  const { user } = useAuth();
 
   const handleExportCSV = async (collection, label) => {
     setExporting({ ...exporting, [collection]: true });
     setSuccess({ ...success, [collection]: false });
     
     try {
-      const response = await exportAPI.csv(collection);
+      const response = await runExportJob('csv', { collection });
       downloadBlob(response.data, `${collection}.csv`);
       setSuccess({ ...success, [collection]: true });
       setTimeout(() => setSuccess({ ...success, [collection]: false }), 3000);
@@ -33,37 +36,72 @@ const Export = () => {
     }
   };
 
-  const handleExportSQL = async () => {
-    setExporting({ ...exporting, sql: true });
-    setSuccess({ ...success, sql: false });
+  const handleExportParquet = async (dataset) => {
+    const key = `parquet-${dataset}`;
+    setExporting({ ...exporting, [key]: true });
+    setSuccess({ ...success, [key]: false });
     
     try {
-      const response = await exportAPI.sql();
-      downloadBlob(response.data, 'hyperbaremanager_export.sql');
-      setSuccess({ ...success, sql: true });
-      setTimeout(() => setSuccess({ ...success, sql: false }), 3000);
+      const response = await runExportJob('parquet', { dataset });
+      downloadBlob(response.data, `${dataset}.parquet`);
+      setSuccess({ ...success, [key]: true });
+      setTimeout(() => setSuccess({ ...success, [key]: false }), 3000);
+    } catch (error) {
+      console.error('Erreur export Parquet:', error);
+      alert('Erreur lors de l\'export Parquet');
+    } finally {
+      setExporting({ ...exporting, [key]: false });
+    }
+  };
+
+  const handleExportSQL = async (format = 'sql') => {
+    setExporting({ ...exporting, [format]: true });
+    setSuccess({ ...success, [format]: false });
+    
+    try {
+      const response = await runExportJob('sql', { format });
+      downloadBlob(response.data, `hyperbaremanager_export.${format}`);
+      setSuccess({ ...success, [format]: true });
+      setTimeout(() => setSuccess({ ...success, [format]: false }), 3000);
     } catch (error) {
       console.error('Erreur export SQL:', error);
       alert('Erreur lors de l\'export SQL');
     } finally {
-      setExporting({ ...exporting, sql: false });
+      setExporting({ ...exporting, [format]: false });
     }
   };
 
-  const handleExportJSON = async () => {
-    setExporting({ ...exporting, json: true });
-    setSuccess({ ...success, json: false });
+  const handleExportJSON = async (format = 'json') => {
+    setExporting({ ...exporting, [format]: true });
+    setSuccess({ ...success, [format]: false });
     
     try {
-      const response = await exportAPI.json();
-      downloadBlob(response.data, 'hyperbaremanager_export.json');
-      setSuccess({ ...success, json: true });
-      setTimeout(() => setSuccess({ ...success, json: false }), 3000);
+      const response = await runExportJob(format);
+      downloadBlob(response.data, `hyperbaremanager_export.${format}`);
+      setSuccess({ ...success, [format]: true });
+      setTimeout(() => setSuccess({ ...success, [format]: false }), 3000);
     } catch (error) {
       console.error('Erreur export JSON:', error);
       alert('Erreur lors de l\'export JSON');
     } finally {
-      setExporting({ ...exporting, json: false });
+      setExporting({ ...exporting, [format]: false });
+    }
+  };
+
+  const handleBackup = async () => {
+    setExporting({ ...exporting, backup: true });
+    setSuccess({ ...success, backup: false });
+    
+    try {
+      const response = await backupAPI.download();
+      downloadBlob(response.data, `hyperbaremanager_backup_${new Date().toISOString().slice(0, 10)}.zip`);
+      setSuccess({ ...success, backup: true });
+      setTimeout(() => setSuccess({ ...success, backup: false }), 3000);
+    } catch (error) {
+      console.error('Erreur sauvegarde:', error);
+      alert('Erreur lors de la sauvegarde');
+    } finally {
+      setExporting({ ...exporting, backup: false });
     }
   };
 
@@ -75,6 +113,13 @@ const Export = () => {
     { collection: 'spare_parts', label: 'Pièces détachées' }
   ];
 
+  const parquetExports = [
+    { dataset: 'interventions', label: 'Interventions' },
+    { dataset: 'work_orders', label: 'Ordres de travail' },
+    { dataset: 'spare_parts', label: 'Pièces détachées' },
+    { dataset: 'historique_compteur', label: 'Relevés compteurs horaires' }
+  ];
+
   return (
     <div className="space-y-6" data-testid="export-page">
       {/* Header */}
@@ -129,6 +174,48 @@ const Export = () => {
         </CardContent>
       </Card>
 
+      {/* Parquet Exports */}
+      <Card>
+        <CardHeader>
+          <CardTitle className="font-['Barlow_Condensed'] uppercase flex items-center gap-2">
+            <Database className="w-5 h-5 text-[#005F73]" />
+            Export Parquet
+          </CardTitle>
+          <CardDescription>
+            Format colonnes typé (dates, nombres) pour l'analyse avec pandas, DuckDB ou Power BI
+          </CardDescription>
+        </CardHeader>
+        <CardContent>
+          <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-4">
+            {parquetExports.map(({ dataset, label }) => (
+              <Card key={dataset} className="border border-slate-200">
+                <CardContent className="p-4 flex items-center justify-between">
+                  <span className="font-medium">{label}</span>
+                  <Button 
+                    variant="outline" 
+                    size="sm"
+                    onClick={() => handleExportParquet(dataset)}
+                    disabled={exporting[`parquet-${dataset}`]}
+                    data-testid={`export-parquet-${dataset}`}
+                  >
+                    {exporting[`parquet-${dataset}`] ? (
+                      <Loader2 className="w-4 h-4 animate-spin" />
+                    ) : success[`parquet-${dataset}`] ? (
+                      <CheckCircle2 className="w-4 h-4 text-green-600" />
+                    ) : (
+                      <>
+                        <Download className="w-4 h-4 mr-2" />
+                        Parquet
+                      </>
+                    )}
+                  </Button>
+                </CardContent>
+              </Card>
+            ))}
+          </div>
+        </CardContent>
+      </Card>
+
       {/* Full Exports */}
       <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
         {/* SQL Export */}
@@ -145,7 +232,7 @@ const Export = () => {
           </CardHeader>
           <CardContent>
             <Button 
-              onClick={handleExportSQL}
+              onClick={() => handleExportSQL('sql')}
               disabled={exporting.sql}
               className="w-full bg-[#005F73] hover:bg-[#004C5C]"
               data-testid="export-sql"
@@ -167,6 +254,30 @@ const Export = () => {
                 </>
               )}
             </Button>
+            <Button 
+              variant="outline"
+              onClick={() => handleExportSQL('sqlite')}
+              disabled={exporting.sqlite}
+              className="w-full mt-2"
+              data-testid="export-sqlite"
+            >
+              {exporting.sqlite ? (
+                <>
+                  <Loader2 className="w-4 h-4 mr-2 animate-spin" />
+                  Export en cours...
+                </>
+              ) : success.sqlite ? (
+                <>
+                  <CheckCircle2 className="w-4 h-4 mr-2" />
+                  Téléchargé !
+                </>
+              ) : (
+                <>
+                  <Download className="w-4 h-4 mr-2" />
+                  Base SQLite prête à l'emploi
+                </>
+              )}
+            </Button>
           </CardContent>
         </Card>
 
@@ -184,7 +295,7 @@ const Export = () => {
           </CardHeader>
           <CardContent>
             <Button 
-              onClick={handleExportJSON}
+              onClick={() => handleExportJSON('json')}
               disabled={exporting.json}
               className="w-full bg-[#005F73] hover:bg-[#004C5C]"
               data-testid="export-json"
@@ -206,21 +317,89 @@ const Export = () => {
                 </>
               )}
             </Button>
+            <Button 
+              variant="outline"
+              onClick={() => handleExportJSON('ndjson')}
+              disabled={exporting.ndjson}
+              className="w-full mt-2"
+              data-testid="export-ndjson"
+            >
+              {exporting.ndjson ? (
+                <>
+                  <Loader2 className="w-4 h-4 mr-2 animate-spin" />
+                  Export en cours...
+                </>
+              ) : success.ndjson ? (
+                <>
+                  <CheckCircle2 className="w-4 h-4 mr-2" />
+                  Téléchargé !
+                </>
+              ) : (
+                <>
+                  <Download className="w-4 h-4 mr-2" />
+                  Format NDJSON (un enregistrement par ligne)
+                </>
+              )}
+            </Button>
           </CardContent>
         </Card>
       </div>
 
+      {/* Full backup (admin) */}
+      {user?.role === 'admin' && (
+        <Card>
+          <CardHeader>
+            <CardTitle className="font-['Barlow_Condensed'] uppercase flex items-center gap-2">
+              <Archive className="w-5 h-5 text-[#005F73]" />
+              Sauvegarde complète
+            </CardTitle>
+            <CardDescription>
+              Archive ZIP de toutes les collections (utilisateurs compris) et des fichiers joints.
+              Restauration via POST /api/admin/restore ou le script backend/restore_backup.py.
+            </CardDescription>
+          </CardHeader>
+          <CardContent>
+            <Button 
+              onClick={handleBackup}
+              disabled={exporting.backup}
+              className="w-full md:w-auto bg-[#005F73] hover:bg-[#004C5C]"
+              data-testid="export-backup"
+            >
+              {exporting.backup ? (
+                <>
+                  <Loader2 className="w-4 h-4 mr-2 animate-spin" />
+                  Sauvegarde en cours...
+                </>
+              ) : success.backup ? (
+                <>
+                  <CheckCircle2 className="w-4 h-4 mr-2" />
+                  Téléchargé !
+                </>
+              ) : (
+                <>
+                  <Download className="w-4 h-4 mr-2" />
+                  Télécharger la sauvegarde
+                </>
+              )}
+            </Button>
+          </CardContent>
+        </Card>
+      )}
+
       {/* Info */}
       <Card className="bg-slate-50 border-slate-200">
         <CardContent className="p-6">
           <h3 className="font-semibold mb-2">À propos des exports</h3>
           <ul className="text-sm text-slate-600 space-y-1 list-disc list-inside">
             <li><strong>CSV</strong> : Format tableur compatible avec Excel, LibreOffice, Google Sheets</li>
-            <li><strong>SQL</strong> : Instructions SQL pour recréer les tables et insérer les données</li>
+            <li><strong>SQL</strong> : Instructions SQL pour recréer les tables et insérer les données (ou base SQLite directement exploitable)</li>
             <li><strong>JSON</strong> : Format structuré pour l'intégration API et développement</li>
+            <li><strong>Parquet</strong> : Colonnes typées et compressées, chargement direct dans les outils d'analyse</li>
+            <li><strong>NDJSON</strong> : Un enregistrement JSON par ligne, avec sa collection dans <code>_collection</code>, pour un traitement au fil de l'eau</li>
           </ul>
           <p className="text-sm text-slate-500 mt-4">
             Les exports incluent toutes les données sans les informations sensibles (mots de passe).
+            La sauvegarde complète, réservée aux administrateurs, contient les comptes utilisateurs pour permettre la restauration.
           </p>
         </CardContent>
       </Card>
@@ -1,6 +1,8 @@
 import React, { useState, useEffect } from 'react';
 import { inspectionsAPI, caissonAPI, equipmentsAPI } from '../lib/api';
 import { useAuth } from '../context/AuthContext';
+import { usePagedList } from '../hooks/use-paged-list';
+import LoadMore from '../components/LoadMore';
 import { formatDate, daysUntil, equipmentTypeLabels, periodiciteLabels, getErrorMessage } from '../lib/utils';
 import { Card, CardContent, CardHeader, CardTitle } from '../components/ui/card';
 import { Badge } from '../components/ui/badge';
@@ -66,7 +68,9 @@ const PERIODICITES = ['hebdomadaire', 'mensuel', 'trimestriel', 'semestriel', 'a
 
 const Inspections = () => {
   const { canCreate, canModify, canDelete } = useAuth();
-  const [inspections, setInspections] = useState([]);
+  // Sorted by expiry date and counted for the expiry stats: the page needs every inspection
+  const inspectionsList = usePagedList(inspectionsAPI.getPage, inspectionsAPI.getAll, { all: true });
+  const inspections = inspectionsList.items;
   const [caisson, setCaisson] = useState(null);
   const [equipments, setEquipments] = useState([]);
   const [loading, setLoading] = useState(true);
@@ -96,12 +100,11 @@ const Inspections = () => {
 
   const loadData = async () => {
     try {
-      const [inspectionsRes, caissonRes, equipmentsRes] = await Promise.all([
-        inspectionsAPI.getAll(),
+      const [, caissonRes, equipmentsRes] = await Promise.all([
+        inspectionsList.reload(),
         caissonAPI.get(),
-        equipmentsAPI.getAll()
+        equipmentsAPI.getAll({ fields: 'id,type,reference' })
       ]);
-      setInspections(inspectionsRes.data || []);
       setCaisson(caissonRes.data);
       setEquipments(equipmentsRes.data || []);
     } catch (error) {
@@ -408,6 +411,7 @@ const Inspections = () => {
               </TableBody>
             </Table>
           </div>
+          <LoadMore list={inspectionsList} />
         </CardContent>
       </Card>
 
@@ -1,6 +1,8 @@
 import React, { useState, useEffect } from 'react';
 import { interventionsAPI, workOrdersAPI, sparePartsAPI, usersAPI, equipmentsAPI } from '../lib/api';
 import { useAuth } from '../context/AuthContext';
+import { usePagedList } from '../hooks/use-paged-list';
+import LoadMore from '../components/LoadMore';
 import { formatDate } from '../lib/utils';
 import { Card, CardContent } from '../components/ui/card';
 import { Badge } from '../components/ui/badge';
@@ -16,7 +18,6 @@ import { History, Plus, Search, Eye, Loader2, Clock, User, Package, Wrench, Acti
 
 function Interventions() {
   const [data, setData] = useState({
-    interventions: [],
     workOrders: [],
     spareParts: [],
     technicians: [],
@@ -24,6 +25,8 @@ function Interventions() {
   });
   const [loading, setLoading] = useState(true);
   const [searchTerm, setSearchTerm] = useState('');
+  // The search term needs every intervention loaded
+  const interventionsList = usePagedList(interventionsAPI.getPage, interventionsAPI.getAll, { all: Boolean(searchTerm) });
   const [showModal, setShowModal] = useState(false);
   const [showDetailModal, setShowDetailModal] = useState(false);
   const [selectedItem, setSelectedItem] = useState(null);
@@ -51,15 +54,14 @@ function Interventions() {
 
   async function loadData() {
     try {
-      const [r1, r2, r3, r4, r5] = await Promise.all([
-        interventionsAPI.getAll(),
-        workOrdersAPI.getAll(),
-        sparePartsAPI.getAll(),
+      const [, r2, r3, r4, r5] = await Promise.all([
+        interventionsList.reload(),
+        workOrdersAPI.getAll({ fields: 'id,titre,type_maintenance,statut,equipment_id,periodicite_heures,periodicite_jours' }),
+        sparePartsAPI.getAll({ fields: 'id,nom,quantite_stock' }),
         usersAPI.getTechnicians(),
-        equipmentsAPI.getAll()
+        equipmentsAPI.getAll({ fields: 'id,type,reference,compteur_horaire' })
       ]);
       setData({
-        interventions: r1.data || [],
         workOrders: r2.data || [],
         spareParts: r3.data || [],
         technicians: r4.data || [],
@@ -144,8 +146,9 @@ function Interventions() {
           quantite: p.quantite
         }))
       };
-      await interventionsAPI.create(payload);
+      const created = await interventionsAPI.create(payload);
       await loadData();
+      interventionsList.showCreated(created.data);
       setShowModal(false);
     } catch (e) {
       alert(e.response?.data?.detail || 'Erreur');
@@ -163,7 +166,7 @@ function Interventions() {
     return wo ? wo.titre : '-';
   }
   
-  const filtered = data.interventions.filter(i => {
+  const filtered = interventionsList.items.filter(i => {
     const term = searchTerm.toLowerCase();
     return i.technicien.toLowerCase().includes(term) || 
            i.actions_realisees.toLowerCase().includes(term) ||
@@ -182,7 +185,7 @@ function Interventions() {
           <h1 className="text-3xl font-bold font-['Barlow_Condensed'] uppercase tracking-tight text-slate-900">
             Historique des interventions
           </h1>
-          <p className="text-slate-500 mt-1">{data.interventions.length} intervention(s)</p>
+          <p className="text-slate-500 mt-1">{interventionsList.total} intervention(s)</p>
         </div>
         <Button 
           onClick={() => { setFormData(emptyForm); setShowCustomTechnicien(false); setShowModal(true); }}
@@ -244,6 +247,7 @@ function Interventions() {
               ))}
             </TableBody>
           </Table>
+          <LoadMore list={interventionsList} />
         </CardContent>
       </Card>
 
@@ -31,7 +31,7 @@ const Reports = () => {
 
   const loadEquipments = async () => {
     try {
-      const res = await equipmentsAPI.getAll();
+      const res = await equipmentsAPI.getAll({ fields: 'id,type,reference' });
       setEquipments(res.data || []);
     } catch (error) {
       console.error('Error loading equipments:', error);
@@ -1,6 +1,8 @@
 import React, { useState, useEffect } from 'react';
-import { sparePartsAPI, equipmentTypesAPI } from '../lib/api';
+import { sparePartsAPI, equipmentTypesAPI, dashboardAPI } from '../lib/api';
 import { useAuth } from '../context/AuthContext';
+import { usePagedList } from '../hooks/use-paged-list';
+import LoadMore from '../components/LoadMore';
 import { getErrorMessage } from '../lib/utils';
 import { Card, CardContent, CardHeader, CardTitle } from '../components/ui/card';
 import { Badge } from '../components/ui/badge';
@@ -66,12 +68,21 @@ import {
 
 const SpareParts = () => {
   const { canCreate, canModify, canDelete } = useAuth();
-  const [spareParts, setSpareParts] = useState([]);
   const [equipmentTypes, setEquipmentTypes] = useState([]);
   const [loading, setLoading] = useState(true);
   const [searchTerm, setSearchTerm] = useState('');
   const [filterType, setFilterType] = useState('all');
   const [showLowStock, setShowLowStock] = useState(false);
+  const [lowStockCount, setLowStockCount] = useState(0);
+  // Type and low stock are filtered by the API; the search term needs every matching part loaded
+  const sparePartsList = usePagedList(sparePartsAPI.getPage, sparePartsAPI.getAll, {
+    params: {
+      ...(filterType !== 'all' && { equipment_type: filterType }),
+      ...(showLowStock && { low_stock: true })
+    },
+    all: Boolean(searchTerm)
+  });
+  const spareParts = sparePartsList.items;
   
   const [showModal, setShowModal] = useState(false);
   const [showDeleteDialog, setShowDeleteDialog] = useState(false);
@@ -102,11 +113,12 @@ const SpareParts = () => {
 
   const loadData = async () => {
     try {
-      const [partsRes, typesRes] = await Promise.all([
-        sparePartsAPI.getAll(),
-        equipmentTypesAPI.getAll()
+      const [, typesRes, statsRes] = await Promise.all([
+        sparePartsList.reload(),
+        equipmentTypesAPI.getAll(),
+        dashboardAPI.getStats()
       ]);
-      setSpareParts(partsRes.data || []);
+      setLowStockCount(statsRes.data.low_stock_count || 0);
       setEquipmentTypes(typesRes.data || []);
     } catch (error) {
       console.error('Erreur chargement:', error);
@@ -179,13 +191,15 @@ const SpareParts = () => {
         prix_unitaire: formData.prix_unitaire ? parseFloat(formData.prix_unitaire) : null
       };
       
+      let created = null;
       if (selectedPart) {
         await sparePartsAPI.update(selectedPart.id, data);
       } else {
-        await sparePartsAPI.create(data);
+        created = (await sparePartsAPI.create(data)).data;
       }
       
       await loadData();
+      if (created) sparePartsList.showCreated(created);
       setShowModal(false);
     } catch (error) {
       console.error('Erreur sauvegarde:', error);
@@ -303,8 +317,6 @@ const SpareParts = () => {
     return matchesSearch && matchesType && matchesLowStock;
   });
 
-  const lowStockCount = spareParts.filter(isLowStock).length;
-
   if (loading) {
     return (
       <div className="space-y-6" data-testid="spare-parts-loading">
@@ -323,7 +335,7 @@ const SpareParts = () => {
             Stock de pièces
           </h1>
           <p className="text-slate-500 mt-1">
-            {spareParts.length} référence(s) en stock
+            {sparePartsList.total} référence(s) en stock
           </p>
         </div>
         <Button 
@@ -494,6 +506,7 @@ const SpareParts = () => {
               </TableBody>
             </Table>
           </div>
+          <LoadMore list={sparePartsList} />
         </CardContent>
       </Card>
 
@@ -1,6 +1,8 @@
 import React, { useState, useEffect } from 'react';
 import { subEquipmentsAPI, equipmentsAPI } from '../lib/api';
 import { useAuth } from '../context/AuthContext';
+import { usePagedList } from '../hooks/use-paged-list';
+import LoadMore from '../components/LoadMore';
 import { formatDate, statusLabels, getStatusClass } from '../lib/utils';
 import { Card, CardContent, CardHeader, CardTitle } from '../components/ui/card';
 import { Badge } from '../components/ui/badge';
@@ -59,11 +61,16 @@ const STATUTS = ['en_service', 'maintenance', 'hors_service'];
 
 const SubEquipments = () => {
   const { canCreate, canModify, canDelete } = useAuth();
-  const [subEquipments, setSubEquipments] = useState([]);
   const [equipments, setEquipments] = useState([]);
   const [loading, setLoading] = useState(true);
   const [searchTerm, setSearchTerm] = useState('');
   const [filterParent, setFilterParent] = useState('all');
+  // The parent is filtered by the API; the search term needs every matching sub-equipment loaded
+  const subEquipmentsList = usePagedList(subEquipmentsAPI.getPage, subEquipmentsAPI.getAll, {
+    params: filterParent !== 'all' ? { parent_equipment_id: filterParent } : {},
+    all: Boolean(searchTerm)
+  });
+  const subEquipments = subEquipmentsList.items;
   
   const [showModal, setShowModal] = useState(false);
   const [showDetailModal, setShowDetailModal] = useState(false);
@@ -90,11 +97,10 @@ const SubEquipments = () => {
 
   const loadData = async () => {
     try {
-      const [subRes, eqRes] = await Promise.all([
-        subEquipmentsAPI.getAll(),
-        equipmentsAPI.getAll()
+      const [, eqRes] = await Promise.all([
+        subEquipmentsList.reload(),
+        equipmentsAPI.getAll({ fields: 'id,type,reference' })
       ]);
-      setSubEquipments(subRes.data || []);
       setEquipments(eqRes.data || []);
     } catch (error) {
       console.error('Erreur chargement:', error);
@@ -152,12 +158,14 @@ const SubEquipments = () => {
     
     setSaving(true);
     try {
+      let created = null;
       if (selectedItem) {
         await subEquipmentsAPI.update(selectedItem.id, formData);
       } else {
-        await subEquipmentsAPI.create(formData);
+        created = (await subEquipmentsAPI.create(formData)).data;
       }
       await loadData();
+      if (created) subEquipmentsList.showCreated(created);
       setShowModal(false);
     } catch (error) {
       alert(error.response?.data?.detail || 'Erreur lors de la sauvegarde');
@@ -376,6 +384,7 @@ const SubEquipments = () => {
               )}
             </TableBody>
           </Table>
+          <LoadMore list={subEquipmentsList} />
         </CardContent>
       </Card>
 
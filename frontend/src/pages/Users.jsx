@@ -1,6 +1,8 @@
 import React, { useState, useEffect } from 'react';
 import { usersAPI, reportsAPI } from '../lib/api';
 import { useAuth } from '../context/AuthContext';
+import { usePagedList } from '../hooks/use-paged-list';
+import LoadMore from '../components/LoadMore';
 import { getErrorMessage } from '../lib/utils';
 import { Card, CardContent, CardHeader, CardTitle } from '../components/ui/card';
 import { Badge } from '../components/ui/badge';
@@ -74,7 +76,6 @@ const API_URL = process.env.REACT_APP_BACKEND_URL;
 
 const UsersPage = () => {
   const { user: currentUser, getRoleLabel } = useAuth();
-  const [users, setUsers] = useState([]);
   const [pendingUsers, setPendingUsers] = useState([]);
   const [loading, setLoading] = useState(true);
   const [searchTerm, setSearchTerm] = useState('');
@@ -84,6 +85,9 @@ const UsersPage = () => {
   const [selectedUser, setSelectedUser] = useState(null);
   const [actionLoading, setActionLoading] = useState(null);
   const [activeTab, setActiveTab] = useState('all');
+  // /users has no filters: the search term and the status tabs need every user loaded
+  const usersList = usePagedList(usersAPI.getPage, usersAPI.getAll, { all: Boolean(searchTerm) || activeTab !== 'all' });
+  const users = usersList.items;
   const [exportLoading, setExportLoading] = useState(null);
   const [saving, setSaving] = useState(false);
   const [passwordData, setPasswordData] = useState({ newPassword: '', confirmPassword: '' });
@@ -113,8 +117,9 @@ const UsersPage = () => {
     }
     setSaving(true);
     try {
-      await usersAPI.create(formData);
+      const created = await usersAPI.create(formData);
       await loadData();
+      usersList.showCreated(created.data.user);
       setShowCreateModal(false);
       resetForm();
     } catch (error) {
@@ -131,11 +136,10 @@ const UsersPage = () => {
 
   const loadData = async () => {
     try {
-      const [usersRes, pendingRes] = await Promise.all([
-        usersAPI.getAll(),
+      const [, pendingRes] = await Promise.all([
+        usersList.reload(),
         usersAPI.getPending()
       ]);
-      setUsers(usersRes.data || []);
       setPendingUsers(pendingRes.data || []);
     } catch (error) {
       console.error('Erreur chargement:', error);
@@ -346,7 +350,7 @@ const UsersPage = () => {
             Gestion des utilisateurs
           </h1>
           <p className="text-slate-500 mt-1">
-            {users.length} utilisateur(s) • {pendingUsers.length} en attente
+            {usersList.total} utilisateur(s) • {pendingUsers.length} en attente
           </p>
         </div>
         
@@ -480,15 +484,15 @@ const UsersPage = () => {
         <TabsList>
           <TabsTrigger value="all" className="flex items-center gap-2">
             <Users className="w-4 h-4" />
-            Tous ({filteredUsers.length})
+            Tous ({searchTerm ? filteredUsers.length : usersList.total})
           </TabsTrigger>
           <TabsTrigger value="active" className="flex items-center gap-2">
             <UserCheck className="w-4 h-4" />
-            Actifs ({activeUsers.length})
+            Actifs{!usersList.hasMore && ` (${activeUsers.length})`}
           </TabsTrigger>
           <TabsTrigger value="suspended" className="flex items-center gap-2">
             <UserX className="w-4 h-4" />
-            Suspendus ({suspendedUsers.length})
+            Suspendus{!usersList.hasMore && ` (${suspendedUsers.length})`}
           </TabsTrigger>
         </TabsList>
 
@@ -546,6 +550,7 @@ const UsersPage = () => {
           />
         </TabsContent>
       </Tabs>
+      <LoadMore list={usersList} />
 
       {/* Permissions Legend */}
       <Card>
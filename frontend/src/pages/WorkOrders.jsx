@@ -1,6 +1,8 @@
 import React, { useState, useEffect } from 'react';
-import { workOrdersAPI, equipmentsAPI, caissonAPI, usersAPI, equipmentTypesAPI } from '../lib/api';
+import { workOrdersAPI, equipmentsAPI, caissonAPI, usersAPI, equipmentTypesAPI, dashboardAPI } from '../lib/api';
 import { useAuth } from '../context/AuthContext';
+import { usePagedList } from '../hooks/use-paged-list';
+import LoadMore from '../components/LoadMore';
 import { 
   formatDate, 
   statusLabels, 
@@ -82,7 +84,6 @@ const TYPES_MAINTENANCE = ['preventive', 'corrective'];
 
 const WorkOrders = () => {
   const { canCreate, canModify, canDelete } = useAuth();
-  const [workOrders, setWorkOrders] = useState([]);
   const [equipments, setEquipments] = useState([]);
   const [equipmentTypes, setEquipmentTypes] = useState([]);
   const [technicians, setTechnicians] = useState([]);
@@ -92,6 +93,17 @@ const WorkOrders = () => {
   const [filterStatut, setFilterStatut] = useState('all');
   const [filterType, setFilterType] = useState('all');
   const [activeTab, setActiveTab] = useState('all');
+  const [workOrderStats, setWorkOrderStats] = useState({});
+  // Status (select or tab) and type are filtered by the API; the search term needs every matching order loaded
+  const statutParam = filterStatut !== 'all' ? filterStatut : activeTab;
+  const workOrdersList = usePagedList(workOrdersAPI.getPage, workOrdersAPI.getAll, {
+    params: {
+      ...(statutParam !== 'all' && { statut: statutParam }),
+      ...(filterType !== 'all' && { type_maintenance: filterType })
+    },
+    all: Boolean(searchTerm)
+  });
+  const workOrders = workOrdersList.items;
   
   const [showModal, setShowModal] = useState(false);
   const [showDetailModal, setShowDetailModal] = useState(false);
@@ -124,14 +136,15 @@ const WorkOrders = () => {
 
   const loadData = async () => {
     try {
-      const [workOrdersRes, equipmentsRes, caissonRes, techniciansRes, typesRes] = await Promise.all([
-        workOrdersAPI.getAll(),
-        equipmentsAPI.getAll(),
+      const [, equipmentsRes, caissonRes, techniciansRes, typesRes, statsRes] = await Promise.all([
+        workOrdersList.reload(),
+        equipmentsAPI.getAll({ fields: 'id,type,reference,compteur_horaire' }),
         caissonAPI.get(),
         usersAPI.getTechnicians(),
-        equipmentTypesAPI.getAll()
+        equipmentTypesAPI.getAll(),
+        dashboardAPI.getStats()
       ]);
-      setWorkOrders(workOrdersRes.data || []);
+      setWorkOrderStats(statsRes.data.work_order_stats || {});
       setEquipments(equipmentsRes.data || []);
       setCaisson(caissonRes.data);
       setTechnicians(techniciansRes.data || []);
@@ -219,13 +232,15 @@ const WorkOrders = () => {
         caisson_id: formData.caisson_id || null
       };
       
+      let created = null;
       if (selectedWorkOrder) {
         await workOrdersAPI.update(selectedWorkOrder.id, data);
       } else {
-        await workOrdersAPI.create(data);
+        created = (await workOrdersAPI.create(data)).data;
       }
       
       await loadData();
+      if (created) workOrdersList.showCreated(created);
       setShowModal(false);
     } catch (error) {
       console.error('Erreur sauvegarde:', error);
@@ -332,7 +347,8 @@ const WorkOrders = () => {
     return matchesSearch && matchesStatut && matchesType && matchesTab;
   });
 
-  const getStatusCount = (status) => workOrders.filter(wo => wo.statut === status).length;
+  // Tab counts come from the maintained counters, the list only holds the loaded rows
+  const getStatusCount = (status) => workOrderStats[status] ?? 0;
 
   if (loading) {
     return (
@@ -371,7 +387,7 @@ const WorkOrders = () => {
       <Tabs value={activeTab} onValueChange={setActiveTab}>
         <TabsList className="bg-slate-100">
           <TabsTrigger value="all" data-testid="tab-all">
-            Tous ({workOrders.length})
+            Tous ({workOrderStats.total ?? 0})
           </TabsTrigger>
           <TabsTrigger value="planifiee" data-testid="tab-planifiee">
             Planifiés ({getStatusCount('planifiee')})
@@ -532,6 +548,7 @@ const WorkOrders = () => {
               </TableBody>
             </Table>
           </div>
+          <LoadMore list={workOrdersList} />
         </CardContent>
       </Card>
 